@@ -0,0 +1,47 @@
+"""
+Runs the service with the scripted model of fake_model.py instead of OpenAI.
+Started by run_benchmark.py; the config and tool registry come from the
+usual AGENT_RUNTIME_CONFIG and AGENT_RUNTIME_TOOL_REGISTRY variables.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import uvicorn
+from agents import RunConfig, set_tracing_disabled
+
+from agent_runtime.api.main import create_app
+from agent_runtime.services import agent_service
+from fake_model import FakeModelProvider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Seconds per model call.")
+    parser.add_argument("--model-jitter", type=float, default=0.05, help="Random +/- seconds added per call.")
+    parser.add_argument("--output-tokens", type=int, default=200, help="Tokens in each text answer.")
+    parser.add_argument("--steps", type=int, default=3, help="Steps in each generated plan.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # Nothing may leave the machine: no traces are exported and no model is called.
+    set_tracing_disabled(True)
+    agent_service.run_config = RunConfig(
+        model_provider=FakeModelProvider(
+            latency_seconds=args.model_latency,
+            jitter_seconds=args.model_jitter,
+            output_tokens=args.output_tokens,
+            steps=max(1, args.steps),
+            seed=args.seed,
+        ),
+        tracing_disabled=True,
+    )
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
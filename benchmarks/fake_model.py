@@ -0,0 +1,133 @@
+"""
+A scripted stand-in for the OpenAI model, for offline benchmarks.
+
+It answers every agent of the service without a network call, after a
+configurable delay:
+
+- the planner (any run with an output schema) gets a plan of `steps` steps,
+  where every step but the last is independent and the last depends on all
+  the others;
+- the executor calls the stub MCP server's tool once per step, when the tool
+  is available, then answers with `output_tokens` tokens of text;
+- anything else, such as the summarizer, gets `output_tokens` tokens of text.
+
+Latency is drawn from a seeded generator, so runs are repeatable.
+"""
+import asyncio
+import itertools
+import json
+import random
+from typing import Any, AsyncIterator
+
+from agents import ModelProvider, Usage
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+from agent_runtime.services.context import estimate_tokens
+
+STUB_TOOL_NAME = "fetch_payload"
+
+
+class FakeModel(Model):
+    def __init__(
+        self,
+        latency_seconds: float,
+        jitter_seconds: float,
+        output_tokens: int,
+        steps: int,
+        seed: int,
+        tool_name: str = STUB_TOOL_NAME,
+    ):
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.output_tokens = output_tokens
+        self.steps = steps
+        self.tool_name = tool_name
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+
+    async def _wait(self):
+        jitter = self._random.uniform(-self.jitter_seconds, self.jitter_seconds) if self.jitter_seconds else 0.0
+        await asyncio.sleep(max(0.0, self.latency_seconds + jitter))
+
+    def _plan(self) -> str:
+        steps = [
+            {"number": number, "description": f"Use {self.tool_name} to collect part {number}.", "depends_on": []}
+            for number in range(1, self.steps)
+        ]
+        steps.append({
+            "number": self.steps,
+            "description": "Combine the collected parts into the final answer.",
+            "depends_on": list(range(1, self.steps)),
+        })
+        return json.dumps({"steps": steps})
+
+    def _message(self, text: str) -> ResponseOutputMessage:
+        return ResponseOutputMessage(
+            id=f"msg_{next(self._ids)}",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+        )
+
+    def _tool_call(self) -> ResponseFunctionToolCall:
+        call_id = f"call_{next(self._ids)}"
+        return ResponseFunctionToolCall(
+            id=call_id,
+            call_id=call_id,
+            type="function_call",
+            name=self.tool_name,
+            arguments=json.dumps({"query": "benchmark"}),
+        )
+
+    async def get_response(
+        self,
+        system_instructions: str | None,
+        input: str | list[Any],
+        model_settings: Any,
+        tools: list[Any],
+        output_schema: Any,
+        handoffs: list[Any],
+        tracing: Any,
+        *,
+        previous_response_id: str | None = None,
+        conversation_id: str | None = None,
+        prompt: Any = None,
+    ) -> ModelResponse:
+        await self._wait()
+        called_tool = isinstance(input, list) and any(
+            isinstance(item, dict) and item.get("type") == "function_call_output" for item in input
+        )
+        has_tool = any(getattr(tool, "name", None) == self.tool_name for tool in tools)
+        if output_schema is not None:
+            output, output_tokens = self._message(self._plan()), self.steps * 20
+        elif has_tool and not called_tool:
+            output, output_tokens = self._tool_call(), 20
+        else:
+            output, output_tokens = self._message("word " * self.output_tokens), self.output_tokens
+        input_tokens = estimate_tokens((system_instructions or "") + json.dumps(input, default=str))
+        return ModelResponse(
+            output=[output],
+            usage=Usage(
+                requests=1,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens,
+            ),
+            response_id=None,
+        )
+
+    def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        raise NotImplementedError("The fake model only supports Runner.run.")
+
+
+class FakeModelProvider(ModelProvider):
+    """Serves one shared FakeModel for every agent, whatever model it names."""
+
+    def __init__(self, **model_settings: Any):
+        self.model = FakeModel(**model_settings)
+
+    def get_model(self, model_name: str | None) -> Model:
+        return self.model
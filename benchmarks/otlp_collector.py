@@ -0,0 +1,83 @@
+"""
+A stand-in for an OpenTelemetry collector: accepts OTLP/HTTP JSON trace
+exports on /v1/traces, counts the spans and optionally appends them to a
+file, one JSON object per line. Used by run_benchmark.py --tracing otlp,
+or on its own to check what the service exports:
+
+    python benchmarks/otlp_collector.py --port 4318 --output spans.jsonl
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+class CollectorServer(ThreadingHTTPServer):
+    def __init__(self, address: tuple[str, int], output: Path | None = None):
+        super().__init__(address, CollectorHandler)
+        self.output = output
+        self.spans = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def record(self, payload: dict):
+        spans = [
+            span
+            for resource in payload.get("resourceSpans", [])
+            for scope in resource.get("scopeSpans", [])
+            for span in scope.get("spans", [])
+        ]
+        with self.lock:
+            self.requests += 1
+            self.spans += len(spans)
+            if self.output is not None:
+                with open(self.output, "a", encoding="utf-8") as f:
+                    for span in spans:
+                        f.write(json.dumps(span) + "\n")
+
+
+class CollectorHandler(BaseHTTPRequestHandler):
+    server: CollectorServer
+
+    def do_POST(self):
+        if self.path != "/v1/traces":
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            self.server.record(json.loads(body))
+        except ValueError:
+            self.send_error(400, "Expected OTLP JSON.")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_collector(port: int = 0, output: Path | None = None) -> CollectorServer:
+    """Starts a collector on a background thread and returns it; its port is `server_address[1]`."""
+    server = CollectorServer(("127.0.0.1", port), output)
+    threading.Thread(target=server.serve_forever, name="otlp-collector", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=4318)
+    parser.add_argument("--output", type=Path, help="Append received spans to this file.")
+    args = parser.parse_args()
+    server = CollectorServer(("127.0.0.1", args.port), args.output)
+    print(f"Collecting OTLP traces on http://127.0.0.1:{args.port}/v1/traces")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"Received {server.spans} span(s) in {server.requests} request(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Offline load benchmark for the agent runtime service.
+
+Starts the service with the scripted model of fake_model.py and the stub MCP
+server of stub_mcp_server.py, pushes `--tasks` tasks through it with at most
+`--concurrency` in flight (submit, approve once planned, stream until
+[DONE]) and reports latency percentiles for planning, steps and whole
+tasks, throughput and the memory used by the service and its tool servers.
+
+Nothing is fetched from the network. Run from the project root:
+
+    python benchmarks/run_benchmark.py --tasks 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import yaml
+
+from otlp_collector import start_collector
+
+BENCHMARKS_DIR = Path(__file__).parent
+PROJECT_ROOT = BENCHMARKS_DIR.parent
+
+
+@dataclass
+class TaskTiming:
+    """Client-side timings of one task, in seconds since it was submitted."""
+    task_id: str | None = None
+    plan: float | None = None
+    end_to_end: float | None = None
+    steps: list[float] = field(default_factory=list)
+    status: str | None = None
+    error: str | None = None
+
+
+def percentile(values: list[float], fraction: float) -> float | None:
+    """Nearest-rank percentile; None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def latency_summary(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else None,
+    }
+
+
+def rss_bytes(pid: int) -> int:
+    """Resident memory of a process and its descendants, from /proc."""
+    total = 0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except (FileNotFoundError, ProcessLookupError):
+        return total
+    return total + sum(rss_bytes(child) for child in children)
+
+
+# Directories whose contents a run may change without touching the project.
+SNAPSHOT_SKIP = {".git", "__pycache__", ".pytest_cache", ".venv", "venv", "node_modules"}
+
+
+def tree_snapshot(root: Path) -> dict[str, tuple[int, int]]:
+    """The size and modification time of every file under `root`."""
+    snapshot = {}
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = [name for name in subdirectories if name not in SNAPSHOT_SKIP]
+        for name in files:
+            path = Path(directory, name)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[str(path.relative_to(root))] = (stat.st_size, stat.st_mtime_ns)
+    return snapshot
+
+
+def changed_paths(before: dict[str, tuple[int, int]], after: dict[str, tuple[int, int]]) -> list[str]:
+    """Files added, removed or modified between two snapshots."""
+    return sorted(path for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_config(workdir: Path, args: argparse.Namespace) -> tuple[Path, Path]:
+    """Writes the service config and a tool registry holding only the stub server."""
+    config = {
+        "openai": {"api_key": "sk-offline-benchmark"},
+        "tool_pool": {
+            "warm_instances_per_server": args.warm_tool_servers,
+            "max_instances_per_server": args.max_tool_servers,
+        },
+        "scheduler": {"workers": args.concurrency, "max_queue_size": max(100, args.tasks)},
+        # Everything the service writes stays in the workdir, leaving the project untouched.
+        "artifacts": {"path": str(workdir / "blobs")},
+        "task_logs": {"path": str(workdir / "logs")},
+        "tool_manifests": {"path": str(workdir / "tool_manifests.json")},
+        # Every task has its own prompt anyway; this keeps planning honest.
+        "plan_cache": {"enabled": False},
+        "tracing": {
+            "enabled": args.tracing != "off",
+            "sample_ratio": args.sample_ratio,
+            "exporter": args.tracing if args.tracing != "off" else "none",
+            "json_path": str(workdir / "traces.jsonl"),
+            "otlp_endpoint": f"http://127.0.0.1:{args.collector_port}/v1/traces",
+        },
+    }
+    registry = {
+        "tool_registry": [{
+            "id": "bench_stub",
+            "enabled": True,
+            "type": "local_stdio",
+            "config": {
+                "command": sys.executable,
+                "args": [
+                    str(BENCHMARKS_DIR / "stub_mcp_server.py"),
+                    "--latency", str(args.tool_latency),
+                    "--payload-bytes", str(args.payload_bytes),
+                ],
+            },
+        }],
+    }
+    config_path = workdir / "config.yaml"
+    registry_path = workdir / "tool_registry.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+    registry_path.write_text(yaml.safe_dump(registry))
+    return config_path, registry_path
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"The service exited with code {server.returncode} during startup.")
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"The service was not ready after {timeout} seconds.")
+
+
+async def stream_events(client: httpx.AsyncClient, task_id: str):
+    """Yields the data of each server-sent event of a task until [DONE]."""
+    async with client.stream("GET", f"/v1/tasks/{task_id}/stream") as response:
+        response.raise_for_status()
+        data: list[str] = []
+        async for line in response.aiter_lines():
+            if line.startswith("data:"):
+                data.append(line[5:].removeprefix(" "))
+            elif not line and data:
+                message = "\n".join(data)
+                data = []
+                yield message
+                if message == "[DONE]":
+                    return
+
+
+async def run_task(client: httpx.AsyncClient, index: int) -> TaskTiming:
+    timing = TaskTiming()
+    started = time.monotonic()
+    step_started: dict[str, float] = {}
+    try:
+        response = await client.post("/v1/tasks", json={"prompt": f"Benchmark task {index}: collect and combine the parts."})
+        response.raise_for_status()
+        timing.task_id = response.json()["task_id"]
+        async for message in stream_events(client, timing.task_id):
+            now = time.monotonic() - started
+            if message.startswith("Plan Generation Finished"):
+                timing.plan = now
+                (await client.post(f"/v1/tasks/{timing.task_id}/approve")).raise_for_status()
+            elif message.startswith("Executing step "):
+                step_started[message.split()[2].split("/")[0]] = now
+            elif message.startswith("Finished step "):
+                number = message.split()[2].rstrip(".")
+                if number in step_started:
+                    timing.steps.append(now - step_started.pop(number))
+            elif message == "[DONE]":
+                timing.end_to_end = now
+        timing.status = (await client.get(f"/v1/tasks/{timing.task_id}")).json()["status"]
+    except (httpx.HTTPError, KeyError, ValueError) as e:
+        timing.error = f"{type(e).__name__}: {e}"
+    return timing
+
+
+async def sample_rss(pid: int, samples: list[int], interval: float = 0.5):
+    while True:
+        samples.append(rss_bytes(pid))
+        await asyncio.sleep(interval)
+
+
+async def drive(args: argparse.Namespace, base_url: str, server: subprocess.Popen) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency * 2 + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.task_timeout, limits=limits) as client:
+        await wait_until_ready(client, server, args.startup_timeout)
+        idle_rss = rss_bytes(server.pid)
+        samples: list[int] = []
+        sampler = asyncio.create_task(sample_rss(server.pid, samples))
+        limit = asyncio.Semaphore(args.concurrency)
+
+        async def bounded(index: int) -> TaskTiming:
+            async with limit:
+                return await run_task(client, index)
+
+        started = time.monotonic()
+        timings = await asyncio.gather(*(bounded(index) for index in range(args.tasks)))
+        elapsed = time.monotonic() - started
+        sampler.cancel()
+        await asyncio.gather(sampler, return_exceptions=True)
+        final_rss = rss_bytes(server.pid)
+
+    completed = [timing for timing in timings if timing.status == "completed"]
+    return {
+        "settings": {key: value for key, value in vars(args).items() if key not in ("json", "collector_port")},
+        "tasks": {
+            "submitted": len(timings),
+            "completed": len(completed),
+            "failed": sum(1 for timing in timings if timing.status == "failed"),
+            "errors": [timing.error for timing in timings if timing.error][:10],
+        },
+        "latency_seconds": {
+            "plan": latency_summary([timing.plan for timing in completed if timing.plan is not None]),
+            "step": latency_summary([step for timing in completed for step in timing.steps]),
+            "end_to_end": latency_summary([timing.end_to_end for timing in completed if timing.end_to_end is not None]),
+        },
+        "throughput": {
+            "elapsed_seconds": elapsed,
+            "tasks_per_second": len(completed) / elapsed if elapsed else 0.0,
+            "steps_per_second": sum(len(timing.steps) for timing in completed) / elapsed if elapsed else 0.0,
+        },
+        "rss_bytes": {"idle": idle_rss, "peak": max(samples, default=final_rss), "final": final_rss},
+    }
+
+
+def print_report(report: dict):
+    def seconds(value: float | None) -> str:
+        return f"{value * 1000:9.1f}" if value is not None else f"{'-':>9}"
+
+    tasks = report["tasks"]
+    print(f"\nTasks: {tasks['completed']}/{tasks['submitted']} completed, {tasks['failed']} failed")
+    for error in tasks["errors"]:
+        print(f"  error: {error}")
+    print(f"\n{'latency (ms)':<14}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, summary in report["latency_seconds"].items():
+        print(
+            f"{name:<14}{summary['count']:>7} {seconds(summary['p50'])} {seconds(summary['p95'])}"
+            f" {seconds(summary['p99'])} {seconds(summary['max'])}"
+        )
+    throughput = report["throughput"]
+    print(
+        f"\nThroughput: {throughput['tasks_per_second']:.2f} tasks/s, {throughput['steps_per_second']:.2f} steps/s"
+        f" over {throughput['elapsed_seconds']:.1f}s"
+    )
+    if "spans_exported" in report:
+        print(f"Spans exported: {report['spans_exported']}")
+    rss = {name: value / (1024 * 1024) for name, value in report["rss_bytes"].items()}
+    print(f"RSS (service and tool servers): idle {rss['idle']:.1f} MiB, peak {rss['peak']:.1f} MiB, final {rss['final']:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=50, help="Tasks to run in total.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Tasks in flight at once.")
+    parser.add_argument("--steps", type=int, default=3, help="Steps in each plan.")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Seconds per model call.")
+    parser.add_argument("--model-jitter", type=float, default=0.05, help="Random +/- seconds per model call.")
+    parser.add_argument("--output-tokens", type=int, default=200, help="Tokens in each model answer.")
+    parser.add_argument("--tool-latency", type=float, default=0.05, help="Seconds per stub tool call.")
+    parser.add_argument("--payload-bytes", type=int, default=2048, help="Size of each stub tool result.")
+    parser.add_argument("--warm-tool-servers", type=int, default=2, help="Stub servers started up front.")
+    parser.add_argument("--max-tool-servers", type=int, default=8, help="Most stub servers running at once.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fake model's latency jitter.")
+    parser.add_argument("--tracing", choices=["off", "json", "otlp"], default="off",
+                        help="Trace tasks, exporting to a file or to a local stand-in OTLP collector.")
+    parser.add_argument("--sample-ratio", type=float, default=1.0, help="Fraction of tasks traced.")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--task-timeout", type=float, default=300.0)
+    parser.add_argument("--json", type=Path, help="Also write the report to this file as JSON.")
+    args = parser.parse_args()
+
+    collector = start_collector() if args.tracing == "otlp" else None
+    args.collector_port = collector.server_address[1] if collector else 0
+
+    project_files = tree_snapshot(PROJECT_ROOT)
+    with tempfile.TemporaryDirectory(prefix="agent-runtime-bench-") as tmp:
+        workdir = Path(tmp)
+        config_path, registry_path = write_config(workdir, args)
+        port = free_port()
+        env = {
+            **os.environ,
+            "AGENT_RUNTIME_CONFIG": str(config_path),
+            "AGENT_RUNTIME_TOOL_REGISTRY": str(registry_path),
+        }
+        server = subprocess.Popen(
+            [
+                sys.executable, str(BENCHMARKS_DIR / "bench_server.py"),
+                "--port", str(port),
+                "--model-latency", str(args.model_latency),
+                "--model-jitter", str(args.model_jitter),
+                "--output-tokens", str(args.output_tokens),
+                "--steps", str(args.steps),
+                "--seed", str(args.seed),
+            ],
+            env=env,
+            cwd=PROJECT_ROOT,
+            stdout=open(workdir / "server.log", "w"),
+            stderr=subprocess.STDOUT,
+        )
+        try:
+            report = asyncio.run(drive(args, f"http://127.0.0.1:{port}", server))
+        except RuntimeError as e:
+            print(f"Benchmark failed: {e}\n--- server log ---\n{(workdir / 'server.log').read_text()[-4000:]}")
+            sys.exit(1)
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        if args.tracing == "json":
+            traces = workdir / "traces.jsonl"
+            report["spans_exported"] = sum(1 for _ in open(traces)) if traces.exists() else 0
+    if collector is not None:
+        collector.shutdown()
+        report["spans_exported"] = collector.spans
+
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    touched = [path for path in changed_paths(project_files, tree_snapshot(PROJECT_ROOT))
+               if not args.json or Path(PROJECT_ROOT, path).resolve() != args.json.resolve()]
+    if touched:
+        print(f"\nThe run changed {len(touched)} file(s) in the project:")
+        for path in touched[:20]:
+            print(f"  {path}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
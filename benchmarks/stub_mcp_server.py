@@ -0,0 +1,32 @@
+"""
+A local stdio MCP server for offline benchmarks. Its one tool,
+`fetch_payload`, waits `--latency` seconds and returns `--payload-bytes`
+bytes of text, standing in for a real tool such as a web fetch.
+"""
+import argparse
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds each tool call takes.")
+    parser.add_argument("--payload-bytes", type=int, default=2048, help="Size of each tool result.")
+    args = parser.parse_args()
+
+    server = FastMCP("benchmark-stub", log_level="WARNING")
+    payload = ("lorem ipsum " * (args.payload_bytes // 12 + 1))[: args.payload_bytes]
+
+    @server.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    async def fetch_payload(query: str) -> str:
+        """Returns a fixed payload for the query after a fixed delay."""
+        await asyncio.sleep(args.latency)
+        return payload
+
+    server.run("stdio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+from typing import Literal
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from agent_runtime.services import metrics as runtime_metrics
+from agent_runtime.services import task_manager
+from agent_runtime.services.event_service import event_service
+from agent_runtime.services.logging_setup import logging_setup
+from agent_runtime.services.loop_monitor import loop_monitor
+from agent_runtime.services.orchestrator import OrchestratorManager, scheduler
+from agent_runtime.services.plan_cache import plan_cache
+from agent_runtime.services.server_pool import server_pool
+from agent_runtime.services.tool_cache import tool_flights, tool_result_cache
+from agent_runtime.services.tracing import tracer
+
+
+router = APIRouter()
+
+
+@runtime_metrics.metrics.collector
+def _collect_runtime_metrics():
+    """Reads the current state of the services into the scraped gauges."""
+    counts = task_manager.get_store().count_by_status()
+    for status in ("pending", "awaiting_approval", "approved", "executing", "completed", "failed"):
+        runtime_metrics.TASKS.set(counts.get(status, 0), status)
+    runtime_metrics.ACTIVE_ORCHESTRATORS.set(len(OrchestratorManager._instances))
+    runtime_metrics.MCP_SERVER_PROCESSES.clear()
+    for server_id, count in server_pool.live_counts().items():
+        runtime_metrics.MCP_SERVER_PROCESSES.set(count, server_id)
+    scheduler_stats = scheduler.stats()
+    runtime_metrics.SCHEDULER_QUEUE_DEPTH.set(scheduler_stats["queue_depth"])
+    runtime_metrics.SCHEDULER_BUSY_WORKERS.set(scheduler_stats["busy_workers"])
+    events = event_service.stats()
+    subscribers = events["subscribers"]
+    runtime_metrics.EVENT_SUBSCRIBERS.set(len(subscribers))
+    runtime_metrics.EVENT_QUEUED.set(max((s["queued"] for s in subscribers), default=0))
+    runtime_metrics.EVENT_LAG_SECONDS.set(max((s["lag_seconds"] for s in subscribers), default=0.0))
+    runtime_metrics.EVENTS_DROPPED.set_total(events["dropped_total"])
+    runtime_metrics.LOOP_LAG_MAX.set(loop_monitor.stats()["lag_seconds"]["max"])
+    runtime_metrics.LOG_RECORDS_DROPPED.set_total(logging_setup.stats()["dropped"])
+
+
+@router.get("/ready")
+async def readiness():
+    """
+    Reports whether the service is ready to take traffic.
+    Stays unready (503) until the warm MCP server pool has been filled.
+    """
+    ready = server_pool.ready.is_set()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "servers": server_pool.live_counts(),
+            "failed": server_pool.warm_failures,
+        },
+    )
+
+
+@router.get("/scheduler")
+async def scheduler_stats():
+    """Reports task queue depth, worker utilisation and queue wait times."""
+    return scheduler.stats()
+
+
+@router.get("/plan-cache")
+async def plan_cache_stats():
+    """Reports the number of cached plans, the plan cache hit rate and shared planner runs."""
+    return {**plan_cache.stats(), "single_flight": OrchestratorManager.plan_flights.stats()}
+
+
+@router.get("/tool-cache")
+async def tool_cache_stats():
+    """Reports tool result cache occupancy, hit rates per tool and shared in-flight calls."""
+    return {**tool_result_cache.stats(), "single_flight": tool_flights.stats()}
+
+
+@router.get("/loop")
+async def loop_stats():
+    """Reports event-loop lag, i.e. how long the loop was blocked past its scheduled wake-ups."""
+    return loop_monitor.stats()
+
+
+@router.get("/events")
+async def event_stats():
+    """Reports buffered task events and, per stream subscriber, queue depth, lag and dropped events."""
+    return event_service.stats()
+
+
+@router.get("/tracing")
+async def tracing_stats():
+    """Reports whether tracing is on, its sample ratio and exported, queued and dropped spans."""
+    return tracer.stats()
+
+
+@router.get("/logging")
+async def logging_stats():
+    """Reports the log level and format, and log records queued for writing or dropped."""
+    return logging_setup.stats()
+
+
+@router.get("/timings")
+async def task_timings(status: Literal["completed", "failed", "all"] = "completed"):
+    """
+    Aggregates stored tasks' time per phase (queue wait, server startup,
+    planning, execution, shutdown), per-step model and tool time, and token usage.
+    """
+    return task_manager.timing_summary(None if status == "all" else status)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Serves the runtime's metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(runtime_metrics.metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,50 +1,115 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from typing import Literal
+
+import re
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 
 from agent_runtime.services import task_manager
 from agent_runtime.services import orchestrator
-from agent_runtime.services.event_service import event_service
+from agent_runtime.services.blob_store import blob_store
+from agent_runtime.services.event_service import DONE, event_order, event_service
+from agent_runtime.services.plan import PlanStep
 
 router = APIRouter()
 
 # --- API Models ---
 class TaskCreationRequest(BaseModel):
     prompt: str
+    priority: Literal["high", "normal", "low"] = "normal"
 
 class TaskCreationResponse(BaseModel):
     task_id: str
 
+class Artifact(BaseModel):
+    hash: str
+    step: int
+    size: int
+
 class TaskStatusResponse(BaseModel):
     task_id: str
     status: task_manager.TaskStatus
     plan: str | None = None
+    plan_steps: list[PlanStep] | None = None
+    plan_cache_hit: bool | None = None
     result: str | None = None
+    step_usage: dict[str, dict[str, int]] | None = None
+    plan_usage: dict[str, int] | None = None
+    token_usage: dict[str, int] | None = None
+    timings: dict[str, float] | None = None
+    step_timings: dict[str, dict[str, float]] | None = None
+    artifacts: list[Artifact] | None = None
+    traceparent: str | None = None
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+def _parse_range(range_header: str, size: int) -> tuple[int, int]:
+    """Parses a single-range `Range` header into an inclusive (start, end) byte range."""
+    match = _RANGE.match(range_header.strip())
+    if not match or match.groups() == ("", ""):
+        raise HTTPException(status_code=416, detail="Invalid range.", headers={"Content-Range": f"bytes */{size}"})
+    start_text, end_text = match.groups()
+    if start_text:
+        start = int(start_text)
+        end = min(int(end_text), size - 1) if end_text else size - 1
+    else:
+        start = max(0, size - int(end_text))
+        end = size - 1
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, detail="Range not satisfiable.", headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+def _queue_full_error(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="The task queue is full. Please retry later.",
+        headers={"Retry-After": str(retry_after)},
+    )
 
 # --- Endpoints ---
 @router.post("/tasks", response_model=TaskCreationResponse, status_code=202)
-async def submit_task(request: TaskCreationRequest, background_tasks: BackgroundTasks):
+async def submit_task(request: TaskCreationRequest):
     """
     Submits a new task to the agent.
-    The task is processed in the background.
+    A plan cached for the same prompt and tool set is reused and the task goes
+    straight to awaiting approval. Otherwise the task is queued for planning;
+    returns 429 when the queue is full.
     """
-    task_id = task_manager.create_task(prompt=request.prompt)
-    background_tasks.add_task(orchestrator.run_task_and_update_status, task_id, request.prompt)
+    cached = orchestrator.cached_plan(request.prompt)
+    if cached is None and orchestrator.scheduler.full():
+        raise _queue_full_error(orchestrator.scheduler.retry_after_seconds)
+    task_id = task_manager.create_task(prompt=request.prompt, priority=request.priority)
+    if cached is not None:
+        orchestrator.use_cached_plan(task_id, request.prompt, cached)
+    else:
+        orchestrator.scheduler.submit(
+            orchestrator.run_task_and_update_status, task_id, request.prompt, priority=request.priority, task_id=task_id
+        )
+    # Another worker may serve the client's next request for this task.
+    await task_manager.persist()
     return TaskCreationResponse(task_id=task_id)
 
 
 @router.post("/tasks/{task_id}/approve", status_code=202)
-async def approve_task(task_id: str, background_tasks: BackgroundTasks):
+async def approve_task(task_id: str):
     """
     Approves a generated plan for a task, allowing execution to proceed.
+    Execution is queued; returns 429 when the queue is full.
     """
     task = task_manager.get_task_status(task_id)
     if not task or task["status"] != "awaiting_approval":
         raise HTTPException(status_code=400, detail="Task cannot be approved. It might not be awaiting approval or does not exist.")
 
+    if orchestrator.scheduler.full():
+        raise _queue_full_error(orchestrator.scheduler.retry_after_seconds)
+
     if task_manager.approve_task(task_id):
-        background_tasks.add_task(orchestrator.trigger_plan_execution, task_id)
-        return {"message": "Task approved. Execution has started."}
+        orchestrator.scheduler.submit(
+            orchestrator.trigger_plan_execution, task_id, priority=task.get("priority", "normal"), task_id=task_id
+        )
+        return {"message": "Task approved. Execution has been queued."}
     
     # This part should ideally not be reached if the above logic is correct.
     raise HTTPException(status_code=500, detail="Failed to approve task.")
@@ -62,20 +127,83 @@ async def get_task_status(task_id: str):
         task_id=task_id,
         status=status_info["status"],
         plan=status_info.get("plan"),
+        plan_steps=status_info.get("plan_steps"),
+        plan_cache_hit=status_info.get("plan_cache_hit"),
         result=status_info["result"],
+        step_usage=status_info.get("step_usage"),
+        plan_usage=status_info.get("plan_usage"),
+        token_usage=task_manager.token_totals(status_info),
+        timings=status_info.get("timings"),
+        step_timings=status_info.get("step_timings"),
+        artifacts=status_info.get("artifacts"),
+        traceparent=status_info.get("traceparent"),
+    )
+
+@router.get("/tasks/{task_id}/artifacts/{blob_hash}")
+async def get_task_artifact(task_id: str, blob_hash: str, range_header: str | None = Header(None, alias="Range")):
+    """
+    Streams the full output of a task step from the blob store.
+    Supports a single byte range in the `Range` header.
+    """
+    status_info = task_manager.get_task_status(task_id)
+    if not status_info:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not any(artifact["hash"] == blob_hash for artifact in status_info.get("artifacts") or []):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    try:
+        size = blob_store.size(blob_hash)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    headers = {"Accept-Ranges": "bytes", "ETag": f'"{blob_hash}"'}
+    if range_header is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = _parse_range(range_header, size)
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        blob_store.iter_range(blob_hash, start, end - start + 1),
+        status_code=status_code,
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
     )
 
 @router.get("/tasks/{task_id}/stream")
-async def stream_task_events(task_id: str, request: Request):
+async def stream_task_events(
+    task_id: str, request: Request, last_event_id: str | None = Header(None, alias="Last-Event-ID")
+):
     """
-    Streams live status events for a given task.
+    Streams status events for a given task, ending with `[DONE]`.
+    Events carry increasing ids; reconnecting with `Last-Event-ID` resumes
+    after that event, and events published before connecting are replayed.
+    With a shared event backend, any worker can serve the stream.
     """
+    status_info = task_manager.get_task_status(task_id)
+    if not status_info:
+        raise HTTPException(status_code=404, detail="Task not found")
+    try:
+        if last_event_id:
+            event_order(last_event_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Last-Event-ID must be an event id.")
+    finished = status_info["status"] in ("completed", "failed") and not await event_service.has_events(task_id)
+
     async def event_generator():
-        async for message in event_service.subscribe(task_id):
+        if finished:
+            # The task's events have been freed; all that is left to say is that it is over.
+            yield {"data": DONE}
+            return
+        async for event in event_service.subscribe(task_id, last_event_id=last_event_id or None):
             if await request.is_disconnected():
                 break
-            if message == "[DONE]":
+            item = {"id": event.id, "data": event.data}
+            if event.traceparent:
+                # A comment line: ignored by EventSource clients, available to anyone reading the raw stream.
+                item["comment"] = f"traceparent={event.traceparent}"
+            yield item
+            if event.data == DONE:
                 break
-            yield message
 
-    return EventSourceResponse(event_generator()) 
\ No newline at end of file
+    return EventSourceResponse(event_generator())
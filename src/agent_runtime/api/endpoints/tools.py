@@ -1,12 +1,14 @@
-from typing import List, Optional
+from typing import Any, List, Optional
 
 from fastapi import APIRouter
 from pydantic import BaseModel
 import yaml
 from pathlib import Path
 
-from agent_runtime.constants import PROJECT_ROOT
+from agent_runtime.constants import TOOL_REGISTRY_PATH
 from agent_runtime.services.orchestrator import OrchestratorManager
+from agent_runtime.services.server_pool import server_pool
+from agent_runtime.services.tool_manifests import manifest_cache
 
 
 router = APIRouter()
@@ -20,8 +22,20 @@ class ToolStatus(BaseModel):
     name: Optional[str] = None
 
 
+class ToolDefinition(BaseModel):
+    name: str
+    description: Optional[str] = None
+    input_schema: dict[str, Any] = {}
+
+
+class ToolManifest(BaseModel):
+    id: str
+    cached: bool
+    tools: List[ToolDefinition] = []
+
+
 def _load_tool_registry() -> list[dict]:
-    path = PROJECT_ROOT / "tool_registry.yaml"
+    path = TOOL_REGISTRY_PATH
     if not path.exists():
         return []
     with open(path, "r") as f:
@@ -42,6 +56,8 @@ def _collect_connected_ids() -> set[str]:
     except Exception:
         # If inspection fails for any reason, fall back to empty set
         pass
+    # Servers kept alive by the shared pool are connected even when idle
+    connected.update(server_pool.live_counts().keys())
     return connected
 
 
@@ -71,3 +87,27 @@ async def get_tools_status() -> List[ToolStatus]:
 
     return statuses
 
+
+@router.get("/tools", response_model=List[ToolManifest])
+async def list_tools() -> List[ToolManifest]:
+    """
+    Lists the tools of every enabled server from the persistent manifest
+    cache, without starting or contacting any server.
+    """
+    manifests: List[ToolManifest] = []
+    for entry in _load_tool_registry():
+        tool_id = entry.get("id")
+        if not tool_id or not entry.get("enabled", False):
+            continue
+        tools = manifest_cache.get(entry)
+        manifests.append(
+            ToolManifest(
+                id=tool_id,
+                cached=tools is not None,
+                tools=[
+                    ToolDefinition(name=tool.name, description=tool.description, input_schema=tool.inputSchema)
+                    for tool in tools or []
+                ],
+            )
+        )
+    return manifests
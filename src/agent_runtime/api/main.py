@@ -1,17 +1,64 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 import yaml
 import uvicorn
+import logging
 import os
 
 from agents import set_default_openai_key
 from agent_runtime.api.endpoints import tasks
 from agent_runtime.api.endpoints import tools
+from agent_runtime.api.endpoints import system
 from agent_runtime.api import web_interface
 from agent_runtime.constants import PROJECT_ROOT
 from agent_runtime.services.tool_manager import setup_tools
+from agent_runtime.services.logging_setup import logging_setup
+from agent_runtime.services.server_pool import server_pool
+from agent_runtime.services import task_manager
+from agent_runtime.services.reaper import task_reaper
+from agent_runtime.services.context import context_manager
+from agent_runtime.services.blob_store import blob_store
+from agent_runtime.services.plan_cache import plan_cache
+from agent_runtime.services.tool_cache import tool_result_cache
+from agent_runtime.services.task_logger import task_log_writer
+from agent_runtime.services.tool_manifests import manifest_cache
+from agent_runtime.services.loop_monitor import loop_monitor
+from agent_runtime.services.event_service import event_service
+from agent_runtime.services.tracing import tracer
+from agent_runtime.services.orchestrator import OrchestratorManager, scheduler
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Owns process-wide resources such as the shared MCP server pool.
+    Warm servers are started in the background; /ready reports when they are up.
+    """
+    await loop_monitor.start()
+    await event_service.start()
+    await server_pool.start()
+    await task_reaper.start()
+    await scheduler.start()
+    try:
+        yield
+    finally:
+        await scheduler.shutdown()
+        await task_reaper.shutdown()
+        await server_pool.shutdown()
+        task_manager.get_store().close()
+        plan_cache.close()
+        task_log_writer.shutdown()
+        await event_service.shutdown()
+        tracer.shutdown()
+        await loop_monitor.shutdown()
+        logging_setup.shutdown()
+
 
 def create_app(config_path: Path | None = None) -> FastAPI:
     """Creates and configures the main FastAPI application."""
@@ -21,6 +68,7 @@ def create_app(config_path: Path | None = None) -> FastAPI:
         title="Agent Runtime Service",
         description="An asynchronous, task-based service for orchestrating AI agents with integrated web console.",
         version="3.0.0",
+        lifespan=lifespan,
     )
 
     # --- Add CORS middleware ---
@@ -58,11 +106,29 @@ def create_app(config_path: Path | None = None) -> FastAPI:
     if not config:
         raise ValueError(f"Configuration file at '{config_path}' is empty or invalid.")
 
+    # First, so that everything configured below logs through it.
+    logging_setup.configure(config.get("logging"))
+
     api_key = config.get("openai", {}).get("api_key")
     if not api_key or api_key == "YOUR_OPENAI_API_KEY_HERE":
         raise ValueError("OpenAI API key is not configured in config.yaml")
     set_default_openai_key(api_key)
 
+    server_pool.configure(config.get("tool_pool"))
+    manifest_cache.configure(config.get("tool_manifests"))
+    task_manager.configure_store(config.get("task_store"), shared=worker_count(config) > 1)
+    task_reaper.configure(config.get("retention"))
+    scheduler.configure(config.get("scheduler"))
+    OrchestratorManager.configure(config.get("execution"))
+    context_manager.configure(config.get("context"))
+    blob_store.configure(config.get("artifacts"))
+    plan_cache.configure(config.get("plan_cache"))
+    tool_result_cache.configure(config.get("tool_cache"))
+    task_log_writer.configure(config.get("task_logs"))
+    loop_monitor.configure(config.get("loop_monitor"))
+    event_service.configure(config.get("events"))
+    tracer.configure(config.get("tracing"))
+
     # --- Mount Static Files ---
     static_dir = Path(__file__).parent / "static"
     if static_dir.exists():
@@ -71,16 +137,32 @@ def create_app(config_path: Path | None = None) -> FastAPI:
     # --- Include Routers ---
     app.include_router(tasks.router, prefix="/v1", tags=["Tasks"])
     app.include_router(tools.router, prefix="/v1", tags=["Tools"]) 
+    app.include_router(system.router, prefix="", tags=["System"])
     app.include_router(web_interface.router, prefix="", tags=["Web Interface"])
 
     return app
 
 # --- Server Runner ---
+def worker_count(config: dict) -> int:
+    """The number of worker processes set by `server.workers`."""
+    return max(1, int((config.get("server") or {}).get("workers", 1)))
+
+def check_multi_worker_config(config: dict):
+    """
+    Workers are separate processes that only share what lives outside them:
+    tasks must be kept in a store they all open, and task streams are only
+    served by the worker running the task unless events go through Redis.
+    """
+    if (config.get("task_store") or {}).get("backend", "memory") != "sqlite":
+        raise ValueError("server.workers > 1 requires a shared task store. Set task_store.backend to 'sqlite'.")
+    if (config.get("events") or {}).get("backend", "memory") != "redis":
+        logger.warning(
+            "server.workers > 1 with the in-memory events backend; a task's event stream "
+            "is only available from the worker running it. Set events.backend to 'redis' to share them."
+        )
+
 def run_server():
     """A convenience function to run the Uvicorn server."""
-    # First, ensure all necessary tools are set up.
-    setup_tools()
-
     config_env = os.environ.get("AGENT_RUNTIME_CONFIG")
     if config_env:
         config_path = Path(config_env)
@@ -100,10 +182,22 @@ def run_server():
     if not config:
         raise ValueError(f"Configuration file at '{config_path}' is empty or invalid.")
 
+    logging_setup.configure(config.get("logging"))
+    # Ensure all necessary tools are set up.
+    setup_tools()
+
     server_config = config.get("server", {})
     host = server_config.get("host", "0.0.0.0")
     port = server_config.get("port", 8000)
-    
+    workers = worker_count(config)
+
+    if workers > 1:
+        # Each worker process builds its own app from the same config file.
+        check_multi_worker_config(config)
+        os.environ["AGENT_RUNTIME_CONFIG"] = str(config_path)
+        uvicorn.run("agent_runtime.api.main:create_app", factory=True, host=host, port=port, workers=workers)
+        return
+
     app = create_app(config_path=config_path)
     uvicorn.run(app, host=host, port=port)
 
@@ -1,5 +1,10 @@
+import os
 from pathlib import Path
 
 # A single, reliable source of truth for the project's root directory.
 # This resolves to the 'mcp-agent-orchestrator' directory.
-PROJECT_ROOT = Path(__file__).parent.parent.parent 
\ No newline at end of file
+PROJECT_ROOT = Path(__file__).parent.parent.parent 
+
+# The MCP server registry. AGENT_RUNTIME_TOOL_REGISTRY can point at another
+# file, for example to run the service against a different set of servers.
+TOOL_REGISTRY_PATH = Path(os.environ.get("AGENT_RUNTIME_TOOL_REGISTRY") or PROJECT_ROOT / "tool_registry.yaml")
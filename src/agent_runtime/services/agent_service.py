@@ -1,8 +1,121 @@
+import logging
 import shutil
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
-from agents import Agent, Runner
+from agents import Agent, RunConfig, RunHooks, Runner, function_tool
 from agents.mcp import MCPServer
+from agents.usage import Usage
+
+from agent_runtime.services.context import StepOutput, context_manager, estimate_tokens
+from agent_runtime.services.metrics import LLM_CALL_SECONDS, LLM_TOKENS, TOOL_CALL_SECONDS
+from agent_runtime.services.plan import Plan, PlanStep
+from agent_runtime.services.tracing import Span, tracer
+
+logger = logging.getLogger(__name__)
+
+# Settings for every agent run, such as the model provider. The benchmarks
+# replace it to run against a scripted model instead of OpenAI.
+run_config = RunConfig()
+
+
+@function_tool
+async def read_step_output(handle: str, offset: int = 0) -> str:
+    """Reads the full output of an earlier plan step that was shortened in your prompt.
+
+    Args:
+        handle: The handle given for the shortened output.
+        offset: The byte offset to start reading from, to page through long outputs.
+    """
+    try:
+        return context_manager.read(handle, offset)
+    except KeyError as e:
+        return str(e)
+
+
+class RunTimings(RunHooks):
+    """
+    Times the model turns and tool calls of the agent runs it is passed to,
+    and traces each as a span under the current span.
+    Tool time is summed over calls, so calls made in parallel can add up to
+    more than the elapsed time.
+    """
+
+    def __init__(self):
+        self.llm_turns = 0
+        self.llm_seconds = 0.0
+        self.tool_calls = 0
+        self.tool_seconds = 0.0
+        self._llm_started = 0.0
+        self._llm_span: Span | None = None
+        self._tools_started: dict[str, list[tuple[float, Span | None]]] = {}
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items):
+        self._llm_started = time.perf_counter()
+        self._llm_span = tracer.start_span("llm", {"agent": agent.name})
+
+    async def on_llm_end(self, context, agent, response):
+        elapsed = time.perf_counter() - self._llm_started
+        self.llm_turns += 1
+        self.llm_seconds += elapsed
+        LLM_CALL_SECONDS.observe(elapsed, agent.name)
+        LLM_TOKENS.inc(agent.name, "input", amount=response.usage.input_tokens)
+        LLM_TOKENS.inc(agent.name, "output", amount=response.usage.output_tokens)
+        if self._llm_span is not None:
+            self._llm_span.set_attribute("tokens.input", response.usage.input_tokens)
+            self._llm_span.set_attribute("tokens.output", response.usage.output_tokens)
+            self._llm_span.end()
+            self._llm_span = None
+
+    async def on_tool_start(self, context, agent, tool):
+        span = tracer.start_span("tool", {"tool.name": tool.name, "agent": agent.name})
+        self._tools_started.setdefault(tool.name, []).append((time.perf_counter(), span))
+
+    async def on_tool_end(self, context, agent, tool, result):
+        started = self._tools_started.get(tool.name)
+        if started:
+            started_at, span = started.pop(0)
+            elapsed = time.perf_counter() - started_at
+            self.tool_calls += 1
+            self.tool_seconds += elapsed
+            TOOL_CALL_SECONDS.observe(elapsed, tool.name)
+            if span is not None:
+                span.end()
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "llm_turns": self.llm_turns,
+            "llm_seconds": self.llm_seconds,
+            "tool_calls": self.tool_calls,
+            "tool_seconds": self.tool_seconds,
+        }
+
+
+def usage_dict(usage: Usage) -> dict[str, int]:
+    """The token counts of a run, as stored with the task."""
+    return {
+        "requests": usage.requests,
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "total_tokens": usage.total_tokens,
+    }
+
+
+@dataclass
+class PlanGeneration:
+    """A generated plan, the tokens the planner used and how long its turns took."""
+    plan: Plan
+    usage: dict[str, int] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class StepExecution:
+    """The output of an executed step, the tokens it used and how long its model turns and tool calls took."""
+    output: StepOutput
+    usage: dict[str, int] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
 
 
 class AgentService:
@@ -15,14 +128,13 @@ class AgentService:
         self._mcp_servers = mcp_servers
         self._planner_agent = self._define_planner_agent()
         self._executor_agent = self._define_executor_agent()
+        self._summarizer_agent = self._define_summarizer_agent()
         self._setup_environment()
 
     def _setup_environment(self):
         """Ensures necessary files and directories exist for the agent's tools."""
-        print("\\n--- Setting up Execution Environment ---")
         if not shutil.which("npx"):
             raise RuntimeError("'npx' command not found. Please ensure Node.js and npm are installed.")
-        print("-> 'npx' is available.")
 
         project_root = Path(__file__).parent.parent.parent
         sample_data_dir = project_root / "sample_data"
@@ -30,14 +142,10 @@ class AgentService:
         url_file = sample_data_dir / "url_to_fetch.txt"
         if not url_file.exists():
             url_file.write_text("https://v7t.space")
-            print(f"-> File '{url_file}' created with default URL.")
-        else:
-            print(f"-> File '{url_file}' already exists.")
+            logger.info("Created '%s' with the default URL.", url_file)
 
         mcp_fetch_downloads_dir = Path.home() / "Downloads" / "mcp-fetch"
         mcp_fetch_downloads_dir.mkdir(parents=True, exist_ok=True)
-        print(f"-> Ensured MCP fetch download directory exists.")
-        print("--------------------------------------\\n")
 
     def _define_planner_agent(self) -> Agent:
         """Defines the planning agent's properties."""
@@ -47,9 +155,12 @@ class AgentService:
                 "You are a master planner. Your job is to take a high-level user request "
                 "and create a step-by-step plan to accomplish it using the tools available to you. "
                 "Carefully inspect the tools you have been given and create a numbered plan that uses THEIR EXACT names. "
+                "For every step, list the earlier steps whose results it needs in `depends_on` (empty if it needs none), "
+                "so that independent steps can run in parallel. "
                 "Do not make up tools. Do not execute the plan, only create it."
             ),
             mcp_servers=self._mcp_servers,
+            output_type=Plan,
         )
 
     def _define_executor_agent(self) -> Agent:
@@ -58,69 +169,122 @@ class AgentService:
             name="ExecutorAgent",
             instructions=(
                 "You are an executor. Your job is to receive a single step of a plan and execute it precisely. "
-                "You will be given the original user request, the full plan, the result of the previous step, and the current step to execute. "
+                "You will be given the original user request, the current step to execute, and the steps it depends on with their results. "
                 "Use the available tools to perform the action described in the current step. "
-                "If you are using the filesystem and get a path error, try again with a full, absolute path to the resource."
+                "If you are using the filesystem and get a path error, try again with a full, absolute path to the resource. "
+                "Long results of earlier steps may be shortened; use read_step_output with the given handle only if you need the omitted part."
             ),
             mcp_servers=self._mcp_servers,
+            tools=[read_step_output],
+        )
+
+    def _define_summarizer_agent(self) -> Agent:
+        """Defines the agent that condenses long step outputs for later steps."""
+        return Agent(
+            name="SummarizerAgent",
+            instructions=(
+                "You condense the output of a step of a plan so that later steps can use it. "
+                "Keep every fact, number, name, URL and file path that a later step might need. "
+                "Drop boilerplate, markup and repetition. Never add information that is not in the output."
+            ),
         )
 
-    async def create_plan(self, task_prompt: str) -> str:
+    async def create_plan(self, task_prompt: str) -> PlanGeneration:
         """
-        Runs the planner agent to generate a plan.
+        Runs the planner agent to generate a structured plan.
         """
-        print(f"--- Agent Service: Creating Plan ---")
-        print(f"Prompt: '{task_prompt}'")
-        print("----------------------------------\\n")
+        logger.info("Creating plan.")
+        logger.debug("Planner prompt: %s", task_prompt)
+
+        timings = RunTimings()
+        result = await Runner.run(self._planner_agent, task_prompt, hooks=timings, run_config=run_config)
 
-        result = await Runner.run(self._planner_agent, task_prompt)
+        plan = result.final_output_as(Plan).normalized()
+        logger.info("Generated a plan with %d step(s).", len(plan.steps))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Generated plan:\n%s", plan.to_text())
 
-        plan = str(result.final_output)
-        print("\\n--- Agent Service: Generated Plan ---")
-        print(plan)
-        print("-----------------------------------")
+        return PlanGeneration(plan=plan, usage=usage_dict(result.context_wrapper.usage), timings=timings.as_dict())
 
-        return plan
+    async def _compact(self, output: StepOutput, budget: int, usage: Usage, timings: RunTimings) -> str:
+        """Shrinks a step output to roughly `budget` tokens using the configured strategy."""
+        if not context_manager.needs_compaction(output, budget):
+            return output.text()
+        if context_manager.strategy == "summarize":
+            result = await Runner.run(
+                self._summarizer_agent,
+                f"Condense this output to at most {budget * 3 // 4} words:\n\n"
+                f"{context_manager.truncate(output, context_manager.max_prompt_tokens)}",
+                hooks=timings,
+                run_config=run_config,
+            )
+            usage.add(result.context_wrapper.usage)
+            summary = context_manager.truncate(StepOutput.inline(str(result.final_output)), budget)
+            if output.handle:
+                summary += f"\n[Summary. Full output: read_step_output('{output.handle}').]"
+            return summary
+        return context_manager.truncate(output, budget)
 
     async def execute_step(
         self,
         task_prompt: str,
-        plan: str,
-        step_index: int,
-        previous_step_result: str | None,
-    ) -> str:
+        plan: Plan,
+        step: PlanStep,
+        dependency_results: dict[int, StepOutput] | None = None,
+    ) -> StepExecution:
         """
         Runs the executor agent to perform a single step of the plan.
+        `dependency_results` maps the numbers of the steps this step depends on to their outputs.
+        Only the current step and its dependencies are included in the prompt, and
+        dependency outputs are compacted to fit the context budget.
         """
-        # More robustly parse the plan to extract only numbered steps.
-        plan_steps = [
-            line.strip()
-            for line in plan.strip().split("\n")
-            if line.strip() and line.strip()[0].isdigit()
-        ]
-        current_step = plan_steps[step_index]
-
-        print(f"--- Agent Service: Executing Step {step_index + 1}/{len(plan_steps)} ---")
-        print(f"Step Details: {current_step}")
-        
+        logger.info("Executing step %d/%d.", step.number, len(plan.steps))
+        logger.debug("Step %d details: %s", step.number, step.description)
+
+        usage = Usage()
+        timings = RunTimings()
+        dependency_results = dependency_results or {}
+        request_text = context_manager.truncate(StepOutput.inline(task_prompt), context_manager.max_result_tokens)
+        budget = context_manager.budget_per_result(request_text + step.description, len(step.depends_on))
+        full_tokens = estimate_tokens(task_prompt) + sum(
+            dependency_results[number].tokens for number in step.depends_on if number in dependency_results
+        )
+
+        if step.depends_on:
+            dependency_lines = []
+            for number in step.depends_on:
+                output = dependency_results.get(number)
+                text = await self._compact(output, budget, usage, timings) if output is not None else None
+                dependency_lines.append(f"Step {number} ('{plan.step(number).description}') returned: '{text}'")
+            dependency_text = "\n".join(dependency_lines)
+        else:
+            dependency_text = "None"
+
         prompt_for_executor = (
-            f"You are executing one step of a larger plan.\\n"
-            f"The original user request was: '{task_prompt}'\\n"
-            f"The full plan is:\\n{plan}\\n"
-            f"The result of the previous step was: '{previous_step_result or 'None'}'\\n\\n"
-            f"Your current task is to execute ONLY this step: '{current_step}'\\n"
+            f"You are executing step {step.number} of a {len(plan.steps)}-step plan.\n"
+            f"The original user request was: '{request_text}'\n"
+            f"The steps this step depends on and their results were:\n{dependency_text}\n\n"
+            f"Your current task is to execute ONLY this step: '{step.description}'\n"
             f"Focus only on this step. Do not repeat previous steps. Return only the direct output of this step."
         )
 
-        print("\\n--- Executor Agent Prompt ---")
-        print(prompt_for_executor)
-        print("-----------------------------")
+        logger.debug("Executor prompt for step %d:\n%s", step.number, prompt_for_executor)
 
-        result = await Runner.run(self._executor_agent, prompt_for_executor)
-        step_output = str(result.final_output)
+        result = await Runner.run(self._executor_agent, prompt_for_executor, hooks=timings, run_config=run_config)
+        usage.add(result.context_wrapper.usage)
+        # Large outputs go straight to the blob store; only a preview is kept in memory.
+        step_output = await StepOutput.from_text(str(result.final_output))
 
-        print(f"\\n--- Raw Output from Step {step_index + 1} ---")
-        print(step_output)
-        print("------------------------------------")
+        logger.info("Step %d returned %d bytes.", step.number, step_output.size)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Raw output from step %d:\n%s", step.number, step_output.describe())
 
-        return step_output 
\ No newline at end of file
+        return StepExecution(
+            output=step_output,
+            usage={
+                **usage_dict(usage),
+                "context_tokens": estimate_tokens(request_text + dependency_text),
+                "uncompacted_context_tokens": full_tokens,
+            },
+            timings=timings.as_dict(),
+        )
@@ -0,0 +1,119 @@
+import hashlib
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Iterator
+
+from agent_runtime.constants import PROJECT_ROOT
+
+DEFAULT_BLOB_PATH = PROJECT_ROOT / "data" / "blobs"
+
+_HASH = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    """
+    A content-addressed store for large step outputs.
+
+    Each blob is written once to a file named by the SHA-256 of its content,
+    so identical outputs are stored once. Reads go through memory-mapped
+    files, so serving a slice of a large blob never loads the whole of it.
+    """
+
+    def __init__(self, path: Path = DEFAULT_BLOB_PATH):
+        self.path = path
+        self.inline_bytes = 4096
+        self.preview_chars = 500
+
+    def configure(self, settings: dict | None):
+        """Applies the `artifacts` block of config.yaml."""
+        settings = settings or {}
+        path = Path(settings.get("path", self.path))
+        self.path = path if path.is_absolute() else PROJECT_ROOT / path
+        self.inline_bytes = int(settings.get("inline_bytes", self.inline_bytes))
+        self.preview_chars = int(settings.get("preview_chars", self.preview_chars))
+
+    @staticmethod
+    def is_hash(value: str) -> bool:
+        return bool(_HASH.match(value))
+
+    def _path_for(self, blob_hash: str) -> Path:
+        if not self.is_hash(blob_hash):
+            raise KeyError(f"Invalid blob hash '{blob_hash}'.")
+        return self.path / blob_hash[:2] / blob_hash
+
+    def put(self, data: bytes) -> str:
+        """Stores `data` and returns its hash. Storing the same content again is a no-op."""
+        blob_hash = hashlib.sha256(data).hexdigest()
+        path = self._path_for(blob_hash)
+        if path.exists():
+            os.utime(path)
+            return blob_hash
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{blob_hash}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return blob_hash
+
+    def exists(self, blob_hash: str) -> bool:
+        try:
+            return self._path_for(blob_hash).exists()
+        except KeyError:
+            return False
+
+    def size(self, blob_hash: str) -> int:
+        try:
+            return self._path_for(blob_hash).stat().st_size
+        except FileNotFoundError:
+            raise KeyError(f"Unknown blob '{blob_hash}'.") from None
+
+    def read(self, blob_hash: str, offset: int = 0, length: int | None = None) -> bytes:
+        """Reads `length` bytes from `offset` (to the end by default) through a memory map."""
+        return b"".join(self.iter_range(blob_hash, offset, length))
+
+    def read_text(self, blob_hash: str, offset: int = 0, length: int | None = None) -> str:
+        """Like `read`, decoded as UTF-8; characters split at the edges of the range are dropped."""
+        return self.read(blob_hash, offset, length).decode("utf-8", errors="ignore")
+
+    def iter_range(
+        self, blob_hash: str, offset: int = 0, length: int | None = None, chunk_size: int = 65536
+    ) -> Iterator[bytes]:
+        """Yields a byte range of a blob in chunks, straight from the memory map."""
+        size = self.size(blob_hash)
+        end = size if length is None else min(size, offset + length)
+        if offset >= end:
+            return
+        with open(self._path_for(blob_hash), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(offset, end, chunk_size):
+                yield mapped[start:min(start + chunk_size, end)]
+
+    def preview(self, text: str) -> str:
+        """Returns the first `preview_chars` characters of `text`, marking any cut."""
+        if len(text) <= self.preview_chars:
+            return text
+        return text[: self.preview_chars] + f"... [{len(text) - self.preview_chars} more characters]"
+
+    def sweep(self, live_hashes: set[str], older_than: float) -> int:
+        """
+        Deletes blobs that no task references. Blobs modified after `older_than`
+        are kept, so outputs of steps still running are not collected.
+        """
+        removed = 0
+        if not self.path.exists():
+            return removed
+        for path in self.path.glob("*/*"):
+            if path.name in live_hashes or not self.is_hash(path.name):
+                continue
+            try:
+                if path.stat().st_mtime < older_than:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+# Singleton instance of the blob store, configured from config.yaml.
+blob_store = BlobStore()
+
@@ -0,0 +1,120 @@
+import asyncio
+from dataclasses import dataclass
+
+from agent_runtime.services.blob_store import blob_store
+
+# Rough characters-per-token ratio used to estimate prompt sizes without a tokenizer.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimates the number of tokens in a piece of text."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class StepOutput:
+    """
+    The output of a finished plan step. Small outputs are kept inline in
+    `preview`; large ones live in the blob store under `handle`, and
+    `preview` holds only their beginning.
+    """
+    preview: str
+    size: int
+    handle: str | None = None
+
+    @classmethod
+    def inline(cls, text: str) -> "StepOutput":
+        """Wraps text that is kept in memory, such as the task prompt."""
+        return cls(preview=text, size=len(text.encode("utf-8")))
+
+    @classmethod
+    async def from_text(cls, text: str) -> "StepOutput":
+        """
+        Wraps a step output, moving it to the blob store when it is larger than
+        `inline_bytes`. The hashing and writing happen in a worker thread.
+        """
+        data = text.encode("utf-8")
+        if len(data) <= blob_store.inline_bytes:
+            return cls.inline(text)
+        handle = await asyncio.to_thread(blob_store.put, data)
+        return cls(preview=blob_store.preview(text), size=len(data), handle=handle)
+
+    @property
+    def tokens(self) -> int:
+        return -(-self.size // CHARS_PER_TOKEN)
+
+    def text(self) -> str:
+        """Returns the full output, reading it from the blob store if needed."""
+        return blob_store.read_text(self.handle) if self.handle else self.preview
+
+    def head(self, size: int) -> str:
+        return blob_store.read_text(self.handle, 0, size) if self.handle else self.preview[:size]
+
+    def tail(self, size: int) -> str:
+        if self.handle:
+            return blob_store.read_text(self.handle, max(0, self.size - size))
+        return self.preview[max(0, len(self.preview) - size):]
+
+    def describe(self) -> str:
+        """A short form for logs and events: the preview plus the handle of the full output."""
+        if self.handle is None:
+            return self.preview
+        return f"{self.preview} [artifact {self.handle}, {self.size} bytes]"
+
+
+class ContextManager:
+    """
+    Keeps executor prompts within a token budget.
+
+    Step outputs larger than `max_result_tokens` are passed to later prompts
+    in a compacted form (head and tail, or a model summary) instead of the
+    full text. Large outputs are kept in the blob store, and the executor can
+    page through them by handle when it really needs to.
+    """
+
+    def __init__(self):
+        self.max_prompt_tokens = 4000
+        self.max_result_tokens = 1000
+        self.strategy = "truncate"
+
+    def configure(self, settings: dict | None):
+        """Applies the `context` block of config.yaml."""
+        settings = settings or {}
+        self.max_prompt_tokens = int(settings.get("max_prompt_tokens", self.max_prompt_tokens))
+        self.max_result_tokens = int(settings.get("max_result_tokens", self.max_result_tokens))
+        self.strategy = settings.get("strategy", self.strategy)
+        if self.strategy not in ("truncate", "summarize"):
+            raise ValueError(f"Unknown context strategy '{self.strategy}'. Expected 'truncate' or 'summarize'.")
+
+    def needs_compaction(self, output: StepOutput, budget: int | None = None) -> bool:
+        return output.tokens > (budget if budget is not None else self.max_result_tokens)
+
+    def budget_per_result(self, fixed_text: str, result_count: int) -> int:
+        """Splits what is left of the prompt budget after `fixed_text` evenly between dependency results."""
+        if result_count == 0:
+            return self.max_result_tokens
+        remaining = max(0, self.max_prompt_tokens - estimate_tokens(fixed_text))
+        return max(1, min(self.max_result_tokens, remaining // result_count))
+
+    @staticmethod
+    def truncate(output: StepOutput, budget: int) -> str:
+        """Keeps the head and tail of an output within `budget` tokens and notes what was left out."""
+        limit = budget * CHARS_PER_TOKEN
+        if output.size <= limit:
+            return output.text()
+        head = output.head(limit * 3 // 4)
+        tail = output.tail(limit // 4)
+        omitted = output.size - limit
+        where = f" Full output: read_step_output('{output.handle}')." if output.handle else ""
+        return f"{head}\n[... about {omitted} bytes omitted.{where} ...]\n{tail}"
+
+    def read(self, handle: str, offset: int = 0, max_bytes: int | None = None) -> str:
+        """Reads part of a stored step output by handle."""
+        if not blob_store.exists(handle):
+            raise KeyError(f"Unknown step output handle '{handle}'.")
+        return blob_store.read_text(handle, offset, max_bytes or self.max_result_tokens * CHARS_PER_TOKEN)
+
+
+# Singleton instance of the context manager, configured from config.yaml.
+context_manager = ContextManager()
@@ -0,0 +1,256 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+DONE = "[DONE]"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Event:
+    """
+    A task event and its id, which is unique and increasing per task, with
+    the W3C `traceparent` of the span it was published in, if traced.
+    """
+    id: str
+    data: str
+    traceparent: str | None = None
+
+
+def event_order(event_id: str) -> tuple[int, int]:
+    """
+    Returns a sort key for an event id. In-memory ids are plain counters
+    ("42"), Redis stream ids are "<milliseconds>-<sequence>".
+    Raises ValueError for anything else.
+    """
+    first, _, second = event_id.partition("-")
+    return int(first), int(second or 0)
+
+
+# Called with every new event for a task that has subscribers in this process.
+Deliver = Callable[[str, Event], None]
+
+
+class EventBackend(ABC):
+    """
+    Stores task events and delivers new ones to the subscribers of this process.
+
+    `publish` never blocks. Events published for a task are delivered, in
+    order, to `deliver` for as long as the task is watched, and the most
+    recent ones can be replayed.
+    """
+
+    def __init__(self, buffer_size: int, grace_seconds: float):
+        self.buffer_size = buffer_size
+        self.grace_seconds = grace_seconds
+        self._deliver: Deliver = lambda task_id, event: None
+
+    def bind(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def start(self):
+        """Starts any background work the backend needs."""
+
+    async def close(self):
+        """Stops background work and releases connections."""
+
+    @abstractmethod
+    def publish(self, task_id: str, message: str, traceparent: str | None = None):
+        """Appends an event to a task's log. A `[DONE]` event starts the task's grace period."""
+
+    @abstractmethod
+    async def replay(self, task_id: str, after: str | None) -> list[Event]:
+        """Returns the buffered events of a task after the given id (all of them for None)."""
+
+    @abstractmethod
+    async def has_events(self, task_id: str) -> bool:
+        """Whether any events of the task are still buffered."""
+
+    @abstractmethod
+    def discard(self, task_id: str):
+        """Drops a task's buffered events."""
+
+    async def watch(self, task_id: str):
+        """Starts delivering a task's new events to this process."""
+
+    async def unwatch(self, task_id: str):
+        """Stops delivering a task's new events to this process."""
+
+
+class InMemoryEventBackend(EventBackend):
+    """
+    The default backend: a ring buffer per task, local to the process.
+    Only subscribers connected to the process running a task see its events.
+    """
+
+    def __init__(self, buffer_size: int, grace_seconds: float):
+        super().__init__(buffer_size, grace_seconds)
+        self._buffers: Dict[str, deque[Event]] = {}
+        self._next_ids: Dict[str, int] = {}
+
+    def publish(self, task_id: str, message: str, traceparent: str | None = None):
+        buffer = self._buffers.get(task_id)
+        if buffer is None:
+            buffer = self._buffers[task_id] = deque(maxlen=self.buffer_size)
+        event_id = self._next_ids.get(task_id, 1)
+        self._next_ids[task_id] = event_id + 1
+        event = Event(str(event_id), message, traceparent)
+        buffer.append(event)
+        if message == DONE:
+            asyncio.get_running_loop().call_later(self.grace_seconds, self._free, task_id, buffer)
+        self._deliver(task_id, event)
+
+    def _free(self, task_id: str, buffer: deque):
+        if self._buffers.get(task_id) is buffer:
+            self.discard(task_id)
+
+    async def replay(self, task_id: str, after: str | None) -> list[Event]:
+        after_key = event_order(after) if after else (0, 0)
+        return [event for event in self._buffers.get(task_id, ()) if event_order(event.id) > after_key]
+
+    async def has_events(self, task_id: str) -> bool:
+        return task_id in self._buffers
+
+    def discard(self, task_id: str):
+        self._buffers.pop(task_id, None)
+        self._next_ids.pop(task_id, None)
+
+
+class RedisEventBackend(EventBackend):
+    """
+    Keeps each task's events in a Redis stream, capped at about `buffer_size`
+    entries and expiring `grace_seconds` after `[DONE]`, so any worker or
+    replica can replay and follow a task run by another.
+
+    Publishing appends to an in-process queue that a single writer drains in
+    order. Each process follows the tasks its clients are watching with one
+    blocking XREAD loop per task.
+
+    Needs Redis 6.2 or later, for the exclusive ranges ("(<id>") that replay
+    uses to resume after the last event a client saw.
+    """
+
+    def __init__(self, url: str, buffer_size: int, grace_seconds: float, key_prefix: str = "agent_runtime:events:"):
+        super().__init__(buffer_size, grace_seconds)
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError(
+                "The redis event backend needs the 'redis' package. "
+                "Install it with: pip install 'agent-runtime-service[redis]'"
+            ) from None
+        self._redis = redis.from_url(url, decode_responses=True)
+        self._key_prefix = key_prefix
+        self._outbox: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+        self._readers: Dict[str, asyncio.Task] = {}
+
+    def _key(self, task_id: str) -> str:
+        return f"{self._key_prefix}{task_id}"
+
+    async def start(self):
+        self._ensure_writer()
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            self._outbox = asyncio.Queue()
+            self._writer = asyncio.create_task(self._write_loop(), name="redis-event-writer")
+
+    async def close(self):
+        if self._writer is not None:
+            # Let queued events reach Redis before stopping.
+            await self._outbox.join()
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+        for reader in self._readers.values():
+            reader.cancel()
+        await asyncio.gather(*self._readers.values(), return_exceptions=True)
+        self._readers.clear()
+        await self._redis.aclose()
+
+    def publish(self, task_id: str, message: str, traceparent: str | None = None):
+        self._ensure_writer()
+        fields = {"data": message}
+        if traceparent:
+            fields["traceparent"] = traceparent
+        self._outbox.put_nowait(("publish", task_id, fields))
+
+    def discard(self, task_id: str):
+        self._ensure_writer()
+        self._outbox.put_nowait(("discard", task_id, None))
+
+    async def _write_loop(self):
+        while True:
+            action, task_id, fields = await self._outbox.get()
+            try:
+                if action == "publish":
+                    key = self._key(task_id)
+                    await self._redis.xadd(key, fields, maxlen=self.buffer_size, approximate=True)
+                    if fields["data"] == DONE:
+                        await self._redis.expire(key, max(1, int(self.grace_seconds)))
+                else:
+                    await self._redis.delete(self._key(task_id))
+            except Exception as e:
+                logger.warning("Failed to %s event for task %s: %s", action, task_id, e)
+            finally:
+                self._outbox.task_done()
+
+    async def replay(self, task_id: str, after: str | None) -> list[Event]:
+        start = f"({after}" if after else "-"
+        entries = await self._redis.xrange(self._key(task_id), min=start, max="+")
+        return [Event(entry_id, fields.get("data", ""), fields.get("traceparent")) for entry_id, fields in entries]
+
+    async def has_events(self, task_id: str) -> bool:
+        return bool(await self._redis.exists(self._key(task_id)))
+
+    async def watch(self, task_id: str):
+        if task_id in self._readers:
+            return
+        # Follow from the current end of the stream; anything earlier is replayed.
+        latest = await self._redis.xrevrange(self._key(task_id), count=1)
+        last_id = latest[0][0] if latest else "0-0"
+        if task_id not in self._readers:
+            self._readers[task_id] = asyncio.create_task(self._read_loop(task_id, last_id), name=f"redis-events-{task_id}")
+
+    async def unwatch(self, task_id: str):
+        reader = self._readers.pop(task_id, None)
+        if reader is not None:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+    async def _read_loop(self, task_id: str, last_id: str):
+        key = self._key(task_id)
+        while True:
+            try:
+                response = await self._redis.xread({key: last_id}, block=1000, count=100)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Failed to read events for task %s: %s", task_id, e)
+                await asyncio.sleep(1)
+                continue
+            for _, entries in response or []:
+                for entry_id, fields in entries:
+                    last_id = entry_id
+                    self._deliver(task_id, Event(entry_id, fields.get("data", ""), fields.get("traceparent")))
+
+
+def create_event_backend(settings: dict | None, buffer_size: int, grace_seconds: float) -> EventBackend:
+    """Builds an event backend from the `events` block of config.yaml."""
+    settings = settings or {}
+    backend = settings.get("backend", "memory")
+    if backend == "memory":
+        return InMemoryEventBackend(buffer_size, grace_seconds)
+    if backend == "redis":
+        return RedisEventBackend(
+            url=settings.get("redis_url", "redis://localhost:6379/0"),
+            buffer_size=buffer_size,
+            grace_seconds=grace_seconds,
+            key_prefix=settings.get("key_prefix", "agent_runtime:events:"),
+        )
+    raise ValueError(f"Unknown events backend '{backend}'. Expected 'memory' or 'redis'.")
@@ -1,31 +1,197 @@
 import asyncio
-from collections import defaultdict
+import itertools
+import logging
+import time
+from collections import deque
 from typing import Dict, AsyncGenerator
 
+from agent_runtime.services.event_backends import (
+    DONE, Event, EventBackend, InMemoryEventBackend, create_event_backend, event_order,
+)
+
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce", "disconnect")
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """
+    A bounded queue of events for one subscriber.
+
+    When the queue is full, `policy` decides what happens to a new event:
+    `drop_oldest` discards the oldest queued event, `coalesce` discards the
+    whole backlog so only the newest event is delivered, and `disconnect`
+    closes the subscription. The final `[DONE]` event is always delivered.
+    Skipped events can be recovered by resuming from the last delivered id.
+    """
+
+    def __init__(self, subscriber_id: int, task_id: str, max_queue: int, policy: str):
+        self.id = subscriber_id
+        self.task_id = task_id
+        self.max_queue = max_queue
+        self.policy = policy
+        self.connected_at = time.time()
+        self.dropped = 0
+        self.closed = False
+        self._queue: deque[tuple[float, Event]] = deque()
+        self._ready = asyncio.Event()
+
+    def offer(self, event: Event):
+        """Queues an event without blocking, applying the overflow policy when full."""
+        if self.closed:
+            return
+        if len(self._queue) >= self.max_queue and event.data != DONE:
+            if self.policy == "disconnect":
+                self.closed = True
+                self._ready.set()
+                return
+            if self.policy == "coalesce":
+                self.dropped += len(self._queue)
+                self._queue.clear()
+            else:
+                self._queue.popleft()
+                self.dropped += 1
+        self._queue.append((time.monotonic(), event))
+        self._ready.set()
+
+    async def next(self) -> Event | None:
+        """Waits for the next event. Returns None once the subscription has been closed."""
+        while not self._queue or self.closed:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        _, event = self._queue.popleft()
+        return event
+
+    def stats(self) -> dict:
+        oldest = time.monotonic() - self._queue[0][0] if self._queue else 0.0
+        return {
+            "id": self.id,
+            "task_id": self.task_id,
+            "policy": self.policy,
+            "queued": len(self._queue),
+            "lag_seconds": oldest,
+            "dropped": self.dropped,
+            "disconnected": self.closed,
+            "connected_seconds": time.time() - self.connected_at,
+        }
+
+
 class LiveEventService:
     """
     A service for publishing and subscribing to live, task-specific events.
-    This uses a simple in-memory pub/sub model. For a production system,
-    this might be replaced with a more robust message queue like Redis Pub/Sub.
+    Events are stored and carried by a pluggable backend: in memory by
+    default, or Redis so that a stream can be served by any worker or
+    replica, whichever one runs the task.
+
+    Every task keeps its last `buffer_size` events, in order, so a subscriber
+    that connects late, or reconnects with the id of the last event it saw,
+    is sent what it missed before live events. A task's events are freed
+    `grace_seconds` after its `[DONE]` event.
+
+    Publishing never waits on subscribers: each has a queue of at most
+    `subscriber_queue_size` events, and a slow one loses events according to
+    `overflow_policy` instead of growing memory or holding up the others.
     """
     def __init__(self):
-        self._subscribers: Dict[str, list] = defaultdict(list)
+        self.buffer_size = 1000
+        self.grace_seconds = 300.0
+        self.subscriber_queue_size = 100
+        self.overflow_policy = "drop_oldest"
+        self._subscribers: Dict[str, list[Subscriber]] = {}
+        self._subscriber_ids = itertools.count(1)
+        self._counters = {"dropped": 0, "disconnected": 0}
+        self.backend: EventBackend = InMemoryEventBackend(self.buffer_size, self.grace_seconds)
+        self.backend.bind(self._deliver)
+
+    def configure(self, settings: dict | None):
+        """Applies the `events` block of config.yaml."""
+        settings = settings or {}
+        self.buffer_size = int(settings.get("buffer_size", self.buffer_size))
+        self.grace_seconds = float(settings.get("grace_seconds", self.grace_seconds))
+        self.subscriber_queue_size = max(1, int(settings.get("subscriber_queue_size", self.subscriber_queue_size)))
+        self.overflow_policy = settings.get("overflow_policy", self.overflow_policy)
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow_policy '{self.overflow_policy}'. Expected one of: {', '.join(OVERFLOW_POLICIES)}."
+            )
+        self.backend = create_event_backend(settings, self.buffer_size, self.grace_seconds)
+        self.backend.bind(self._deliver)
+
+    async def start(self):
+        await self.backend.start()
+
+    async def shutdown(self):
+        await self.backend.close()
+
+    async def has_events(self, task_id: str) -> bool:
+        return await self.backend.has_events(task_id)
 
     async def publish(self, task_id: str, message: str):
         """Publish a message to all subscribers of a given task_id."""
-        for queue in self._subscribers.get(task_id, []):
-            await queue.put(message)
+        self.publish_nowait(task_id, message)
+
+    def publish_nowait(self, task_id: str, message: str, traceparent: str | None = None):
+        """
+        Like `publish`, for synchronous callers. Events are numbered in the
+        order they are published. `traceparent` ties the event to a trace span.
+        """
+        self.backend.publish(task_id, message, traceparent)
+
+    def _deliver(self, task_id: str, event: Event):
+        for subscriber in self._subscribers.get(task_id, ()):
+            subscriber.offer(event)
 
-    async def subscribe(self, task_id: str) -> AsyncGenerator[str, None]:
-        """Subscribe to messages for a given task_id."""
-        queue = asyncio.Queue()
-        self._subscribers[task_id].append(queue)
+    def discard(self, task_id: str):
+        """Frees a task's buffered events immediately."""
+        self.backend.discard(task_id)
+
+    async def subscribe(self, task_id: str, last_event_id: str | None = None) -> AsyncGenerator[Event, None]:
+        """
+        Subscribe to events for a given task_id.
+        Buffered events after `last_event_id` are replayed first. The stream
+        ends early if the subscriber is disconnected for falling behind.
+        """
+        subscriber = Subscriber(next(self._subscriber_ids), task_id, self.subscriber_queue_size, self.overflow_policy)
+        # Live delivery starts before the replay is read; events seen in both are skipped below.
+        self._subscribers.setdefault(task_id, []).append(subscriber)
         try:
+            await self.backend.watch(task_id)
+            last_seen = event_order(last_event_id) if last_event_id else (0, 0)
+            for event in await self.backend.replay(task_id, last_event_id):
+                last_seen = event_order(event.id)
+                yield event
             while True:
-                message = await queue.get()
-                yield message
+                event = await subscriber.next()
+                if event is None:
+                    logger.warning(
+                        "Disconnected slow subscriber %d of task %s.", subscriber.id, task_id, extra={"task_id": task_id}
+                    )
+                    return
+                if event_order(event.id) > last_seen:
+                    last_seen = event_order(event.id)
+                    yield event
         finally:
-            self._subscribers[task_id].remove(queue)
+            subscribers = self._subscribers[task_id]
+            subscribers.remove(subscriber)
+            if not subscribers:
+                del self._subscribers[task_id]
+                await self.backend.unwatch(task_id)
+            self._counters["dropped"] += subscriber.dropped
+            self._counters["disconnected"] += int(subscriber.closed)
+
+    def stats(self) -> dict:
+        """Returns per-subscriber queue depth, lag and drops."""
+        subscribers = [subscriber.stats() for group in self._subscribers.values() for subscriber in group]
+        return {
+            "backend": type(self.backend).__name__,
+            "overflow_policy": self.overflow_policy,
+            "subscribers": subscribers,
+            "dropped_total": self._counters["dropped"] + sum(s["dropped"] for s in subscribers),
+            "disconnected_total": self._counters["disconnected"],
+        }
+
 
 # Singleton instance of the event service
-event_service = LiveEventService() 
\ No newline at end of file
+event_service = LiveEventService()
@@ -0,0 +1,168 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+
+from agent_runtime.services.tracing import tracer
+
+# All of the service's loggers live under this one; each module logs to
+# logging.getLogger(__name__).
+ROOT_LOGGER = "agent_runtime"
+
+LOG_FORMATS = ("text", "json")
+
+# Attributes every LogRecord has; anything else was passed through `extra=`.
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+
+def truncate(text: str, limit: int) -> str:
+    """Cuts `text` to `limit` characters, noting how much was left out."""
+    if limit <= 0 or len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text) - limit} more chars]"
+
+
+def _extras(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES}
+
+
+class TextFormatter(logging.Formatter):
+    """One readable line per record: time, level, logger, trace ids, message and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        extras = _extras(record)
+        trace = ""
+        if "trace_id" in extras:
+            trace = f" [trace={extras.pop('trace_id')} span={extras.pop('span_id')}]"
+        fields = "".join(f" {key}={value}" for key, value in extras.items())
+        line = (
+            f"{datetime.fromtimestamp(record.created).isoformat(sep=' ', timespec='milliseconds')} "
+            f"{record.levelname:<7} {record.name}{trace}: {record.getMessage()}{fields}"
+        )
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with extra fields (task_id, trace_id, ...) as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **_extras(record),
+        }
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread through a bounded queue. The calling
+    thread only resolves the message, cutting it to `max_message_chars`, and
+    notes the current trace; formatting and writing happen on the writer
+    thread. Records that find the queue full are dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue, max_message_chars: int):
+        super().__init__(log_queue)
+        self.max_message_chars = max_message_chars
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = truncate(record.getMessage(), self.max_message_chars)
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        for key, value in _extras(record).items():
+            if isinstance(value, str):
+                setattr(record, key, truncate(value, self.max_message_chars))
+        span = tracer.current()
+        if span is not None and not hasattr(record, "trace_id"):
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room: the queue may be full of records still to be written.
+        self.queue.put(self._sentinel)
+
+
+class LoggingSetup:
+    """
+    Configures the service's loggers.
+
+    Records at or above `level` are put on a bounded queue and written to
+    stdout, as text or JSON lines, by a background listener thread, so a
+    slow log pipe never blocks the event loop. Prompts and step outputs are
+    logged at DEBUG, so the default INFO level skips them without even
+    building the message.
+    """
+
+    def __init__(self):
+        self.level = "INFO"
+        self.format = "text"
+        self.max_message_chars = 2000
+        self.queue_size = 10000
+        self._handler: DroppingQueueHandler | None = None
+        self._listener: _QueueListener | None = None
+
+    def configure(self, settings: dict | None):
+        """Applies the `logging` block of config.yaml and starts the writer thread."""
+        settings = settings or {}
+        self.level = str(settings.get("level", self.level)).upper()
+        self.format = settings.get("format", self.format)
+        if self.format not in LOG_FORMATS:
+            raise ValueError(f"Unknown logging format '{self.format}'. Expected one of: {', '.join(LOG_FORMATS)}.")
+        self.max_message_chars = int(settings.get("max_message_chars", self.max_message_chars))
+        self.queue_size = max(1, int(settings.get("queue_size", self.queue_size)))
+
+        self.shutdown()
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter() if self.format == "json" else TextFormatter())
+        log_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        self._handler = DroppingQueueHandler(log_queue, self.max_message_chars)
+        self._listener = _QueueListener(log_queue, stream)
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.handlers = [self._handler]
+        root.setLevel(self.level)
+        root.propagate = False
+        for name, level in (settings.get("loggers") or {}).items():
+            logging.getLogger(name).setLevel(str(level).upper())
+        self._listener.start()
+
+    def shutdown(self):
+        """Writes the records still queued and stops the writer thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def stats(self) -> dict:
+        return {
+            "level": self.level,
+            "format": self.format,
+            "queued": self._handler.queue.qsize() if self._handler else 0,
+            "dropped": self._handler.dropped if self._handler else 0,
+        }
+
+
+# Singleton instance of the logging setup, configured first thing from config.yaml.
+logging_setup = LoggingSetup()
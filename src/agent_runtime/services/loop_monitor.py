@@ -0,0 +1,64 @@
+import asyncio
+import time
+from collections import deque
+
+from agent_runtime.services.metrics import LOOP_LAG_SECONDS
+
+
+class LoopMonitor:
+    """
+    Measures event-loop stalls by sleeping for a fixed interval and recording
+    how much later than requested the loop woke up. Anything that blocks the
+    loop, such as synchronous disk I/O, shows up as lag.
+    """
+
+    def __init__(self):
+        self.interval = 0.1
+        self._lags: deque[float] = deque(maxlen=1000)
+        self._max_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    def configure(self, settings: dict | None):
+        """Applies the `loop_monitor` block of config.yaml."""
+        settings = settings or {}
+        self.interval = float(settings.get("interval_seconds", self.interval))
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="loop-monitor")
+
+    async def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - started - self.interval)
+            self._lags.append(lag)
+            LOOP_LAG_SECONDS.observe(lag)
+            self._max_lag = max(self._max_lag, lag)
+
+    def stats(self) -> dict:
+        """Returns recent event-loop lag in seconds."""
+        lags = sorted(self._lags)
+        return {
+            "samples": len(lags),
+            "interval_seconds": self.interval,
+            "lag_seconds": {
+                "avg": sum(lags) / len(lags) if lags else 0.0,
+                "p99": lags[int(len(lags) * 0.99)] if lags else 0.0,
+                "max_recent": lags[-1] if lags else 0.0,
+                "max": self._max_lag,
+            },
+        }
+
+
+# Singleton instance of the loop monitor, started and stopped by the app lifespan.
+loop_monitor = LoopMonitor()
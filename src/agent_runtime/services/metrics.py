@@ -0,0 +1,198 @@
+import bisect
+import logging
+import math
+from abc import ABC, abstractmethod
+from typing import Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Buckets for latencies from milliseconds to minutes, in seconds.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        """Yields the metric's sample lines in the text exposition format."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A value that only goes up, per combination of label values."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def set_total(self, value: float, *label_values: str):
+        """Sets the total directly, for counts that are kept elsewhere and read when scraped."""
+        self._values[label_values] = value
+
+    def _samples(self) -> Iterable[str]:
+        for values, total in self._values.items():
+            yield f"{self.name}{_format_labels(self.label_names, values)} {_format_value(total)}"
+
+
+class Gauge(_Metric):
+    """A value that can go up and down, usually set when metrics are scraped."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, *label_values: str):
+        self._values[label_values] = value
+
+    def clear(self):
+        """Forgets all label combinations, e.g. before re-reading a set of servers that may have shrunk."""
+        self._values.clear()
+
+    def _samples(self) -> Iterable[str]:
+        for values, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.label_names, values)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """
+    Counts observations into fixed buckets, per combination of label values.
+    An observation is a bisect and three additions into preallocated lists;
+    cumulative counts are only worked out when scraped.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: [count per bucket, plus one for +Inf], sum, count.
+        self._series: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def _samples(self) -> Iterable[str]:
+        for values, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.label_names, values, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, values)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class MetricsRegistry:
+    """
+    The service's metrics, rendered in the Prometheus text format.
+
+    Metrics are only updated from the event loop thread, so they take no
+    locks. Values that other services already track, such as queue depths,
+    are read by collectors when the metrics are scraped instead of being
+    updated on every change.
+    """
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def collector(self, collect: Callable[[], None]) -> Callable[[], None]:
+        """Registers a function that updates metrics just before they are rendered."""
+        self._collectors.append(collect)
+        return collect
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            try:
+                collect()
+            except Exception as e:
+                logger.warning("Collector %s failed: %s", getattr(collect, "__name__", collect), e)
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+# Singleton registry of the service's metrics, served at /metrics.
+metrics = MetricsRegistry()
+
+# Updated where the work happens.
+TOOL_CALL_SECONDS = metrics.histogram(
+    "agent_runtime_tool_call_seconds", "Duration of tool calls made by agents.", ["tool"]
+)
+LLM_CALL_SECONDS = metrics.histogram(
+    "agent_runtime_llm_call_seconds", "Duration of model calls, per agent.", ["agent"]
+)
+LLM_TOKENS = metrics.counter(
+    "agent_runtime_llm_tokens_total", "Tokens used by model calls, per agent and direction.", ["agent", "direction"]
+)
+LOOP_LAG_SECONDS = metrics.histogram(
+    "agent_runtime_event_loop_lag_seconds", "How late the event loop woke up for the lag probe.",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+# Read from the services when scraped.
+TASKS = metrics.gauge("agent_runtime_tasks", "Stored tasks, per status.", ["status"])
+ACTIVE_ORCHESTRATORS = metrics.gauge("agent_runtime_active_orchestrators", "Task orchestrators held in this process.")
+MCP_SERVER_PROCESSES = metrics.gauge(
+    "agent_runtime_mcp_server_processes", "Live MCP server instances in the pool, per tool server id.", ["server"]
+)
+SCHEDULER_QUEUE_DEPTH = metrics.gauge("agent_runtime_scheduler_queue_depth", "Jobs waiting for a scheduler worker.")
+SCHEDULER_BUSY_WORKERS = metrics.gauge("agent_runtime_scheduler_busy_workers", "Scheduler workers running a job.")
+EVENT_SUBSCRIBERS = metrics.gauge("agent_runtime_event_subscribers", "Connected task event stream clients.")
+EVENT_QUEUED = metrics.gauge("agent_runtime_event_subscriber_queued_max", "Most events queued for any one stream client.")
+EVENT_LAG_SECONDS = metrics.gauge(
+    "agent_runtime_event_subscriber_lag_seconds_max", "Age of the oldest event queued for any one stream client."
+)
+EVENTS_DROPPED = metrics.counter("agent_runtime_events_dropped_total", "Events dropped for stream clients that fell behind.")
+LOOP_LAG_MAX = metrics.gauge("agent_runtime_event_loop_lag_seconds_max", "Largest event-loop lag seen since start.")
+LOG_RECORDS_DROPPED = metrics.counter("agent_runtime_log_records_dropped_total", "Log records dropped because the log queue was full.")
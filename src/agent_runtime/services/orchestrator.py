@@ -1,31 +1,166 @@
 import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, Awaitable, Callable
 
-from agent_runtime.services.agent_service import AgentService
-from agent_runtime.services.tool_registry import ToolRegistry
+from agent_runtime.services.agent_service import AgentService, PlanGeneration
+from agent_runtime.services.server_pool import ServerLease, server_pool
 from agent_runtime.services import task_manager
 from agent_runtime.constants import PROJECT_ROOT
 from agent_runtime.services.event_service import event_service
+from agent_runtime.services.context import StepOutput
+from agent_runtime.services.plan import Plan, PlanStep, plan_from_task
+from agent_runtime.services.plan_cache import CachedPlan, plan_cache
+from agent_runtime.services.single_flight import SingleFlight
+from agent_runtime.services.task_logger import task_log_writer
+from agent_runtime.services.tool_manifests import servers_named_in
+from agent_runtime.services.tracing import tracer
 
 CONFIG_PATH = PROJECT_ROOT / "config.yaml"
-LOGS_DIR = PROJECT_ROOT / "logs"
+
+logger = logging.getLogger(__name__)
 
 class OrchestratorManager:
     """A singleton-like manager to hold active TaskOrchestrator instances."""
     _instances: dict[str, "TaskOrchestrator"] = {}
+    max_parallel_steps: int = 4
+    # Concurrent planning of the same prompt against the same tools runs once.
+    plan_flights = SingleFlight("plans")
+
+    @classmethod
+    def configure(cls, settings: dict | None):
+        """Applies the `execution` block of config.yaml."""
+        settings = settings or {}
+        cls.max_parallel_steps = max(1, int(settings.get("max_parallel_steps", cls.max_parallel_steps)))
 
     @classmethod
     def get_orchestrator(cls, task_id: str, prompt: str | None = None) -> "TaskOrchestrator":
         if task_id not in cls._instances:
             if prompt is None:
                 raise ValueError("Prompt must be provided to create a new orchestrator.")
-            cls._instances[task_id] = TaskOrchestrator(task_id, prompt)
+            cls._instances[task_id] = TaskOrchestrator(task_id, prompt, max_parallel_steps=cls.max_parallel_steps)
         return cls._instances[task_id]
 
     @classmethod
     def cleanup_orchestrator(cls, task_id: str):
         if task_id in cls._instances:
             del cls._instances[task_id]
+            task_log_writer.close(task_id)
+
+class SchedulerFullError(Exception):
+    """Raised when the scheduler queue cannot take any more work."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Scheduler queue is full.")
+        self.retry_after = retry_after
+
+
+class TaskScheduler:
+    """
+    Runs planning and execution jobs on a fixed number of worker coroutines,
+    fed from a bounded priority queue. When the queue is full new work is
+    rejected instead of piling up, so bursts degrade gracefully.
+    """
+
+    PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+    def __init__(self):
+        self.workers = 4
+        self.max_queue_size = 100
+        self.retry_after_seconds = 5
+        self._queue: asyncio.PriorityQueue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self._busy = 0
+        self._wait_times: deque[float] = deque(maxlen=1000)
+        self._counters = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    def configure(self, settings: dict | None):
+        """Applies the `scheduler` block of config.yaml."""
+        settings = settings or {}
+        self.workers = int(settings.get("workers", self.workers))
+        self.max_queue_size = int(settings.get("max_queue_size", self.max_queue_size))
+        self.retry_after_seconds = int(settings.get("retry_after_seconds", self.retry_after_seconds))
+
+    @property
+    def queue(self) -> asyncio.PriorityQueue:
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue(maxsize=self.max_queue_size)
+        return self._queue
+
+    def full(self) -> bool:
+        return self.queue.full()
+
+    async def start(self):
+        """Starts the worker coroutines."""
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"task-scheduler-{i}") for i in range(self.workers)
+            ]
+
+    async def shutdown(self):
+        """Stops the workers. Jobs still queued are dropped."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job: Callable[..., Awaitable[Any]], *args: Any, priority: str = "normal", task_id: str | None = None):
+        """
+        Queues a job to run on a worker. The time it waits in the queue is
+        added to the `queue_wait` timing of `task_id`, if given.
+        Raises SchedulerFullError when the queue is at capacity.
+        """
+        item = (self.PRIORITIES.get(priority, self.PRIORITIES["normal"]), next(self._sequence), time.monotonic(), job, args, task_id)
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._counters["rejected"] += 1
+            raise SchedulerFullError(self.retry_after_seconds) from None
+        self._counters["submitted"] += 1
+
+    async def _worker(self):
+        while True:
+            _, _, enqueued_at, job, args, task_id = await self.queue.get()
+            wait = time.monotonic() - enqueued_at
+            self._wait_times.append(wait)
+            if task_id is not None:
+                task_manager.record_timing(task_id, "queue_wait", wait)
+            self._busy += 1
+            try:
+                await job(*args)
+                self._counters["completed"] += 1
+            except Exception as e:
+                self._counters["failed"] += 1
+                logger.error("Scheduler job %s failed: %s", getattr(job, "__name__", job), e, extra={"task_id": task_id})
+            finally:
+                self._busy -= 1
+                self.queue.task_done()
+
+    def stats(self) -> dict:
+        """Returns queue depth, worker utilisation and recent queue wait times."""
+        waits = sorted(self._wait_times)
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue_size": self.max_queue_size,
+            "workers": len(self._workers),
+            "busy_workers": self._busy,
+            **self._counters,
+            "wait_seconds": {
+                "avg": sum(waits) / len(waits) if waits else 0.0,
+                "p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+                "max": waits[-1] if waits else 0.0,
+            },
+        }
+
+
+# Singleton instance of the scheduler, started and stopped by the app lifespan.
+scheduler = TaskScheduler()
+
 
 class TaskOrchestrator:
     """
@@ -33,46 +168,142 @@ class TaskOrchestrator:
     This ensures that the AgentService and its tools persist for the task's duration.
     """
 
-    def __init__(self, task_id: str, prompt: str):
+    def __init__(self, task_id: str, prompt: str, max_parallel_steps: int = 4):
         self.task_id = task_id
         self.prompt = prompt
-        self.tool_registry = ToolRegistry()
+        self.max_parallel_steps = max_parallel_steps
         self.agent_service: AgentService | None = None
         self.active_servers: list | None = None
-        LOGS_DIR.mkdir(exist_ok=True)
-        self.log_file = LOGS_DIR / f"task_{self.task_id}.log"
+        self._lease: ServerLease | None = None
+        self.last_active = time.monotonic()
+        self.log_file = task_log_writer.path_for(self.task_id)
         self._log(f"Orchestrator initialized for task {self.task_id}.")
 
     def _log(self, message: str):
-        """Logs a message to the task-specific log file."""
-        with open(self.log_file, "a") as f:
-            f.write(f"[{datetime.now()}] {message}\\n")
-        asyncio.create_task(event_service.publish(self.task_id, message))
+        """
+        Logs a message to the task-specific log file, written in the background,
+        and publishes it as a task event. Both carry the ids of the current span.
+        """
+        self.last_active = time.monotonic()
+        span = tracer.current()
+        trace = f"[trace={span.trace_id} span={span.span_id}] " if span else ""
+        task_log_writer.write(self.task_id, f"[{datetime.now()}] {trace}{message}\n")
+        event_service.publish_nowait(self.task_id, message, traceparent=span.traceparent if span else None)
 
-    async def initialize(self):
-        """Starts the tool servers for the duration of the task."""
+    async def _acquire(self, server_ids: list[str] | None = None):
+        """Leases the given tool servers (all enabled servers by default) from the shared pool."""
+        if self._lease is None:
+            with tracer.span("servers.acquire", servers=", ".join(server_ids) if server_ids else "all"):
+                self._log(f"Acquiring tool servers: {', '.join(server_ids) if server_ids else 'all'}...")
+                started = time.perf_counter()
+                self._lease = await server_pool.acquire(server_ids)
+                task_manager.record_timing(self.task_id, "server_startup", time.perf_counter() - started)
+                self.active_servers = self._lease.servers
+                self._log("Tool servers acquired.")
+
+    async def initialize(self, server_ids: list[str] | None = None):
+        """Leases tool servers for the duration of the task and sets up the agents."""
         if self.active_servers is None:
-            self._log("Initializing tool servers...")
-            self.active_servers = await self.tool_registry.start_servers()
+            await self._acquire(server_ids)
             self.agent_service = AgentService(mcp_servers=self.active_servers)
-            self._log("Tool servers initialized.")
 
-    async def shutdown(self):
-        """Shuts down the tool servers."""
-        if self.active_servers is not None:
-            self._log("Shutting down tool servers...")
-            await self.tool_registry.shutdown_servers()
-            self.active_servers = None
-            self._log("Tool servers shut down.")
+    async def shutdown(self, failed: bool = False):
+        """Returns the leased tool servers to the shared pool."""
+        if self._lease is not None:
+            with tracer.span("servers.release", failed=failed):
+                self._log("Releasing tool servers...")
+                self._lease.failed = failed
+                started = time.perf_counter()
+                await server_pool.release(self._lease)
+                task_manager.record_timing(self.task_id, "shutdown", time.perf_counter() - started)
+                self._lease = None
+                self.active_servers = None
+                self._log("Tool servers released.")
 
     async def create_plan(self):
-        """Creates a plan for the task."""
+        """
+        Creates a plan for the task. Tasks planning the same prompt at the same
+        time share a single planner run; the tasks that joined it are recorded
+        as plan cache hits.
+        """
         self._log(f"Beginning Plan Creation for prompt: '{self.prompt[:50]}...'")
-        await self.initialize()
-        plan = await self.agent_service.create_plan(task_prompt=self.prompt)
-        task_manager.update_task_plan(self.task_id, plan)
-        self._log("Plan Generation Finished.")
-        self._log(f"Generated Plan:\\n{plan}")
+        fingerprint = server_pool.tool_fingerprint()
+        key = plan_cache.key_for(self.prompt, fingerprint)
+        coalesced = OrchestratorManager.plan_flights.in_flight(key)
+        started = time.perf_counter()
+        outcome = await OrchestratorManager.plan_flights.do(key, lambda: _generate_plan(self.prompt, fingerprint))
+        task_manager.record_timing(self.task_id, "planning", time.perf_counter() - started)
+        generation = outcome.generation
+        if generation is not None and not coalesced:
+            # The task that started the run is charged for it.
+            task_manager.record_plan_usage(self.task_id, generation.usage)
+            task_manager.record_timing(self.task_id, "planner_llm", generation.timings["llm_seconds"])
+            if outcome.server_startup is not None:
+                task_manager.record_timing(self.task_id, "server_startup", outcome.server_startup)
+        elif coalesced:
+            self._log("Joined the planner run of an identical request in flight.")
+        self._plan_ready(outcome.plan, outcome.tool_servers, cache_hit=generation is None or coalesced)
+
+    def use_cached_plan(self, cached: CachedPlan):
+        """Gives the task a plan from the plan cache, reported the same way as a generated one."""
+        self._log(f"Reusing the cached plan for prompt: '{self.prompt[:50]}...'")
+        self._plan_ready(cached.plan, cached.tool_servers, cache_hit=True)
+
+    def _plan_ready(self, plan: Plan, tool_servers: list[str] | None, cache_hit: bool):
+        task_manager.update_task_plan(self.task_id, plan, tool_servers=tool_servers, cache_hit=cache_hit)
+        self._log(f"Plan Generation Finished. Tool servers needed: {', '.join(tool_servers) if tool_servers else 'all'}.")
+        self._log(f"Generated Plan:\n{plan.to_text()}")
+
+    async def _execute_steps(self, plan: Plan) -> dict[int, StepOutput]:
+        """
+        Runs the plan's steps as a DAG: each step starts as soon as the steps it
+        depends on have finished, with at most `max_parallel_steps` running at
+        once. Each step receives the outputs of its declared dependencies;
+        large outputs travel as blob store handles, not strings.
+        Returns the output of every step, keyed by step number.
+        """
+        results: dict[int, StepOutput] = {}
+        running: dict[int, asyncio.Task] = {}
+        limit = asyncio.Semaphore(self.max_parallel_steps)
+
+        async def run_step(step: PlanStep) -> StepOutput:
+            queued = time.perf_counter()
+            await asyncio.gather(*(running[number] for number in step.depends_on))
+            with tracer.span("step", **{"step.number": step.number, "step.description": step.description}):
+                async with limit:
+                    started = time.perf_counter()
+                    self._log(f"Executing step {step.number}/{len(plan.steps)}: {step.description}")
+                    task_manager.update_task_result(self.task_id, "executing", f"Executing step {step.number}: {step.description}")
+                    execution = await self.agent_service.execute_step(
+                        task_prompt=self.prompt,
+                        plan=plan,
+                        step=step,
+                        dependency_results={number: results[number] for number in step.depends_on},
+                    )
+                    finished = time.perf_counter()
+                output = execution.output
+                results[step.number] = output
+                timings = {**execution.timings, "wait_seconds": started - queued, "seconds": finished - started}
+                task_manager.record_step_usage(self.task_id, step.number, execution.usage, timings)
+                if output.handle:
+                    task_manager.record_artifact(self.task_id, step.number, output.handle, output.size)
+                self._log(f"Finished step {step.number}. Result: {output.describe()}")
+                self._log(
+                    f"Step {step.number} used {execution.usage['total_tokens']} tokens; its context was "
+                    f"{execution.usage['context_tokens']} of {execution.usage['uncompacted_context_tokens']} estimated tokens."
+                )
+                return output
+
+        for step in plan.steps:
+            running[step.number] = asyncio.create_task(run_step(step))
+        try:
+            await asyncio.gather(*running.values())
+        except BaseException:
+            for pending in running.values():
+                pending.cancel()
+            await asyncio.gather(*running.values(), return_exceptions=True)
+            raise
+        return results
 
     async def execute_plan(self):
         """Executes the approved plan for the task."""
@@ -85,26 +316,19 @@ class TaskOrchestrator:
             await event_service.publish(self.task_id, "[DONE]")
             return
 
-        await self.initialize()
-
-        plan = task["plan"]
-        plan_steps = [
-            line.strip()
-            for line in plan.strip().split("\n")
-            if line.strip() and line.strip()[0].isdigit()
-        ]
-
-        last_result = None
-        for i, step in enumerate(plan_steps):
-            self._log(f"Executing step {i+1}/{len(plan_steps)}: {step}")
-            task_manager.update_task_result(self.task_id, "executing", f"Executing step {i+1}: {step}")
-            last_result = await self.agent_service.execute_step(
-                task_prompt=self.prompt,
-                plan=plan,
-                step_index=i,
-                previous_step_result=last_result,
-            )
-            self._log(f"Finished step {i+1}. Result: {last_result}")
+        await self.initialize(server_ids=task.get("tool_servers"))
+
+        plan = plan_from_task(task)
+        started = time.perf_counter()
+        try:
+            with tracer.span("steps", count=len(plan.steps)):
+                results = await self._execute_steps(plan)
+        except BaseException:
+            await self.shutdown(failed=True)
+            raise
+        finally:
+            task_manager.record_timing(self.task_id, "execution", time.perf_counter() - started)
+        last_result = results[plan.steps[-1].number].describe() if plan.steps else None
 
         task_manager.update_task_result(self.task_id, "completed", last_result)
         self._log("Plan Execution Finished.")
@@ -112,18 +336,77 @@ class TaskOrchestrator:
         OrchestratorManager.cleanup_orchestrator(self.task_id)
         await event_service.publish(self.task_id, "[DONE]")
 
+@dataclass
+class PlanOutcome:
+    """The result of a planning run, shared by every task that waited on it."""
+    plan: Plan
+    tool_servers: list[str] | None
+    # None when the plan came from the plan cache.
+    generation: PlanGeneration | None = None
+    server_startup: float | None = None
+
+async def _generate_plan(prompt: str, fingerprint: str) -> PlanOutcome:
+    """
+    Produces a plan for a prompt, from the plan cache if possible.
+
+    This is the shared work of a planning flight, so it leases the tool
+    servers it needs itself rather than through any one task's orchestrator:
+    a task that stops waiting cannot hand the servers back mid-run.
+    """
+    # The lookup was counted when the task was admitted; this one only
+    # catches plans cached by other tasks while this one was queued.
+    cached = plan_cache.peek(prompt, fingerprint)
+    if cached is not None:
+        return PlanOutcome(cached.plan, cached.tool_servers)
+    # The planner only needs tool listings; servers are started just for
+    # the ones whose listing is not known yet.
+    manifest_servers, missing_ids = server_pool.manifest_servers()
+    lease: ServerLease | None = None
+    server_startup = None
+    try:
+        if missing_ids:
+            with tracer.span("servers.acquire", servers=", ".join(missing_ids)):
+                started = time.perf_counter()
+                lease = await server_pool.acquire(missing_ids)
+                server_startup = time.perf_counter() - started
+        planner = AgentService(mcp_servers=manifest_servers + (lease.servers if lease else []))
+        generation = await planner.create_plan(task_prompt=prompt)
+    except BaseException:
+        if lease is not None:
+            lease.failed = True
+        raise
+    finally:
+        # Servers go back to the pool while the plan awaits approval.
+        if lease is not None:
+            with tracer.span("servers.release", failed=lease.failed):
+                await server_pool.release(lease)
+    tool_servers = servers_named_in(generation.plan.to_text(), server_pool.manifests)
+    plan_cache.put(prompt, server_pool.tool_fingerprint(), generation.plan, tool_servers)
+    return PlanOutcome(generation.plan, tool_servers, generation, server_startup)
+
+def cached_plan(prompt: str) -> CachedPlan | None:
+    """Returns a cached plan for the prompt and the current tool set, if there is one."""
+    return plan_cache.get(prompt, server_pool.tool_fingerprint())
+
+def use_cached_plan(task_id: str, prompt: str, cached: CachedPlan):
+    """Gives a new task a cached plan; it then awaits approval like a planned task."""
+    with tracer.use(task_manager.trace_context(task_id)):
+        OrchestratorManager.get_orchestrator(task_id, prompt).use_cached_plan(cached)
+
 async def run_task_and_update_status(task_id: str, prompt: str):
     """
     A wrapper function for background execution. Creates a plan and waits for approval.
     """
-    try:
-        orchestrator = OrchestratorManager.get_orchestrator(task_id, prompt)
-        await orchestrator.create_plan()
-    except Exception as e:
-        print(f"--- Orchestrator: Task failed for task_id {task_id} ---")
-        print(f"Error: {e}")
-        task_manager.update_task_result(task_id, "failed", str(e))
-        await event_service.publish(task_id, "[DONE]")
+    with tracer.use(task_manager.trace_context(task_id)):
+        try:
+            orchestrator = OrchestratorManager.get_orchestrator(task_id, prompt)
+            with tracer.span("plan", **{"task.id": task_id}):
+                await orchestrator.create_plan()
+        except Exception as e:
+            logger.error("Planning failed for task %s: %s", task_id, e, extra={"task_id": task_id})
+            task_manager.update_task_result(task_id, "failed", str(e))
+            OrchestratorManager.cleanup_orchestrator(task_id)
+            await event_service.publish(task_id, "[DONE]")
 
 async def trigger_plan_execution(task_id: str):
     """
@@ -131,5 +414,13 @@ async def trigger_plan_execution(task_id: str):
     """
     task = task_manager.get_task_status(task_id)
     if task:
-        orchestrator = OrchestratorManager.get_orchestrator(task_id, task["prompt"])
-        await orchestrator.execute_plan() 
\ No newline at end of file
+        with tracer.use(task_manager.trace_context(task_id)):
+            try:
+                orchestrator = OrchestratorManager.get_orchestrator(task_id, task["prompt"])
+                with tracer.span("execute", **{"task.id": task_id}):
+                    await orchestrator.execute_plan()
+            except Exception as e:
+                logger.error("Execution failed for task %s: %s", task_id, e, extra={"task_id": task_id}, exc_info=True)
+                task_manager.update_task_result(task_id, "failed", str(e))
+                OrchestratorManager.cleanup_orchestrator(task_id)
+                await event_service.publish(task_id, "[DONE]") 
\ No newline at end of file
@@ -0,0 +1,82 @@
+import re
+
+from pydantic import BaseModel, Field
+
+_STEP_NUMBER = re.compile(r"^(\d+)\s*[.):-]?\s*")
+_DEPENDS_ON = re.compile(r"\s*\(\s*depends on\s*:\s*([^)]*)\)", re.IGNORECASE)
+
+
+class PlanStep(BaseModel):
+    """A single numbered step of a plan and the steps whose output it needs."""
+    number: int = Field(description="The 1-based position of the step in the plan.")
+    description: str = Field(description="What the step does, naming the exact tool it uses.")
+    depends_on: list[int] = Field(
+        description="Numbers of the earlier steps whose results this step needs. Empty if it needs none."
+    )
+
+    def to_text(self) -> str:
+        dependencies = ", ".join(str(number) for number in self.depends_on) or "none"
+        return f"{self.number}. {self.description} (depends on: {dependencies})"
+
+
+class Plan(BaseModel):
+    """A structured plan, produced once by the planner and stored with the task."""
+    steps: list[PlanStep] = Field(description="The steps of the plan, in order.")
+
+    def normalized(self) -> "Plan":
+        """
+        Renumbers the steps 1..n and drops dependencies on unknown or later
+        steps, so the plan is always a DAG that runs in a valid order.
+        """
+        renumbered = {step.number: index + 1 for index, step in enumerate(self.steps)}
+        steps = []
+        for index, step in enumerate(self.steps):
+            number = index + 1
+            depends_on = sorted({
+                renumbered[dependency] for dependency in step.depends_on
+                if dependency in renumbered and renumbered[dependency] < number
+            })
+            steps.append(PlanStep(number=number, description=step.description, depends_on=depends_on))
+        return Plan(steps=steps)
+
+    def step(self, number: int) -> PlanStep:
+        return self.steps[number - 1]
+
+    def to_text(self) -> str:
+        return "\n".join(step.to_text() for step in self.steps)
+
+
+def parse_plan(plan: str) -> Plan:
+    """
+    Parses a plain-text numbered plan into a Plan.
+
+    Steps declare their dependencies with a "(depends on: 1, 3)" or
+    "(depends on: none)" annotation. A step without an annotation depends on
+    the step before it, so plans without annotations still run in order.
+    """
+    steps: list[PlanStep] = []
+    for line in plan.strip().split("\n"):
+        line = line.strip()
+        if not line or not line[0].isdigit():
+            continue
+        match = _STEP_NUMBER.match(line)
+        number = int(match.group(1)) if match else len(steps) + 1
+        if steps and number <= steps[-1].number:
+            number = steps[-1].number + 1
+
+        annotation = _DEPENDS_ON.search(line)
+        if annotation is None:
+            depends_on = [steps[-1].number] if steps else []
+        else:
+            depends_on = [int(n) for n in re.findall(r"\d+", annotation.group(1))]
+        description = _DEPENDS_ON.sub("", line[match.end():] if match else line).strip()
+
+        steps.append(PlanStep(number=number, description=description, depends_on=depends_on))
+    return Plan(steps=steps).normalized()
+
+
+def plan_from_task(task: dict) -> Plan:
+    """Returns the structured plan stored with a task, parsing the plan text for older records."""
+    if task.get("plan_steps") is not None:
+        return Plan(steps=task["plan_steps"])
+    return parse_plan(task.get("plan") or "")
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from agent_runtime.constants import PROJECT_ROOT
+from agent_runtime.services.plan import Plan
+
+DEFAULT_PLAN_CACHE_PATH = PROJECT_ROOT / "data" / "plan_cache.db"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Collapses runs of whitespace and strips the ends, so prompts that differ
+    only in spacing share a cache entry. Case and punctuation are kept: URLs,
+    paths and identifiers in a prompt are case-sensitive.
+    """
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+@dataclass
+class CachedPlan:
+    """A plan and the tool servers it needs, as cached for a prompt."""
+    plan: Plan
+    tool_servers: list[str] | None
+    created_at: float
+
+
+class PlanCache:
+    """
+    Caches generated plans by normalised prompt and tool fingerprint.
+
+    Entries live in an in-memory LRU of `max_entries`, expire `ttl` seconds
+    after they were created, and can optionally be persisted to SQLite so
+    they survive restarts and are shared by processes using the same file.
+    A changed tool set changes the fingerprint, so stale plans are never served.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.max_entries = 1000
+        self.ttl = 86400.0
+        self._entries: OrderedDict[str, CachedPlan] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._counters = {"hits": 0, "misses": 0}
+
+    def configure(self, settings: dict | None):
+        """Applies the `plan_cache` block of config.yaml."""
+        settings = settings or {}
+        self.enabled = bool(settings.get("enabled", self.enabled))
+        self.max_entries = int(settings.get("max_entries", self.max_entries))
+        self.ttl = float(settings.get("ttl_seconds", self.ttl))
+        self.close()
+        backend = settings.get("backend", "memory")
+        if backend == "sqlite":
+            path = Path(settings.get("path", DEFAULT_PLAN_CACHE_PATH))
+            self._open(path if path.is_absolute() else PROJECT_ROOT / path)
+        elif backend != "memory":
+            raise ValueError(f"Unknown plan_cache backend '{backend}'. Expected 'memory' or 'sqlite'.")
+
+    def _open(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            " cache_key TEXT PRIMARY KEY,"
+            " created_at REAL NOT NULL,"
+            " data TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_plans_created ON plans(created_at)")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @staticmethod
+    def key_for(prompt: str, tool_fingerprint: str) -> str:
+        return hashlib.sha256(f"{tool_fingerprint}|{normalize_prompt(prompt)}".encode()).hexdigest()
+
+    def get(self, prompt: str, tool_fingerprint: str) -> CachedPlan | None:
+        """Returns the cached plan for a prompt and tool set, if there is a fresh one."""
+        if not self.enabled:
+            return None
+        entry = self.peek(prompt, tool_fingerprint)
+        with self._lock:
+            self._counters["hits" if entry is not None else "misses"] += 1
+        return entry
+
+    def peek(self, prompt: str, tool_fingerprint: str) -> CachedPlan | None:
+        """Like `get`, but does not count towards the hit and miss statistics."""
+        if not self.enabled:
+            return None
+        key = self.key_for(prompt, tool_fingerprint)
+        expires_before = time.time() - self.ttl
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.created_at < expires_before:
+                del self._entries[key]
+                entry = None
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT data, created_at FROM plans WHERE cache_key = ? AND created_at >= ?", (key, expires_before)
+                ).fetchone()
+                if row is not None:
+                    data = json.loads(row[0])
+                    entry = CachedPlan(Plan.model_validate(data["plan"]), data["tool_servers"], row[1])
+                    self._remember(key, entry)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, prompt: str, tool_fingerprint: str, plan: Plan, tool_servers: list[str] | None):
+        """Caches a plan generated for a prompt and tool set."""
+        if not self.enabled:
+            return
+        key = self.key_for(prompt, tool_fingerprint)
+        entry = CachedPlan(plan, tool_servers, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                data = json.dumps({"plan": plan.model_dump(), "tool_servers": tool_servers})
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO plans (cache_key, created_at, data) VALUES (?, ?, ?)",
+                    (key, entry.created_at, data),
+                )
+                self._conn.execute("DELETE FROM plans WHERE created_at < ?", (entry.created_at - self.ttl,))
+
+    def _remember(self, key: str, entry: CachedPlan):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "entries": len(self._entries),
+            **self._counters,
+            "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+        }
+
+
+# Singleton instance of the plan cache, configured from config.yaml.
+plan_cache = PlanCache()
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+
+from agent_runtime.services import task_manager
+from agent_runtime.services.blob_store import blob_store
+from agent_runtime.services.event_service import event_service
+from agent_runtime.services.orchestrator import OrchestratorManager
+
+logger = logging.getLogger(__name__)
+
+# Seconds a task may sit in each status, since its last update, before it is evicted.
+DEFAULT_TASK_TTLS = {
+    "pending": 3600,
+    "awaiting_approval": 86400,
+    "approved": 3600,
+    "executing": 86400,
+    "completed": 3600,
+    "failed": 3600,
+}
+
+
+class TaskReaper:
+    """
+    Periodically evicts expired tasks and abandoned orchestrators so that
+    memory and process count reach a steady state under sustained traffic.
+
+    - Tasks are removed once they have been in a status longer than its TTL,
+      and the least recently updated tasks are removed beyond `max_tasks`.
+    - Orchestrators of finished, failed or evicted tasks are shut down, as are
+      orchestrators of `awaiting_approval` tasks idle for `abandoned_after`.
+    - Blobs no remaining task refers to are deleted once older than `blob_grace`.
+    """
+
+    def __init__(self):
+        self.interval = 60.0
+        self.max_tasks = 10000
+        self.task_ttls = dict(DEFAULT_TASK_TTLS)
+        self.abandoned_after = 1800.0
+        self.blob_grace = 600.0
+        self._task: asyncio.Task | None = None
+
+    def configure(self, settings: dict | None):
+        """Applies the `retention` block of config.yaml."""
+        settings = settings or {}
+        self.interval = float(settings.get("interval_seconds", self.interval))
+        self.max_tasks = int(settings.get("max_tasks", self.max_tasks))
+        self.task_ttls.update({status: float(ttl) for status, ttl in settings.get("task_ttl_seconds", {}).items()})
+        self.abandoned_after = float(settings.get("abandoned_approval_seconds", self.abandoned_after))
+        self.blob_grace = float(settings.get("artifact_grace_seconds", self.blob_grace))
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reap_once()
+            except Exception as e:
+                logger.warning("Reaping failed: %s", e)
+
+    def _evict_tasks(self) -> int:
+        store = task_manager.get_store()
+        now = time.time()
+        expired: set[str] = set()
+        for status, ttl in self.task_ttls.items():
+            expired.update(store.stale_tasks(status, updated_before=now - ttl))
+        overflow = store.count() - len(expired) - self.max_tasks
+        if overflow > 0:
+            for task_id in store.least_recently_updated(overflow + len(expired)):
+                if overflow <= 0:
+                    break
+                if task_id not in expired:
+                    expired.add(task_id)
+                    overflow -= 1
+        for task_id in expired:
+            store.delete(task_id)
+            event_service.discard(task_id)
+        return len(expired)
+
+    async def _reap_orchestrators(self) -> int:
+        now = time.monotonic()
+        reaped = 0
+        for task_id, orchestrator in list(OrchestratorManager._instances.items()):
+            task = task_manager.get_task_status(task_id)
+            status = task["status"] if task else None
+            abandoned = status == "awaiting_approval" and now - orchestrator.last_active > self.abandoned_after
+            if status in (None, "completed", "failed") or abandoned:
+                await orchestrator.shutdown()
+                OrchestratorManager.cleanup_orchestrator(task_id)
+                reaped += 1
+        return reaped
+
+    def _sweep_blobs(self) -> int:
+        # Reads every task record and walks the blob directory; run in a thread.
+        live = {
+            artifact["hash"]
+            for _, record in task_manager.get_store().iter_tasks()
+            for artifact in record.get("artifacts") or []
+        }
+        return blob_store.sweep(live, older_than=time.time() - self.blob_grace)
+
+    async def reap_once(self) -> dict[str, int]:
+        """Runs a single eviction pass and returns what was removed."""
+        tasks = self._evict_tasks()
+        orchestrators = await self._reap_orchestrators()
+        blobs = await asyncio.to_thread(self._sweep_blobs) if tasks else 0
+        if tasks or orchestrators:
+            logger.info("Evicted %d task(s), %d orchestrator(s) and %d blob(s).", tasks, orchestrators, blobs)
+        return {"tasks": tasks, "orchestrators": orchestrators, "blobs": blobs}
+
+
+# Singleton instance of the reaper, started and stopped by the app lifespan.
+task_reaper = TaskReaper()
@@ -0,0 +1,325 @@
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+
+from agents.mcp import MCPServer
+
+from agent_runtime.services.tool_manager import get_installed_npm_package_versions
+from agent_runtime.services.tool_manifests import ManifestServer, manifest_cache
+from agent_runtime.services.tool_registry import ServerHandle, ToolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class PooledServer:
+    """A single running MCP server instance owned by the pool."""
+    server_id: str
+    handle: ServerHandle
+    uses: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+    @property
+    def server(self) -> MCPServer:
+        return self.handle.server
+
+
+@dataclass
+class ServerLease:
+    """A set of pooled servers checked out by a single orchestrator."""
+    instances: list[PooledServer]
+    failed: bool = False
+
+    @property
+    def servers(self) -> list[MCPServer]:
+        return [instance.server for instance in self.instances]
+
+
+class MCPServerPool:
+    """
+    A process-wide pool of long-lived MCP servers.
+
+    Orchestrators check out a lease on one instance per server id and return it
+    when their task is done, so task latency no longer includes server startup.
+    Each instance runs behind a ServerHandle, so its transport stays in a single
+    task for its whole lifetime.
+    """
+
+    def __init__(self):
+        self._registry: ToolRegistry | None = None
+        self._idle: dict[str, list[PooledServer]] = {}
+        self._instances: dict[str, set[PooledServer]] = {}
+        self._limits: dict[str, asyncio.Semaphore] = {}
+        self._health_task: asyncio.Task | None = None
+        self._warm_task: asyncio.Task | None = None
+        # The last tool fingerprint and the manifest cache version it was computed for.
+        self._fingerprint: tuple[int, str] | None = None
+        self.ready = asyncio.Event()
+        self.warm_failures: dict[str, str] = {}
+        self.warm_instances_per_server = 1
+        self.max_instances_per_server = 4
+        self.max_uses_per_instance = 100
+        self.health_check_interval = 30.0
+        self.health_check_timeout = 5.0
+
+    def configure(self, settings: dict | None):
+        """Applies the `tool_pool` block of config.yaml."""
+        settings = settings or {}
+        self.warm_instances_per_server = int(settings.get("warm_instances_per_server", self.warm_instances_per_server))
+        self.max_instances_per_server = int(settings.get("max_instances_per_server", self.max_instances_per_server))
+        self.max_uses_per_instance = int(settings.get("max_uses_per_instance", self.max_uses_per_instance))
+        self.health_check_interval = float(settings.get("health_check_interval_seconds", self.health_check_interval))
+        self.health_check_timeout = float(settings.get("health_check_timeout_seconds", self.health_check_timeout))
+
+    @property
+    def registry(self) -> ToolRegistry:
+        if self._registry is None:
+            self._registry = ToolRegistry()
+        return self._registry
+
+    def live_counts(self) -> dict[str, int]:
+        """Returns the number of live instances per server id."""
+        counts = {
+            server_id: sum(1 for instance in instances if instance.handle.running)
+            for server_id, instances in self._instances.items()
+        }
+        return {server_id: count for server_id, count in counts.items() if count}
+
+    @property
+    def manifests(self) -> dict[str, list]:
+        """Returns the cached tool listings of all enabled servers, by server id."""
+        manifests = {}
+        for entry in self.registry.enabled_configs():
+            tools = manifest_cache.get(entry)
+            if tools is not None:
+                manifests[entry.get("id", "N/A")] = tools
+        return manifests
+
+    def manifest_servers(self) -> tuple[list[ManifestServer], list[str]]:
+        """
+        Returns stand-in servers for every enabled server whose tool listing is
+        cached, plus the ids of enabled servers without a cached listing.
+        """
+        manifests = self.manifests
+        known = [ManifestServer(server_id, tools) for server_id, tools in manifests.items()]
+        missing = [
+            entry.get("id", "N/A") for entry in self.registry.enabled_configs()
+            if entry.get("id", "N/A") not in manifests
+        ]
+        return known, missing
+
+    def tool_fingerprint(self) -> str:
+        """
+        Returns a hash identifying the tool set the planner can see: every
+        enabled server's registry entry and package version, with its tool
+        listing or, while that is unknown, a marker saying so. Recomputed
+        only when the cached listings change.
+        """
+        if self._fingerprint is not None and self._fingerprint[0] == manifest_cache.version:
+            return self._fingerprint[1]
+        digest = hashlib.sha256()
+        for entry in sorted(self.registry.enabled_configs(), key=lambda entry: str(entry.get("id"))):
+            tools = manifest_cache.get(entry)
+            listing = ",".join(sorted(tool.name for tool in tools)) if tools is not None else "<unknown>"
+            digest.update(f"{manifest_cache.key_for(entry)}:{listing};".encode())
+        self._fingerprint = (manifest_cache.version, digest.hexdigest())
+        return self._fingerprint[1]
+
+    def _limit(self, server_id: str) -> asyncio.Semaphore:
+        if server_id not in self._limits:
+            self._limits[server_id] = asyncio.Semaphore(self.max_instances_per_server)
+        return self._limits[server_id]
+
+    # --- Lifecycle ---
+
+    async def start(self):
+        """Starts the background health checker and fills the warm pool."""
+        # Manifest keys include npm package versions; list them once, off the event loop.
+        await asyncio.to_thread(get_installed_npm_package_versions)
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+        if self._warm_task is None:
+            self._warm_task = asyncio.create_task(self.warm())
+
+    async def shutdown(self):
+        """
+        Stops the background tasks and shuts down every instance, including
+        those still leased, so no server process outlives the service. Leases
+        returned afterwards find their instances stopped and only give back
+        their permits.
+        """
+        for task in (self._warm_task, self._health_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._warm_task = None
+        self._health_task = None
+        self.ready.clear()
+        self._idle.clear()
+        instances = [instance for group in self._instances.values() for instance in group]
+        await asyncio.gather(*(self._stop_instance(instance) for instance in instances))
+
+    async def warm(self):
+        """
+        Starts and handshakes `warm_instances_per_server` instances of every
+        enabled server in parallel and parks them in the idle pool. The pool
+        reports ready once every start attempt has finished; servers that fail
+        to start are recorded in `warm_failures` and started on demand later.
+        """
+        count = min(self.warm_instances_per_server, self.max_instances_per_server)
+        configs = self.registry.enabled_configs() if count > 0 else []
+        logger.info("Warming %d instance(s) for %d server(s)...", count, len(configs))
+
+        async def warm_one(server_config: dict):
+            server_id = server_config.get("id", "N/A")
+            try:
+                instance = await self._start_instance(server_config)
+            except Exception as e:
+                self.warm_failures[server_id] = str(e) or type(e).__name__
+                logger.warning("Failed to warm '%s': %s", server_id, self.warm_failures[server_id])
+                return
+            if instance is not None:
+                self._idle.setdefault(server_id, []).append(instance)
+
+        self.warm_failures.clear()
+        await asyncio.gather(*(warm_one(c) for c in configs for _ in range(count)))
+        self.ready.set()
+        logger.info("Warm pool ready with %s.", self.live_counts())
+
+    async def _start_instance(self, server_config: dict) -> PooledServer | None:
+        """Starts a server instance and waits for the handshake."""
+        server = self.registry.build_server(server_config)
+        if server is None:
+            return None
+        server_id = server.server_id
+        handle = ServerHandle(server)
+        await handle.start(timeout=self.registry.startup_timeout_for(server_config))
+        instance = PooledServer(server_id=server_id, handle=handle)
+        self._instances.setdefault(server_id, set()).add(instance)
+        logger.info("Started new '%s' instance.", server_id)
+        # Capture the tool listing so planning can run without a live server.
+        try:
+            tools = await asyncio.wait_for(server.list_tools(), timeout=self.health_check_timeout)
+            await asyncio.to_thread(manifest_cache.put, server_config, tools)
+        except asyncio.CancelledError:
+            await self._stop_instance(instance)
+            raise
+        except Exception as e:
+            logger.warning("Could not list tools for '%s': %s", server_id, e)
+        return instance
+
+    async def _stop_instance(self, instance: PooledServer):
+        self._instances.get(instance.server_id, set()).discard(instance)
+        try:
+            await instance.handle.stop()
+        except Exception as e:
+            logger.warning("Error while stopping '%s': %s", instance.server_id, e)
+        logger.info("Stopped '%s' instance after %d use(s).", instance.server_id, instance.uses)
+
+    async def _is_healthy(self, instance: PooledServer) -> bool:
+        if not instance.handle.running:
+            return False
+        session = getattr(instance.server, "session", None)
+        if session is None:
+            return True
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout=self.health_check_timeout)
+            return True
+        except Exception:
+            return False
+
+    # --- Leases ---
+
+    async def _checkout(self, server_config: dict) -> PooledServer | None:
+        server_id = server_config.get("id", "N/A")
+        limit = self._limit(server_id)
+        await limit.acquire()
+        try:
+            idle = self._idle.get(server_id, [])
+            while idle:
+                instance = idle.pop()
+                if instance.handle.running:
+                    return instance
+                await self._stop_instance(instance)
+            instance = await self._start_instance(server_config)
+            if instance is None:
+                limit.release()
+            return instance
+        except BaseException:
+            limit.release()
+            raise
+
+    async def acquire(self, server_ids: list[str] | None = None) -> ServerLease:
+        """
+        Checks out one instance for each requested server id (all enabled
+        servers by default) concurrently, starting new instances when none are
+        idle. Blocks while a server id is at its instance cap; servers that
+        fail to start are reported and left out of the lease. If the caller is
+        cancelled, instances already checked out go back to the pool.
+        """
+        configs = [
+            entry for entry in self.registry.enabled_configs()
+            if server_ids is None or entry.get("id") in server_ids
+        ]
+        lease = ServerLease(instances=[])
+        checkouts = [asyncio.ensure_future(self._checkout(server_config)) for server_config in configs]
+        try:
+            results = await asyncio.gather(*checkouts, return_exceptions=True)
+        except BaseException:
+            for checkout in checkouts:
+                checkout.cancel()
+            outcomes = await asyncio.gather(*checkouts, return_exceptions=True)
+            lease.instances = [outcome for outcome in outcomes if isinstance(outcome, PooledServer)]
+            await self.release(lease)
+            raise
+        for server_config, result in zip(configs, results):
+            if isinstance(result, BaseException):
+                logger.warning("Skipping '%s', failed to start: %s", server_config.get("id", "N/A"), result)
+            elif result is not None:
+                result.uses += 1
+                result.last_used = time.monotonic()
+                lease.instances.append(result)
+        return lease
+
+    async def release(self, lease: ServerLease):
+        """
+        Returns the instances of a lease to the pool. Instances that have
+        reached their use limit, have crashed or, for failed leases, no longer
+        answer a health check are recycled.
+        """
+        instances, lease.instances = lease.instances, []
+        for instance in instances:
+            recycle = (
+                instance.uses >= self.max_uses_per_instance
+                or not instance.handle.running
+                or (lease.failed and not await self._is_healthy(instance))
+            )
+            if recycle:
+                await self._stop_instance(instance)
+            else:
+                instance.last_used = time.monotonic()
+                self._idle.setdefault(instance.server_id, []).append(instance)
+            self._limit(instance.server_id).release()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for server_id, idle in list(self._idle.items()):
+                for instance in list(idle):
+                    if await self._is_healthy(instance):
+                        continue
+                    if instance in idle:
+                        idle.remove(instance)
+                        logger.warning("'%s' instance failed its health check, recycling.", server_id)
+                        await self._stop_instance(instance)
+
+
+# Singleton instance of the server pool, started and stopped by the app lifespan.
+server_pool = MCPServerPool()
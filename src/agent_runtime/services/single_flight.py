@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    De-duplicates concurrent identical work.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it is running wait on the same task instead of repeating it.
+    A waiter that is cancelled stops waiting without cancelling the work for
+    the others; the work is only cancelled once every waiter has gone.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: dict[Hashable, _Flight] = {}
+        self._counters = {"started": 0, "shared": 0}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a run for `key` is in flight, so that `do` would join it."""
+        return key in self._flights
+
+    async def do(self, key: Hashable, work: Callable[[], Awaitable[T]]) -> T:
+        """Runs `work()` for `key`, or joins the run already in flight."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(work(), name=f"single-flight-{self.name}"))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self._counters["started"] += 1
+        else:
+            self._counters["shared"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict[str, Any]:
+        """Returns how many runs were started and how many callers joined one in flight."""
+        return {"in_flight": len(self._flights), **self._counters}
@@ -0,0 +1,164 @@
+import gzip
+import logging
+import os
+import queue
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO
+
+from agent_runtime.constants import PROJECT_ROOT
+
+LOGS_DIR = PROJECT_ROOT / "logs"
+
+logger = logging.getLogger(__name__)
+
+# Queue item that asks the writer to close a task's log file.
+_CLOSE = object()
+
+
+class TaskLogWriter:
+    """
+    Writes per-task log files off the event loop.
+
+    `write` only enqueues the line. A background thread drains the queue in
+    batches, appends to one open handle per task (at most `max_open_files`
+    at a time, least recently used closed first) and flushes once per batch.
+    A file that grows past `max_bytes` is rotated: it is renamed to
+    `task_<id>.log.1.gz` and compressed, keeping `backup_count` generations.
+    """
+
+    def __init__(self, logs_dir: Path = LOGS_DIR):
+        self.logs_dir = logs_dir
+        self.max_bytes = 10 * 1024 * 1024
+        self.backup_count = 3
+        self.flush_interval = 0.2
+        self.max_open_files = 256
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._handles: OrderedDict[str, IO[str]] = OrderedDict()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stopping = False
+
+    def configure(self, settings: dict | None):
+        """Applies the `task_logs` block of config.yaml."""
+        settings = settings or {}
+        path = Path(settings.get("path", self.logs_dir))
+        self.logs_dir = path if path.is_absolute() else PROJECT_ROOT / path
+        self.max_bytes = int(settings.get("max_bytes", self.max_bytes))
+        self.backup_count = int(settings.get("backup_count", self.backup_count))
+        self.flush_interval = float(settings.get("flush_interval_seconds", self.flush_interval))
+        self.max_open_files = max(1, int(settings.get("max_open_files", self.max_open_files)))
+
+    def path_for(self, task_id: str) -> Path:
+        return self.logs_dir / f"task_{task_id}.log"
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stopping = False
+                    self._thread = threading.Thread(target=self._run, name="task-log-writer", daemon=True)
+                    self._thread.start()
+
+    def write(self, task_id: str, line: str):
+        """Queues a line for a task's log file. Never blocks on disk I/O."""
+        self._ensure_started()
+        self._queue.put((task_id, line))
+
+    def close(self, task_id: str):
+        """Queues closing a task's log file once its pending lines are written."""
+        if self._thread is not None:
+            self._queue.put((task_id, _CLOSE))
+
+    def shutdown(self):
+        """Writes everything still queued and closes all files."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._queue.put((None, _CLOSE))
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                if self._stopping:
+                    break
+                continue
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except OSError as e:
+                logger.error("Failed to write task logs: %s", e)
+            if self._stopping and self._queue.empty():
+                break
+        for task_id in list(self._handles):
+            self._close(task_id)
+
+    def _write_batch(self, batch: list[tuple[str | None, object]]):
+        touched: set[str] = set()
+        for task_id, line in batch:
+            if task_id is None:
+                continue
+            if line is _CLOSE:
+                self._flush(task_id)
+                self._close(task_id)
+                touched.discard(task_id)
+                continue
+            handle = self._handle(task_id)
+            handle.write(line)
+            touched.add(task_id)
+        for task_id in touched:
+            self._flush(task_id)
+
+    def _flush(self, task_id: str):
+        """Flushes a task's open log, rotating it once it has grown past `max_bytes`."""
+        handle = self._handles.get(task_id)
+        if handle is None:
+            # Already closed, and so flushed, to make room for another task's handle.
+            return
+        handle.flush()
+        if handle.tell() >= self.max_bytes:
+            self._rotate(task_id)
+
+    def _handle(self, task_id: str) -> IO[str]:
+        handle = self._handles.get(task_id)
+        if handle is None:
+            self.logs_dir.mkdir(parents=True, exist_ok=True)
+            handle = open(self.path_for(task_id), "a", encoding="utf-8")
+            self._handles[task_id] = handle
+            while len(self._handles) > self.max_open_files:
+                self._close(next(iter(self._handles)))
+        self._handles.move_to_end(task_id)
+        return handle
+
+    def _close(self, task_id: str):
+        handle = self._handles.pop(task_id, None)
+        if handle is not None:
+            handle.close()
+
+    def _rotate(self, task_id: str):
+        self._close(task_id)
+        path = self.path_for(task_id)
+        if self.backup_count <= 0:
+            path.unlink(missing_ok=True)
+            return
+        for generation in range(self.backup_count - 1, 0, -1):
+            older = path.with_name(f"{path.name}.{generation}.gz")
+            if older.exists():
+                os.replace(older, path.with_name(f"{path.name}.{generation + 1}.gz"))
+        with open(path, "rb") as source, gzip.open(path.with_name(f"{path.name}.1.gz"), "wb") as target:
+            shutil.copyfileobj(source, target)
+        path.unlink()
+
+
+# Singleton instance of the task log writer, shut down by the app lifespan.
+task_log_writer = TaskLogWriter()
@@ -1,47 +1,214 @@
 from typing import Dict, Any, Literal
+import asyncio
+import logging
+import time
 import uuid
 
-# In-memory storage for tasks.
-# For a production system, this would be replaced by a more robust
-# solution like Redis or a database.
-task_storage: Dict[str, Dict[str, Any]] = {}
+from agent_runtime.services.plan import Plan
+from agent_runtime.services.task_store import TaskStore, InMemoryTaskStore, create_task_store
+from agent_runtime.services.tracing import SpanContext, tracer
+
+logger = logging.getLogger(__name__)
+
+# Task records live in a pluggable store. The in-memory store is the default;
+# `configure_store` swaps in the backend selected in config.yaml.
+_store: TaskStore = InMemoryTaskStore()
+# Whether other worker processes read the same store, in which case writes
+# are flushed in the next batch instead of waiting out the flush interval.
+_shared = False
 
 TaskStatus = Literal["pending", "awaiting_approval", "approved", "executing", "completed", "failed"]
 
-def create_task(prompt: str) -> str:
+def configure_store(settings: dict | None, shared: bool = False):
+    """
+    Replaces the task store with the backend described by the `task_store` config block.
+    `shared` is set when several worker processes use the store.
+    """
+    global _store, _shared
+    _store.close()
+    _store = create_task_store(settings)
+    _shared = shared
+
+def _write(task_id: str, record: Dict[str, Any]):
+    _store.put(task_id, record)
+    if _shared:
+        _store.flush_soon()
+
+async def persist():
+    """
+    Waits, off the event loop, until buffered writes are committed. Only
+    needed when other workers read the store and must see a write at once.
+    """
+    if _shared:
+        await asyncio.to_thread(_store.flush)
+
+def get_store() -> TaskStore:
+    """Returns the active task store."""
+    return _store
+
+def _update(task_id: str, **changes: Any) -> bool:
+    """Applies field changes to a stored task. Returns False if the task does not exist."""
+    record = _store.get(task_id)
+    if record is None:
+        return False
+    record.update(changes, updated_at=time.time())
+    _write(task_id, record)
+    return True
+
+def create_task(prompt: str, priority: str = "normal") -> str:
     """Creates a new task and stores it."""
     task_id = str(uuid.uuid4())
-    task_storage[task_id] = {
+    now = time.time()
+    trace = tracer.new_trace()
+    _write(task_id, {
         "status": "pending",
         "prompt": prompt,
+        "priority": priority,
         "plan": None,
+        "plan_steps": None,
+        "plan_cache_hit": None,
+        "tool_servers": None,
         "result": None,
-    }
-    print(f"Task Manager: Created task {task_id}")
+        "step_usage": {},
+        "plan_usage": None,
+        "timings": {},
+        "step_timings": {},
+        "artifacts": [],
+        "traceparent": trace.traceparent if trace else None,
+        "created_at": now,
+        "updated_at": now,
+    })
+    logger.info("Created task %s.", task_id, extra={"task_id": task_id, "status": "pending"})
     return task_id
 
 def get_task_status(task_id: str) -> Dict[str, Any] | None:
     """Retrieves the status of a task."""
-    return task_storage.get(task_id)
+    return _store.get(task_id)
 
-def update_task_plan(task_id: str, plan: str):
-    """Updates the task with a plan and sets it to await approval."""
-    if task_id in task_storage:
-        task_storage[task_id]["plan"] = plan
-        task_storage[task_id]["status"] = "awaiting_approval"
-        print(f"Task Manager: Updated task {task_id} with plan, awaiting approval.")
+def trace_context(task_id: str) -> SpanContext | None:
+    """The root span of a task's trace, under which all its work is traced."""
+    record = _store.get(task_id)
+    return SpanContext.from_traceparent(record.get("traceparent")) if record else None
+
+def update_task_plan(task_id: str, plan: Plan, tool_servers: list[str] | None = None, cache_hit: bool = False):
+    """
+    Updates the task with a plan and sets it to await approval.
+    The plan is stored both as text, for display, and as structured steps.
+    `tool_servers` lists the servers the plan needs; None means all of them.
+    `cache_hit` records whether the plan came from the plan cache.
+    """
+    changes = {
+        "plan": plan.to_text(),
+        "plan_steps": [step.model_dump() for step in plan.steps],
+        "plan_cache_hit": cache_hit,
+        "tool_servers": tool_servers,
+        "status": "awaiting_approval",
+    }
+    if _update(task_id, **changes):
+        logger.info(
+            "Task %s has a plan%s, awaiting approval.", task_id, " from cache" if cache_hit else "",
+            extra={"task_id": task_id, "status": "awaiting_approval"},
+        )
 
 def approve_task(task_id: str) -> bool:
     """Marks a task as approved, allowing execution to continue."""
-    if task_id in task_storage and task_storage[task_id]["status"] == "awaiting_approval":
-        task_storage[task_id]["status"] = "approved"
-        print(f"Task Manager: Approved task {task_id}, ready for execution.")
+    record = _store.get(task_id)
+    if record is None or record["status"] != "awaiting_approval":
+        return False
+    record.update(status="approved", updated_at=time.time())
+    if _store.compare_and_set(task_id, "awaiting_approval", record):
+        logger.info("Approved task %s.", task_id, extra={"task_id": task_id, "status": "approved"})
         return True
     return False
 
+def record_step_usage(task_id: str, step_number: int, usage: Dict[str, int], timings: Dict[str, float] | None = None):
+    """Records the tokens used by a plan step, and optionally its timings, keyed by step number."""
+    record = _store.get(task_id)
+    if record is not None:
+        changes: Dict[str, Any] = {"step_usage": {**(record.get("step_usage") or {}), str(step_number): usage}}
+        if timings is not None:
+            changes["step_timings"] = {**(record.get("step_timings") or {}), str(step_number): timings}
+        _update(task_id, **changes)
+
+def record_plan_usage(task_id: str, usage: Dict[str, int]):
+    """Records the tokens used by the planner for a task."""
+    _update(task_id, plan_usage=usage)
+
+def record_timing(task_id: str, phase: str, seconds: float):
+    """Adds time spent in a phase of a task, such as `queue_wait` or `planning`."""
+    record = _store.get(task_id)
+    if record is not None:
+        timings = record.get("timings") or {}
+        _update(task_id, timings={**timings, phase: timings.get(phase, 0.0) + seconds})
+
+def token_totals(record: Dict[str, Any]) -> Dict[str, int]:
+    """Sums the tokens used by a task's planner run and steps."""
+    totals = {"requests": 0, "input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for usage in [record.get("plan_usage") or {}, *(record.get("step_usage") or {}).values()]:
+        for key in totals:
+            totals[key] += usage.get(key, 0)
+    return totals
+
+def _distribution(values: list[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "avg": sum(values) / len(values) if values else 0.0,
+        "p50": values[len(values) // 2] if values else 0.0,
+        "p95": values[int(len(values) * 0.95)] if values else 0.0,
+        "max": values[-1] if values else 0.0,
+        "total": sum(values),
+    }
+
+def timing_summary(status: str | None = "completed") -> Dict[str, Any]:
+    """
+    Aggregates the timings and token usage of stored tasks in `status`
+    (all tasks for None): a distribution per phase, per step measure and
+    token count.
+    """
+    phases: Dict[str, list[float]] = {}
+    steps: Dict[str, list[float]] = {}
+    tokens: Dict[str, list[float]] = {}
+    durations: list[float] = []
+    tasks = 0
+    for _, record in _store.iter_tasks(status):
+        tasks += 1
+        durations.append(record["updated_at"] - record["created_at"])
+        for phase, seconds in (record.get("timings") or {}).items():
+            phases.setdefault(phase, []).append(seconds)
+        for timings in (record.get("step_timings") or {}).values():
+            for measure, value in timings.items():
+                steps.setdefault(measure, []).append(value)
+        for key, value in token_totals(record).items():
+            tokens.setdefault(key, []).append(value)
+    return {
+        "status": status,
+        "tasks": tasks,
+        "duration_seconds": _distribution(durations),
+        "phases": {phase: _distribution(values) for phase, values in phases.items()},
+        "steps": {measure: _distribution(values) for measure, values in steps.items()},
+        "tokens": {key: _distribution(values) for key, values in tokens.items()},
+    }
+
+def record_artifact(task_id: str, step_number: int, blob_hash: str, size: int):
+    """Records that a step's full output is stored in the blob store under `blob_hash`."""
+    record = _store.get(task_id)
+    if record is not None:
+        artifact = {"hash": blob_hash, "step": step_number, "size": size}
+        _update(task_id, artifacts=[*(record.get("artifacts") or []), artifact])
+
 def update_task_result(task_id: str, status: TaskStatus, result: Any):
     """Updates the result and status of a task."""
-    if task_id in task_storage:
-        task_storage[task_id]["status"] = status
-        task_storage[task_id]["result"] = result
-        print(f"Task Manager: Updated task {task_id} to {status}") 
\ No newline at end of file
+    if _update(task_id, status=status, result=result):
+        # Executing tasks are updated once per step; only the outcome is worth an INFO line.
+        level = logging.DEBUG if status == "executing" else logging.INFO
+        logger.log(level, "Task %s is %s.", task_id, status, extra={"task_id": task_id, "status": status})
+        if status in ("completed", "failed"):
+            record = _store.get(task_id)
+            context = SpanContext.from_traceparent(record.get("traceparent"))
+            if context is not None:
+                tracer.record_span(
+                    "task", context, start_ns=int(record["created_at"] * 1e9),
+                    attributes={"task.id": task_id, "task.status": status},
+                    error=str(result) if status == "failed" else None,
+                )
@@ -0,0 +1,369 @@
+import json
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from agent_runtime.constants import PROJECT_ROOT
+
+DEFAULT_SQLITE_PATH = PROJECT_ROOT / "data" / "tasks.db"
+
+logger = logging.getLogger(__name__)
+
+
+class TaskStore(ABC):
+    """
+    Backend interface for task records.
+    A record is a JSON-serialisable dict that always carries `status`,
+    `created_at` and `updated_at`.
+    """
+
+    @abstractmethod
+    def get(self, task_id: str) -> Dict[str, Any] | None:
+        """Returns a copy of the record for a task, or None."""
+
+    @abstractmethod
+    def put(self, task_id: str, record: Dict[str, Any]):
+        """Inserts or replaces the record for a task."""
+
+    @abstractmethod
+    def delete(self, task_id: str):
+        """Removes a task."""
+
+    @abstractmethod
+    def compare_and_set(self, task_id: str, expected_status: str, record: Dict[str, Any]) -> bool:
+        """Replaces the record only if the task's current status is `expected_status`."""
+
+    @abstractmethod
+    def iter_tasks(self, status: str | None = None) -> Iterator[tuple[str, Dict[str, Any]]]:
+        """Yields (task_id, record) pairs, oldest first, optionally filtered by status."""
+
+    @abstractmethod
+    def count(self, status: str | None = None) -> int:
+        """Counts tasks, optionally filtered by status."""
+
+    @abstractmethod
+    def count_by_status(self) -> Dict[str, int]:
+        """Counts tasks per status, in one pass; statuses without tasks are left out."""
+
+    @abstractmethod
+    def stale_tasks(self, status: str, updated_before: float) -> list[str]:
+        """Returns the ids of tasks in `status` that were last updated before the given time."""
+
+    @abstractmethod
+    def least_recently_updated(self, limit: int) -> list[str]:
+        """Returns the ids of up to `limit` tasks, least recently updated first."""
+
+    def flush(self):
+        """Persists any buffered writes."""
+
+    def flush_soon(self):
+        """Asks for buffered writes to be persisted in the next batch, without waiting for it."""
+
+    def close(self):
+        """Flushes and releases the backend's resources."""
+        self.flush()
+
+
+class InMemoryTaskStore(TaskStore):
+    """
+    The default store: a plain dict, local to the process and lost on restart.
+    Records are kept in update order so the least recently updated come first.
+    """
+
+    def __init__(self):
+        self._tasks: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+
+    def get(self, task_id: str) -> Dict[str, Any] | None:
+        record = self._tasks.get(task_id)
+        return dict(record) if record is not None else None
+
+    def put(self, task_id: str, record: Dict[str, Any]):
+        self._tasks[task_id] = dict(record)
+        self._tasks.move_to_end(task_id)
+
+    def delete(self, task_id: str):
+        self._tasks.pop(task_id, None)
+
+    def compare_and_set(self, task_id: str, expected_status: str, record: Dict[str, Any]) -> bool:
+        current = self._tasks.get(task_id)
+        if current is None or current["status"] != expected_status:
+            return False
+        self.put(task_id, record)
+        return True
+
+    def iter_tasks(self, status: str | None = None) -> Iterator[tuple[str, Dict[str, Any]]]:
+        records = sorted(self._tasks.items(), key=lambda item: item[1]["created_at"])
+        for task_id, record in records:
+            if status is None or record["status"] == status:
+                yield task_id, dict(record)
+
+    def count(self, status: str | None = None) -> int:
+        if status is None:
+            return len(self._tasks)
+        return sum(1 for record in self._tasks.values() if record["status"] == status)
+
+    def count_by_status(self) -> Dict[str, int]:
+        return dict(Counter(record["status"] for record in self._tasks.values()))
+
+    def stale_tasks(self, status: str, updated_before: float) -> list[str]:
+        return [
+            task_id for task_id, record in self._tasks.items()
+            if record["status"] == status and record["updated_at"] < updated_before
+        ]
+
+    def least_recently_updated(self, limit: int) -> list[str]:
+        return [task_id for task_id, _ in zip(self._tasks, range(limit))]
+
+
+class SQLiteTaskStore(TaskStore):
+    """
+    An embedded SQLite store in WAL mode, indexed by status, creation time
+    and last update time.
+
+    Writes are buffered and flushed in batches by a background thread, either
+    when `batch_size` writes are pending, every `flush_interval` seconds or
+    as soon as `flush_soon` is called. Reads never wait for a flush: each
+    thread reads through its own connection, which WAL lets run alongside
+    the flusher's commit, and the writes still buffered or being committed
+    are laid over what the database returns, so callers always see their own
+    writes. Only those writes are held in memory.
+    """
+
+    def __init__(self, path: Path = DEFAULT_SQLITE_PATH, batch_size: int = 100, flush_interval: float = 0.05):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        # `_lock` only guards the two buffers below; `_write_lock` serialises
+        # commits on the writer connection.
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._pending: Dict[str, Dict[str, Any] | None] = {}
+        self._inflight: Dict[str, Dict[str, Any] | None] = {}
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " task_id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL DEFAULT 0,"
+            " data TEXT NOT NULL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+        if "updated_at" not in columns:
+            self._conn.execute("ALTER TABLE tasks ADD COLUMN updated_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE tasks SET updated_at = created_at")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_created ON tasks(status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status_updated ON tasks(status, updated_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks(updated_at)")
+        self._local = threading.local()
+        self._readers: list[sqlite3.Connection] = []
+        self._wake = threading.Event()
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, name="task-store-flusher", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error("Failed to flush pending task writes: %s", e)
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                pending = self._inflight = self._pending
+                self._pending = {}
+            upserts = [
+                (task_id, record["status"], record["created_at"], record["updated_at"], json.dumps(record))
+                for task_id, record in pending.items()
+                if record is not None
+            ]
+            deletes = [(task_id,) for task_id, record in pending.items() if record is None]
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO tasks (task_id, status, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(task_id) DO UPDATE SET"
+                    " status=excluded.status, updated_at=excluded.updated_at, data=excluded.data",
+                    upserts,
+                )
+                self._conn.executemany("DELETE FROM tasks WHERE task_id = ?", deletes)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                with self._lock:
+                    # Put the batch back so it is retried, without clobbering newer writes.
+                    self._pending = {**pending, **self._pending}
+                    self._inflight = {}
+                raise
+            with self._lock:
+                self._inflight = {}
+
+    def flush_soon(self):
+        self._wake.set()
+
+    def _buffer(self, task_id: str, record: Dict[str, Any] | None):
+        with self._lock:
+            self._pending[task_id] = record
+            if len(self._pending) >= self._batch_size:
+                self._wake.set()
+
+    def _reader(self) -> sqlite3.Connection:
+        """The calling thread's read connection, opened on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self._path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA query_only=1")
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def _unflushed(self) -> Dict[str, Dict[str, Any] | None]:
+        """A snapshot of the writes not yet committed, newest winning; None marks a delete."""
+        with self._lock:
+            return {**self._inflight, **self._pending}
+
+    def get(self, task_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            for buffer in (self._pending, self._inflight):
+                if task_id in buffer:
+                    record = buffer[task_id]
+                    return dict(record) if record is not None else None
+        row = self._reader().execute("SELECT data FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, task_id: str, record: Dict[str, Any]):
+        self._buffer(task_id, dict(record))
+
+    def delete(self, task_id: str):
+        self._buffer(task_id, None)
+
+    def compare_and_set(self, task_id: str, expected_status: str, record: Dict[str, Any]) -> bool:
+        # Applied directly in the database so the check holds across processes.
+        with self._write_lock:
+            self.flush()
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = ?, updated_at = ?, data = ? WHERE task_id = ? AND status = ?",
+                (record["status"], record["updated_at"], json.dumps(record), task_id, expected_status),
+            )
+            return cursor.rowcount == 1
+
+    def iter_tasks(self, status: str | None = None) -> Iterator[tuple[str, Dict[str, Any]]]:
+        unflushed = self._unflushed()
+        if status is None:
+            rows = self._reader().execute("SELECT task_id, data FROM tasks ORDER BY created_at").fetchall()
+        else:
+            rows = self._reader().execute(
+                "SELECT task_id, data FROM tasks WHERE status = ? ORDER BY created_at", (status,)
+            ).fetchall()
+        if not unflushed:
+            for task_id, data in rows:
+                yield task_id, json.loads(data)
+            return
+        records = [(task_id, json.loads(data)) for task_id, data in rows if task_id not in unflushed]
+        records += [
+            (task_id, dict(record)) for task_id, record in unflushed.items()
+            if record is not None and (status is None or record["status"] == status)
+        ]
+        records.sort(key=lambda item: item[1]["created_at"])
+        yield from records
+
+    def count(self, status: str | None = None) -> int:
+        unflushed = self._unflushed()
+        if status is None:
+            total = self._reader().execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+        else:
+            total = self._reader().execute("SELECT COUNT(*) FROM tasks WHERE status = ?", (status,)).fetchone()[0]
+        for task_id, committed in self._committed_statuses(unflushed).items():
+            if status is None or committed == status:
+                total -= 1
+        return total + sum(
+            1 for record in unflushed.values()
+            if record is not None and (status is None or record["status"] == status)
+        )
+
+    def count_by_status(self) -> Dict[str, int]:
+        unflushed = self._unflushed()
+        counts = Counter(dict(
+            self._reader().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        ))
+        counts.subtract(self._committed_statuses(unflushed).values())
+        counts.update(record["status"] for record in unflushed.values() if record is not None)
+        return {status: count for status, count in counts.items() if count > 0}
+
+    def _committed_statuses(self, task_ids) -> Dict[str, str]:
+        """The statuses the database holds for the given tasks, for those it has."""
+        task_ids = list(task_ids)
+        statuses: Dict[str, str] = {}
+        # Stay under SQLite's limit on bound parameters.
+        for start in range(0, len(task_ids), 500):
+            chunk = task_ids[start:start + 500]
+            statuses.update(self._reader().execute(
+                f"SELECT task_id, status FROM tasks WHERE task_id IN ({', '.join('?' * len(chunk))})", chunk
+            ).fetchall())
+        return statuses
+
+    def stale_tasks(self, status: str, updated_before: float) -> list[str]:
+        unflushed = self._unflushed()
+        rows = self._reader().execute(
+            "SELECT task_id FROM tasks WHERE status = ? AND updated_at < ?", (status, updated_before)
+        ).fetchall()
+        return [row[0] for row in rows if row[0] not in unflushed] + [
+            task_id for task_id, record in unflushed.items()
+            if record is not None and record["status"] == status and record["updated_at"] < updated_before
+        ]
+
+    def least_recently_updated(self, limit: int) -> list[str]:
+        unflushed = self._unflushed()
+        rows = self._reader().execute(
+            "SELECT task_id, updated_at FROM tasks ORDER BY updated_at LIMIT ?", (limit + len(unflushed),)
+        ).fetchall()
+        candidates = [(updated_at, task_id) for task_id, updated_at in rows if task_id not in unflushed]
+        candidates += [
+            (record["updated_at"], task_id) for task_id, record in unflushed.items() if record is not None
+        ]
+        return [task_id for _, task_id in sorted(candidates)[:limit]]
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        with self._write_lock:
+            self._conn.close()
+        with self._lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+
+
+def create_task_store(settings: dict | None) -> TaskStore:
+    """Builds a task store from the `task_store` block of config.yaml."""
+    settings = settings or {}
+    backend = settings.get("backend", "memory")
+    if backend == "memory":
+        return InMemoryTaskStore()
+    if backend == "sqlite":
+        path = Path(settings.get("path", DEFAULT_SQLITE_PATH))
+        if not path.is_absolute():
+            path = PROJECT_ROOT / path
+        return SQLiteTaskStore(
+            path=path,
+            batch_size=int(settings.get("batch_size", 100)),
+            flush_interval=float(settings.get("flush_interval_seconds", 0.05)),
+        )
+    raise ValueError(f"Unknown task_store backend '{backend}'. Expected 'memory' or 'sqlite'.")
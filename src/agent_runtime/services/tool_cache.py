@@ -0,0 +1,197 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from agents.mcp import MCPServerStdio, MCPServerStreamableHttp
+from mcp.types import CallToolResult, Tool as MCPTool
+
+from agent_runtime.services.single_flight import SingleFlight
+
+
+@dataclass(frozen=True)
+class ToolCachePolicy:
+    """How the results of one tool may be cached."""
+    cacheable: bool = False
+    ttl_seconds: float = 300.0
+    max_entry_bytes: int = 1_048_576
+
+    @classmethod
+    def from_config(cls, settings: dict | None, base: "ToolCachePolicy | None" = None) -> "ToolCachePolicy":
+        base = base or cls()
+        settings = settings or {}
+        return cls(
+            cacheable=bool(settings.get("cacheable", base.cacheable)),
+            ttl_seconds=float(settings.get("ttl_seconds", base.ttl_seconds)),
+            max_entry_bytes=int(settings.get("max_entry_bytes", base.max_entry_bytes)),
+        )
+
+
+class ToolCachePolicies:
+    """
+    The caching policies of one server's tools, read from the `tool_cache`
+    block of its tool_registry.yaml entry: a `default` policy plus per-tool
+    overrides under `tools`. Nothing is cached unless a policy says so.
+    """
+
+    def __init__(self, settings: dict | None):
+        settings = settings or {}
+        self.default = ToolCachePolicy.from_config(settings.get("default"))
+        self.tools = {
+            name: ToolCachePolicy.from_config(tool_settings, self.default)
+            for name, tool_settings in (settings.get("tools") or {}).items()
+        }
+
+    def for_tool(self, tool_name: str) -> ToolCachePolicy:
+        return self.tools.get(tool_name, self.default)
+
+
+def is_write_tool(tool: MCPTool) -> bool:
+    """True if the server declares that a tool modifies its environment."""
+    annotations = tool.annotations
+    if annotations is None:
+        return False
+    return annotations.readOnlyHint is False or bool(annotations.destructiveHint)
+
+
+@dataclass
+class _Entry:
+    result: CallToolResult
+    size: int
+    expires_at: float
+
+
+class ToolResultCache:
+    """
+    A process-wide LRU of MCP tool results, shared by every task.
+
+    Entries are keyed by server, tool name and canonicalised arguments, expire
+    after their tool's TTL and are bounded by `max_entries` and `max_bytes`
+    overall. Error results are never cached.
+    """
+
+    def __init__(self):
+        self.max_entries = 1000
+        self.max_bytes = 64 * 1024 * 1024
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def configure(self, settings: dict | None):
+        """Applies the `tool_cache` block of config.yaml."""
+        settings = settings or {}
+        self.max_entries = int(settings.get("max_entries", self.max_entries))
+        self.max_bytes = int(settings.get("max_bytes", self.max_bytes))
+
+    @staticmethod
+    def key_for(server_id: str, tool_name: str, arguments: dict[str, Any] | None) -> str:
+        canonical = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return hashlib.sha256(f"{server_id}\0{tool_name}\0{canonical}".encode()).hexdigest()
+
+    def count(self, server_id: str, tool_name: str, outcome: str):
+        """Counts a hit, miss, bypass or call coalesced with an identical one in flight for a tool."""
+        stats = self._stats.setdefault(
+            f"{server_id}/{tool_name}", {"hits": 0, "misses": 0, "coalesced": 0, "bypassed": 0}
+        )
+        stats[outcome] += 1
+
+    def get(self, key: str) -> CallToolResult | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.result
+
+    def put(self, key: str, result: CallToolResult, policy: ToolCachePolicy):
+        if result.isError:
+            return
+        size = len(result.model_dump_json())
+        if size > policy.max_entry_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = _Entry(result, size, time.monotonic() + policy.ttl_seconds)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def stats(self) -> dict:
+        """
+        Returns cache occupancy and hit rates per tool. Coalesced calls did not
+        reach the server either, so they count as hits in the hit rate.
+        """
+        tools = {}
+        for name, counts in self._stats.items():
+            served = counts["hits"] + counts["coalesced"]
+            lookups = served + counts["misses"]
+            tools[name] = {**counts, "hit_rate": served / lookups if lookups else 0.0}
+        return {"entries": len(self._entries), "bytes": self._bytes, "tools": tools}
+
+
+# Singleton instance of the tool result cache, shared by all cached servers.
+tool_result_cache = ToolResultCache()
+
+# Identical cacheable calls made at the same time reach the server once.
+tool_flights = SingleFlight("tool_calls")
+
+
+class CachingToolsMixin:
+    """
+    Adds result caching to an MCP server class. Calls to tools whose policy
+    is cacheable are answered from `tool_result_cache` when possible, and
+    identical calls in flight at the same time are made only once; tools
+    the server marks as writing (not read-only, or destructive) always
+    bypass the cache, whatever the policy says.
+    """
+
+    server_id: str
+
+    def __init__(self, *args: Any, tool_policies: ToolCachePolicies, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.tool_policies = tool_policies
+        self._write_tools: set[str] = set()
+
+    async def list_tools(self, *args: Any, **kwargs: Any) -> list[MCPTool]:
+        tools = await super().list_tools(*args, **kwargs)
+        self._write_tools = {tool.name for tool in tools if is_write_tool(tool)}
+        return tools
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any] | None) -> CallToolResult:
+        policy = self.tool_policies.for_tool(tool_name)
+        if not policy.cacheable or tool_name in self._write_tools:
+            tool_result_cache.count(self.server_id, tool_name, "bypassed")
+            return await super().call_tool(tool_name, arguments)
+
+        key = tool_result_cache.key_for(self.server_id, tool_name, arguments)
+        cached = tool_result_cache.get(key)
+        if cached is not None:
+            tool_result_cache.count(self.server_id, tool_name, "hits")
+            return cached
+        tool_result_cache.count(
+            self.server_id, tool_name, "coalesced" if tool_flights.in_flight(key) else "misses"
+        )
+        call_tool = super().call_tool
+
+        async def call() -> CallToolResult:
+            result = await call_tool(tool_name, arguments)
+            tool_result_cache.put(key, result, policy)
+            return result
+
+        return await tool_flights.do(key, call)
+
+
+class CachingMCPServerStdio(CachingToolsMixin, MCPServerStdio):
+    """A stdio MCP server whose tool results are cached per its policies."""
+
+
+class CachingMCPServerStreamableHttp(CachingToolsMixin, MCPServerStreamableHttp):
+    """A streamable HTTP MCP server whose tool results are cached per its policies."""
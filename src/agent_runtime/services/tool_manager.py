@@ -1,21 +1,22 @@
 import yaml
+import logging
 import subprocess
 import sys
 import json
-from pathlib import Path
+from functools import lru_cache
 
-# Navigate up to the project root from the current file's location (src/agent_runtime/services)
-PROJECT_ROOT = Path(__file__).parent.parent.parent
-TOOL_REGISTRY_PATH = PROJECT_ROOT / "tool_registry.yaml"
+from agent_runtime.constants import TOOL_REGISTRY_PATH
+
+logger = logging.getLogger(__name__)
 
 def get_required_npm_packages():
     """
     Parses the tool_registry.yaml to find all required npm packages
     for local_stdio tools.
     """
-    print(f"ToolManager: Reading tool registry from: {TOOL_REGISTRY_PATH}")
+    logger.info("Reading tool registry from: %s", TOOL_REGISTRY_PATH)
     if not TOOL_REGISTRY_PATH.exists():
-        print(f"Warning: Tool registry not found at {TOOL_REGISTRY_PATH}. Skipping tool setup.")
+        logger.warning("Tool registry not found at %s. Skipping tool setup.", TOOL_REGISTRY_PATH)
         return []
 
     with open(TOOL_REGISTRY_PATH, "r") as f:
@@ -35,11 +36,20 @@ def get_required_npm_packages():
                 if "@" in package_name or "/" in package_name:
                     packages.append(package_name)
 
-    print(f"ToolManager: Found required npm packages: {packages}")
+    logger.info("Found required npm packages: %s", packages)
     return list(set(packages)) # Return unique packages
 
 def get_installed_npm_packages():
     """Returns a set of globally installed npm packages."""
+    return set(get_installed_npm_package_versions().keys())
+
+@lru_cache(maxsize=1)
+def get_installed_npm_package_versions() -> dict[str, str]:
+    """
+    Returns a mapping of globally installed npm packages to their versions.
+    The result is cached for the life of the process; call `cache_clear()`
+    after installing packages.
+    """
     try:
         # npm ls -g --depth=0 gets the top-level global packages
         # The --json flag provides easy-to-parse output
@@ -48,22 +58,41 @@ def get_installed_npm_packages():
             capture_output=True, text=True, check=True
         )
         data = json.loads(result.stdout)
-        return set(data.get("dependencies", {}).keys())
+        return {
+            name: info.get("version", "")
+            for name, info in data.get("dependencies", {}).items()
+        }
     except (FileNotFoundError, subprocess.CalledProcessError, json.JSONDecodeError) as e:
-        print(f"Warning: Could not list installed npm packages: {e}. Assuming none are installed.")
-        return set()
+        logger.warning("Could not list installed npm packages: %s. Assuming none are installed.", e)
+        return {}
+
+def get_npm_package_name(tool: dict) -> str | None:
+    """
+    Returns the npm package a local_stdio tool runs, without any version
+    specifier, or None if the tool does not run an npm package.
+    """
+    if tool.get("type") != "local_stdio":
+        return None
+    # The package name is expected to be the first argument after the command.
+    args = tool.get("config", {}).get("args", [])
+    if not args or not ("@" in args[0] or "/" in args[0]):
+        return None
+    package_name = args[0]
+    # Strip a trailing version specifier, e.g. "@kazuph/mcp-fetch@1.2.0"
+    if package_name.rfind("@") > 0:
+        package_name = package_name[:package_name.rfind("@")]
+    return package_name
 
 def setup_tools():
     """
     Checks for and installs required npm packages for local tools if they
     are not already installed.
     """
-    print("\\n--- ToolManager: Setting up local tools ---")
+    logger.info("Setting up local tools...")
     required_packages = get_required_npm_packages()
     
     if not required_packages:
-        print("ToolManager: No local stdio tools with npm packages found to install.")
-        print("------------------------------------------\\n")
+        logger.info("No local stdio tools with npm packages found to install.")
         return
 
     installed_packages = get_installed_npm_packages()
@@ -71,11 +100,10 @@ def setup_tools():
     packages_to_install = [p for p in required_packages if p not in installed_packages]
 
     if not packages_to_install:
-        print("ToolManager: All required npm packages are already installed.")
-        print("------------------------------------------\\n")
+        logger.info("All required npm packages are already installed.")
         return
 
-    print(f"ToolManager: Found {len(packages_to_install)} new package(s) to install: {', '.join(packages_to_install)}")
+    logger.info("Found %d new package(s) to install: %s", len(packages_to_install), ", ".join(packages_to_install))
 
     # The -g flag installs the packages globally.
     command = ["npm", "install", "-g"] + packages_to_install
@@ -84,24 +112,22 @@ def setup_tools():
         # We use sys.executable to run npm via a python subprocess
         # This can be more reliable in some environments.
         # However, a direct call to npm is often simpler. Let's do that.
-        print(f"Executing command: {' '.join(command)}")
+        logger.info("Executing command: %s", " ".join(command))
         # Using capture_output=True to hide the npm output unless there's an error.
         result = subprocess.run(command, check=True, text=True, capture_output=True)
-        print("ToolManager: All required npm packages are installed successfully.")
+        get_installed_npm_package_versions.cache_clear()
+        logger.info("All required npm packages are installed successfully.")
         if result.stdout:
-            print("NPM Output:\\n", result.stdout)
+            logger.debug("NPM output:\n%s", result.stdout)
 
     except FileNotFoundError:
-        print("Error: 'npm' command not found. Please ensure Node.js and npm are installed and in your PATH.")
+        logger.error("'npm' command not found. Please ensure Node.js and npm are installed and in your PATH.")
         sys.exit(1)
     except subprocess.CalledProcessError as e:
-        print(f"Error installing npm packages: {e}")
-        print("NPM Stderr:\\n", e.stderr)
-        print("NPM Stdout:\\n", e.stdout)
+        logger.error("Error installing npm packages: %s\nNPM stderr:\n%s\nNPM stdout:\n%s", e, e.stderr, e.stdout)
         sys.exit(1)
-    
-    print("------------------------------------------\\n")
 
 if __name__ == '__main__':
     # Allow running this script directly for manual setup if needed.
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
     setup_tools() 
\ No newline at end of file
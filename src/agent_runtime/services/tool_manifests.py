@@ -0,0 +1,192 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+from agents.mcp import MCPServer
+from mcp.types import ListPromptsResult, Tool as MCPTool
+
+from agent_runtime.constants import PROJECT_ROOT, TOOL_REGISTRY_PATH
+from agent_runtime.services.tool_manager import get_installed_npm_package_versions, get_npm_package_name
+
+MANIFEST_CACHE_PATH = PROJECT_ROOT / "cache" / "tool_manifests.json"
+
+logger = logging.getLogger(__name__)
+
+
+class ManifestServer(MCPServer):
+    """
+    Stands in for an MCP server by serving a previously captured tool listing.
+    It lets the planner see every tool without the server process running;
+    calling a tool through it is an error.
+    """
+
+    def __init__(self, server_id: str, tools: list[MCPTool]):
+        super().__init__()
+        self.server_id = server_id
+        self._tools = list(tools)
+
+    async def connect(self):
+        pass
+
+    @property
+    def name(self) -> str:
+        return self.server_id
+
+    async def cleanup(self):
+        pass
+
+    @property
+    def cached_tools(self) -> list[MCPTool] | None:
+        return list(self._tools)
+
+    async def list_tools(self, run_context: Any = None, agent: Any = None) -> list[MCPTool]:
+        return list(self._tools)
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any] | None, meta: dict[str, Any] | None = None):
+        raise RuntimeError(
+            f"Tool '{tool_name}' cannot be called: server '{self.server_id}' is not active during planning."
+        )
+
+    async def list_prompts(self) -> ListPromptsResult:
+        return ListPromptsResult(prompts=[])
+
+    async def get_prompt(self, name: str, arguments: dict[str, Any] | None = None):
+        raise RuntimeError(f"Server '{self.server_id}' does not serve prompts during planning.")
+
+
+def servers_named_in(plan: str, manifests: dict[str, list[MCPTool]]) -> list[str] | None:
+    """
+    Returns the ids of the servers whose tools are named in the plan text.
+    Returns None when the plan names no known tool, meaning every server may be needed.
+    """
+    server_ids = [
+        server_id
+        for server_id, tools in manifests.items()
+        if any(re.search(rf"(?<![\w-]){re.escape(tool.name)}(?![\w-])", plan) for tool in tools)
+    ]
+    return server_ids or None
+
+
+class ToolManifestCache:
+    """
+    A persistent JSON store of MCP tool listings.
+
+    Entries are keyed by a hash of the server's registry entry plus the
+    version of the npm package it runs, so listings survive restarts but are
+    never served for a server whose configuration or package has changed.
+    The whole store is discarded when tool_registry.yaml changes.
+
+    The store is read from disk once; after that reads are served from
+    memory, with the key of each registry entry and its parsed listing
+    computed once. `version` changes whenever the cached listings do.
+    """
+
+    def __init__(self, path: Path = MANIFEST_CACHE_PATH, registry_path: Path = TOOL_REGISTRY_PATH):
+        self._path = path
+        self._registry_path = registry_path
+        self._registry_hash: str | None = None
+        self._entries: dict[str, dict] | None = None
+        # Key of each registry entry seen, by the entry's canonical JSON.
+        self._keys: dict[str, str] = {}
+        self._tools: dict[str, list[MCPTool]] = {}
+        self.version = 0
+
+    def configure(self, settings: dict | None):
+        """Applies the `tool_manifests` block of config.yaml."""
+        settings = settings or {}
+        path = Path(settings.get("path", self._path))
+        path = path if path.is_absolute() else PROJECT_ROOT / path
+        if path != self._path:
+            self._path = path
+            self.refresh()
+
+    def _current_registry_hash(self) -> str:
+        try:
+            return hashlib.sha256(self._registry_path.read_bytes()).hexdigest()
+        except FileNotFoundError:
+            return ""
+
+    def _read(self) -> dict[str, dict]:
+        """Reads the entries stored on disk for the current registry."""
+        try:
+            data = json.loads(self._path.read_text())
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning("Ignoring unreadable tool manifest cache at %s: %s", self._path, e)
+            return {}
+        return data.get("entries", {}) if data.get("registry_hash") == self._registry_hash else {}
+
+    def _ensure_loaded(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._registry_hash = self._current_registry_hash()
+            self._entries = self._read()
+        return self._entries
+
+    def refresh(self):
+        """Forgets everything read so far, e.g. after tool_registry.yaml or npm packages changed."""
+        self._entries = None
+        self._keys.clear()
+        self._tools.clear()
+        self.version += 1
+
+    def _save(self):
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # Per process, as several workers may warm up and save at once.
+        tmp_path = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"registry_hash": self._registry_hash, "entries": self._entries}))
+        os.replace(tmp_path, self._path)
+
+    @staticmethod
+    def compute_key(server_config: dict) -> str:
+        """Hashes a registry entry together with the version of its npm package."""
+        return ToolManifestCache._hash(server_config, json.dumps(server_config, sort_keys=True, default=str))
+
+    @staticmethod
+    def _hash(server_config: dict, content: str) -> str:
+        package_name = get_npm_package_name(server_config)
+        version = get_installed_npm_package_versions().get(package_name, "") if package_name else ""
+        return hashlib.sha256(f"{content}|{version}".encode()).hexdigest()
+
+    def key_for(self, server_config: dict) -> str:
+        """
+        The key of a registry entry, computed once per distinct entry. Entries
+        re-read from the registry map to the key already computed for them.
+        """
+        content = json.dumps(server_config, sort_keys=True, default=str)
+        key = self._keys.get(content)
+        if key is None:
+            key = self._keys[content] = self._hash(server_config, content)
+        return key
+
+    def get(self, server_config: dict) -> list[MCPTool] | None:
+        """Returns the cached tool listing for a registry entry, if any."""
+        key = self.key_for(server_config)
+        tools = self._tools.get(key)
+        if tools is None:
+            entry = self._ensure_loaded().get(key)
+            if entry is None:
+                return None
+            tools = self._tools[key] = [MCPTool.model_validate(tool) for tool in entry["tools"]]
+        return list(tools)
+
+    def put(self, server_config: dict, tools: list[MCPTool]):
+        """Stores the tool listing for a registry entry, merging with what other processes stored."""
+        key = self.key_for(server_config)
+        self._ensure_loaded()
+        self._entries = {**self._read(), **self._entries}
+        self._entries[key] = {
+            "server_id": server_config.get("id"),
+            "tools": [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in tools],
+        }
+        self._tools[key] = list(tools)
+        self.version += 1
+        self._save()
+
+
+# Singleton instance of the manifest cache, shared by the server pool and the API.
+manifest_cache = ToolManifestCache()
@@ -1,86 +1,214 @@
 import asyncio
+import logging
 from pathlib import Path
 import yaml
 from contextlib import asynccontextmanager
 
 from agents.mcp import MCPServer, MCPServerStdio, MCPServerStreamableHttp
-from agent_runtime.constants import PROJECT_ROOT
+from agent_runtime.constants import TOOL_REGISTRY_PATH
+from agent_runtime.services.tool_cache import CachingMCPServerStdio, CachingMCPServerStreamableHttp, ToolCachePolicies
 # In the future, we would add MCPServerSse and MCPServerStreamableHttp here
 
+# Per-server override: `startup_timeout_seconds` in the tool_registry.yaml entry.
+DEFAULT_STARTUP_TIMEOUT_SECONDS = 60.0
+
+logger = logging.getLogger(__name__)
+
+class ServerHandle:
+    """
+    Runs an MCP server inside a dedicated owner task.
+
+    The SDK's transports must be entered and exited in the same task, so the
+    owner task connects the server, waits until it is asked to stop and then
+    cleans the server up itself, whichever task started or stops it.
+    """
+
+    def __init__(self, server: MCPServer):
+        self.server = server
+        self.server_id = getattr(server, "server_id", "N/A")
+        self._stop_event = asyncio.Event()
+        self._owner: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._owner is not None and not self._owner.done()
+
+    async def _run(self, ready: asyncio.Future):
+        try:
+            try:
+                await self.server.connect()
+            except asyncio.CancelledError:
+                # connect() only cleans up after ordinary errors.
+                await self.server.cleanup()
+                raise
+            ready.set_result(None)
+            try:
+                await self._stop_event.wait()
+            finally:
+                await self.server.cleanup()
+        except BaseException as e:
+            if not ready.done():
+                if isinstance(e, asyncio.CancelledError):
+                    ready.cancel()
+                else:
+                    ready.set_exception(e)
+            raise
+
+    async def start(self, timeout: float):
+        """Starts the owner task and waits for the handshake, up to `timeout` seconds."""
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._owner = asyncio.create_task(self._run(ready))
+        try:
+            await asyncio.wait_for(asyncio.shield(ready), timeout=timeout)
+        except asyncio.TimeoutError:
+            await self._cancel()
+            raise TimeoutError(f"startup timed out after {timeout}s") from None
+        except BaseException:
+            await self._cancel()
+            raise
+
+    async def _cancel(self):
+        self._owner.cancel()
+        await asyncio.gather(self._owner, return_exceptions=True)
+
+    async def stop(self):
+        """
+        Asks the owner task to clean the server up and waits for it to finish.
+        Raises what the owner task failed with; an owner that was cancelled
+        has simply stopped, and only cancelling the caller raises CancelledError.
+        """
+        if self._owner is not None:
+            self._stop_event.set()
+            await asyncio.wait([self._owner])
+            if not self._owner.cancelled() and self._owner.exception() is not None:
+                raise self._owner.exception()
+
+
 class ToolRegistry:
     """
     Manages the lifecycle of all MCP servers based on the application configuration.
     """
 
     def __init__(self):
-        self._config_path = PROJECT_ROOT / "tool_registry.yaml"
+        self._config_path = TOOL_REGISTRY_PATH
         self._config = self._load_config()
-        self._server_contexts: list[MCPServer] = []
+        self._handles: list[ServerHandle] = []
+        self.failed_servers: dict[str, str] = {}
 
     def _load_config(self) -> dict:
         """Loads and validates the tool registry configuration."""
-        print(f"ToolRegistry: Loading configuration from: {self._config_path}")
+        logger.info("Loading configuration from: %s", self._config_path)
         with open(self._config_path, "r") as f:
             full_config = yaml.safe_load(f)
         
         # We could add validation logic here (e.g., using Pydantic)
         return full_config.get("tool_registry", [])
 
+    def enabled_configs(self) -> list[dict]:
+        """Returns the configuration entries of all enabled servers."""
+        return [entry for entry in self._config if entry.get("enabled", False)]
+
+    def get_config(self, server_id: str) -> dict | None:
+        """Returns the configuration entry for a given server id, if any."""
+        for entry in self._config:
+            if entry.get("id") == server_id:
+                return entry
+        return None
+
+    def build_server(self, server_config: dict) -> MCPServer | None:
+        """
+        Builds (but does not start) an MCP server instance from a configuration entry.
+        Entries with a `tool_cache` block get a server that caches tool results.
+        Returns None if the entry cannot be turned into a server.
+        """
+        server_type = server_config.get("type")
+        server_id = server_config.get("id", "N/A")
+        caching = "tool_cache" in server_config
+        cache_kwargs = {"tool_policies": ToolCachePolicies(server_config["tool_cache"])} if caching else {}
+
+        server = None
+        if server_type == "local_stdio":
+            command_params = server_config.get("config", {}).copy()
+            kwargs = {}
+            if "client_session_timeout_seconds" in server_config:
+                kwargs["client_session_timeout_seconds"] = server_config["client_session_timeout_seconds"]
+
+            server_class = CachingMCPServerStdio if caching else MCPServerStdio
+            server = server_class(command_params, cache_tools_list=True, **kwargs, **cache_kwargs)
+
+        # Future server types would be handled here
+        elif server_type == "remote_http":
+            config = server_config.get("config", {})
+            base_url = config.get("base_url")
+            if not base_url:
+                logger.warning("'base_url' not configured for remote_http server '%s'. Skipping.", server_id)
+                return None
+            server_class = CachingMCPServerStreamableHttp if caching else MCPServerStreamableHttp
+            server = server_class(params={"url": base_url}, cache_tools_list=True, **cache_kwargs)
+        # elif server_type == "remote_sse":
+        #     ...
+
+        else:
+            logger.warning("Server type '%s' is not currently supported.", server_type)
+            return None
+
+        server.server_id = server_id  # For better logging
+        return server
+
+    def startup_timeout_for(self, server_config: dict) -> float:
+        """Returns the startup timeout for a server, falling back to the registry default."""
+        return float(server_config.get("startup_timeout_seconds", DEFAULT_STARTUP_TIMEOUT_SECONDS))
+
+    async def _start_server(self, server_config: dict) -> ServerHandle | None:
+        """
+        Starts a single server, bounded by its startup timeout.
+        Failures are recorded in `failed_servers` and reported as None.
+        """
+        server_id = server_config.get("id", "N/A")
+        logger.debug("Initializing '%s' server of type '%s'...", server_id, server_config.get("type"))
+
+        server = self.build_server(server_config)
+        if server is None:
+            return None
+
+        handle = ServerHandle(server)
+        try:
+            await handle.start(timeout=self.startup_timeout_for(server_config))
+        except Exception as e:
+            self.failed_servers[server_id] = str(e) or type(e).__name__
+            logger.warning("'%s' server failed to start (%s). Skipping.", server_id, self.failed_servers[server_id])
+            return None
+        logger.debug("'%s' server started successfully.", server_id)
+        return handle
+
     async def start_servers(self) -> list[MCPServer]:
         """
-        Starts all enabled MCP servers based on the configuration.
+        Starts all enabled MCP servers concurrently based on the configuration.
+        Servers that fail or time out are skipped without blocking the others.
         Returns a list of active server instances.
         """
-        print("\\n--- Starting MCP Servers ---")
-        active_servers = []
-        for server_config in self._config:
-            if not server_config.get("enabled", False):
-                continue
-
-            server_type = server_config.get("type")
-            server_id = server_config.get("id", "N/A")
-            print(f"Initializing '{server_id}' server of type '{server_type}'...")
-
-            server = None
-            if server_type == "local_stdio":
-                command_params = server_config.get("config", {}).copy()
-                kwargs = {}
-                if "client_session_timeout_seconds" in server_config:
-                    kwargs["client_session_timeout_seconds"] = server_config["client_session_timeout_seconds"]
-                
-                server = MCPServerStdio(command_params, cache_tools_list=True, **kwargs)
-            
-            # Future server types would be handled here
-            elif server_type == "remote_http":
-                config = server_config.get("config", {})
-                base_url = config.get("base_url")
-                if not base_url:
-                    print(f"Warning: 'base_url' not configured for remote_http server '{server_id}'. Skipping.")
-                    continue
-                server = MCPServerStreamableHttp(params={"url": base_url}, cache_tools_list=True)
-            # elif server_type == "remote_sse":
-            #     ...
-
-            else:
-                print(f"Warning: Server type '{server_type}' is not currently supported.")
-                continue
-
-            if server:
-                server.server_id = server_id  # For better logging
-                await server.__aenter__()
-                self._server_contexts.append(server)
-                active_servers.append(server)
-                print(f"-> '{server_id}' server started successfully.")
-        
-        print("----------------------------\\n")
-        return active_servers
+        logger.info("Starting MCP servers...")
+        self.failed_servers = {}
+        results = await asyncio.gather(
+            *(self._start_server(server_config) for server_config in self.enabled_configs())
+        )
+        handles = [handle for handle in results if handle is not None]
+        self._handles.extend(handles)
+        if self.failed_servers:
+            logger.warning("%d server(s) failed to start: %s", len(self.failed_servers), ", ".join(self.failed_servers))
+        return [handle.server for handle in handles]
+
+    async def _shutdown_server(self, handle: ServerHandle):
+        logger.debug("Shutting down '%s' server...", handle.server_id)
+        try:
+            await handle.stop()
+        except Exception as e:
+            logger.warning("Error while shutting down '%s' server: %s", handle.server_id, e)
+            return
+        logger.debug("'%s' server shut down.", handle.server_id)
 
     async def shutdown_servers(self):
-        """Shuts down all managed MCP servers."""
-        print("\\n--- Shutting Down MCP Servers ---")
-        for server in reversed(self._server_contexts):
-            server_id = getattr(server, 'server_id', 'N/A')
-            print(f"Shutting down '{server_id}' server...")
-            await server.__aexit__(None, None, None)
-            print(f"-> '{server_id}' server shut down.")
-        print("-------------------------------\\n")
+        """Shuts down all managed MCP servers concurrently."""
+        logger.info("Shutting down MCP servers...")
+        handles, self._handles = self._handles, []
+        await asyncio.gather(*(self._shutdown_server(handle) for handle in handles))
@@ -0,0 +1,362 @@
+import json
+import logging
+import queue
+import secrets
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+from agent_runtime.constants import PROJECT_ROOT
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """The identity of a span: W3C trace context ids and the sampling decision of its trace."""
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    @property
+    def traceparent(self) -> str:
+        """The context as a W3C `traceparent` value."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    @classmethod
+    def from_traceparent(cls, value: str | None) -> "SpanContext | None":
+        parts = (value or "").split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            return None
+        return cls(trace_id=parts[1], span_id=parts[2], sampled=parts[3] == "01")
+
+
+class Span:
+    """A timed operation within a trace. Only spans of sampled traces are exported."""
+
+    __slots__ = ("name", "context", "parent_id", "start_ns", "end_ns", "attributes", "error", "_tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, context: SpanContext, parent_id: str | None,
+                 attributes: dict[str, Any] | None = None, start_ns: int | None = None):
+        self._tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes or {}
+        self.error: str | None = None
+
+    def set_attribute(self, key: str, value: Any):
+        if self.context.sampled:
+            self.attributes[key] = value
+
+    def end(self, error: BaseException | str | None = None, end_ns: int | None = None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        if error is not None:
+            self.error = str(error) or type(error).__name__
+        if self.context.sampled:
+            self._tracer._export(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6 if self.end_ns else None,
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+
+class SpanExporter(ABC):
+    """Sends a batch of finished spans somewhere. Called from the export thread only."""
+
+    @abstractmethod
+    def export(self, spans: list[Span]):
+        ...
+
+    def close(self):
+        """Releases the exporter's resources."""
+
+
+class JsonFileExporter(SpanExporter):
+    """Appends spans to a file, one JSON object per line."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def export(self, spans: list[Span]):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        for span in spans:
+            self._file.write(json.dumps(span.to_dict(), default=str) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPHttpExporter(SpanExporter):
+    """
+    Posts spans to an OpenTelemetry collector using OTLP/HTTP with the JSON
+    encoding, e.g. to http://localhost:4318/v1/traces.
+    """
+
+    def __init__(self, endpoint: str, service_name: str, headers: dict[str, str] | None = None, timeout: float = 10.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+
+    def _span(self, span: Span) -> dict[str, Any]:
+        encoded = {
+            "traceId": span.context.trace_id,
+            "spanId": span.context.span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": [{"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+    def payload(self, spans: list[Span]) -> dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "agent_runtime"}, "spans": [self._span(span) for span in spans]}],
+            }]
+        }
+
+    def export(self, spans: list[Span]):
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(self.payload(spans)).encode(), headers=self.headers, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+# The span that new spans are children of, in the current task.
+_current: ContextVar[SpanContext | None] = ContextVar("agent_runtime_span", default=None)
+
+
+class Tracer:
+    """
+    Span-based tracing with one trace per task.
+
+    Whether a trace is recorded is decided once, when it starts, from
+    `sample_ratio` and the trace id, and inherited by all its spans: spans of
+    unsampled traces still carry ids for log correlation but are never
+    exported. Finished spans are queued without blocking and exported in
+    batches by a background thread; when the queue is full new spans are
+    dropped and counted.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_ratio = 1.0
+        self.batch_size = 512
+        self.flush_interval = 1.0
+        self.max_queue_size = 2048
+        self.exporter: SpanExporter | None = None
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue_size)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._counters = {"exported": 0, "dropped": 0, "export_errors": 0}
+
+    def configure(self, settings: dict | None):
+        """Applies the `tracing` block of config.yaml."""
+        settings = settings or {}
+        self.shutdown()
+        self.enabled = bool(settings.get("enabled", False))
+        self.sample_ratio = min(1.0, max(0.0, float(settings.get("sample_ratio", self.sample_ratio))))
+        self.batch_size = max(1, int(settings.get("batch_size", self.batch_size)))
+        self.flush_interval = float(settings.get("flush_interval_seconds", self.flush_interval))
+        self.max_queue_size = max(1, int(settings.get("max_queue_size", self.max_queue_size)))
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self.exporter = self._create_exporter(settings) if self.enabled else None
+
+    @staticmethod
+    def _create_exporter(settings: dict) -> SpanExporter | None:
+        exporter = settings.get("exporter", "json")
+        if exporter == "json":
+            path = Path(settings.get("json_path", "logs/traces.jsonl"))
+            return JsonFileExporter(path if path.is_absolute() else PROJECT_ROOT / path)
+        if exporter == "otlp":
+            return OTLPHttpExporter(
+                endpoint=settings.get("otlp_endpoint", "http://localhost:4318/v1/traces"),
+                service_name=settings.get("service_name", "agent-runtime"),
+                headers=settings.get("otlp_headers"),
+            )
+        if exporter == "none":
+            return None
+        raise ValueError(f"Unknown tracing exporter '{exporter}'. Expected 'json', 'otlp' or 'none'.")
+
+    def _sampled(self, trace_id: str) -> bool:
+        # The decision depends only on the trace id, so every process agrees on it.
+        return int(trace_id[:16], 16) < self.sample_ratio * 2**64
+
+    def new_trace(self) -> SpanContext | None:
+        """Starts a trace, returning the context of its root span, or None while tracing is disabled."""
+        if not self.enabled:
+            return None
+        trace_id = secrets.token_hex(16)
+        return SpanContext(trace_id=trace_id, span_id=secrets.token_hex(8), sampled=self._sampled(trace_id))
+
+    @staticmethod
+    def current() -> SpanContext | None:
+        """The context of the innermost active span, if any."""
+        return _current.get()
+
+    def start_span(self, name: str, attributes: dict[str, Any] | None = None, parent: SpanContext | None = None) -> Span | None:
+        """
+        Starts a span under `parent` (the current span by default) without
+        making it current. Returns None when there is no trace to add it to.
+        """
+        parent = parent or _current.get()
+        if parent is None:
+            return None
+        context = SpanContext(trace_id=parent.trace_id, span_id=secrets.token_hex(8), sampled=parent.sampled)
+        return Span(self, name, context, parent.span_id, dict(attributes) if parent.sampled and attributes else None)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span | None]:
+        """Runs the block in a child span of the current span; does nothing outside a trace."""
+        span = self.start_span(name, attributes)
+        if span is None:
+            yield None
+            return
+        token = _current.set(span.context)
+        try:
+            yield span
+        except BaseException as e:
+            span.end(error=e)
+            raise
+        finally:
+            _current.reset(token)
+            span.end()
+
+    @contextmanager
+    def use(self, context: SpanContext | None) -> Iterator[None]:
+        """Makes `context`, e.g. a task's root span restored from the task store, the current span."""
+        if context is None:
+            yield
+            return
+        token = _current.set(context)
+        try:
+            yield
+        finally:
+            _current.reset(token)
+
+    def record_span(self, name: str, context: SpanContext, start_ns: int, attributes: dict[str, Any] | None = None,
+                    error: str | None = None):
+        """Exports a span that has already finished, such as a task's root span once the task is over."""
+        if not self.enabled or not context.sampled:
+            return
+        Span(self, name, context, None, attributes, start_ns=start_ns).end(error=error)
+
+    def _export(self, span: Span):
+        if self.exporter is None:
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self._counters["dropped"] += 1
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if first is None:
+                break
+            batch = [first]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    span = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if span is None:
+                    stop = True
+                    break
+                batch.append(span)
+            self._send(batch)
+            if stop:
+                break
+
+    def _send(self, batch: list[Span]):
+        try:
+            self.exporter.export(batch)
+            self._counters["exported"] += len(batch)
+        except Exception as e:
+            self._counters["export_errors"] += 1
+            logger.warning("Failed to export %d span(s): %s", len(batch), e)
+
+    def shutdown(self):
+        """Exports the spans still queued and stops the export thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            remaining = []
+            while not self._queue.empty():
+                span = self._queue.get_nowait()
+                if span is not None:
+                    remaining.append(span)
+            if remaining:
+                self._send(remaining)
+        if self.exporter is not None:
+            self.exporter.close()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "sample_ratio": self.sample_ratio,
+            "exporter": type(self.exporter).__name__ if self.exporter else None,
+            "queued": self._queue.qsize(),
+            **self._counters,
+        }
+
+
+# Singleton instance of the tracer, configured from config.yaml and shut down by the app lifespan.
+tracer = Tracer()
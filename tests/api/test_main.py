@@ -0,0 +1,29 @@
+import logging
+
+import pytest
+
+from agent_runtime.api.main import check_multi_worker_config, worker_count
+
+
+def test_worker_count_defaults_to_one():
+    assert worker_count({}) == 1
+    assert worker_count({"server": None}) == 1
+    assert worker_count({"server": {"workers": 0}}) == 1
+    assert worker_count({"server": {"workers": "4"}}) == 4
+
+
+@pytest.mark.parametrize("task_store", [None, {}, {"backend": "memory"}])
+def test_workers_need_a_shared_task_store(task_store):
+    with pytest.raises(ValueError, match="task_store.backend"):
+        check_multi_worker_config({"server": {"workers": 2}, "task_store": task_store})
+
+
+def test_workers_warn_when_event_streams_are_not_shared(caplog):
+    config = {"server": {"workers": 2}, "task_store": {"backend": "sqlite"}}
+    with caplog.at_level(logging.WARNING, logger="agent_runtime.api.main"):
+        check_multi_worker_config(config)
+        assert "events.backend" in caplog.text
+
+        caplog.clear()
+        check_multi_worker_config({**config, "events": {"backend": "redis"}})
+        assert caplog.text == ""
@@ -0,0 +1,53 @@
+import json
+
+from agent_runtime.api.endpoints import system
+from agent_runtime.services import metrics, task_manager
+from agent_runtime.services.server_pool import MCPServerPool
+from fakes import FakeRegistry
+
+
+def make_pool(*configs: dict) -> MCPServerPool:
+    pool = MCPServerPool()
+    pool._registry = FakeRegistry(list(configs))
+    return pool
+
+
+class CountingStore(task_manager.InMemoryTaskStore):
+    def __init__(self):
+        super().__init__()
+        self.queries = 0
+
+    def count(self, status=None):
+        self.queries += 1
+        return super().count(status)
+
+    def count_by_status(self):
+        self.queries += 1
+        return super().count_by_status()
+
+
+def test_task_gauges_come_from_one_grouped_count(monkeypatch):
+    store = CountingStore()
+    monkeypatch.setattr(task_manager, "_store", store)
+    for task_id, status in (("a", "pending"), ("b", "pending"), ("c", "failed")):
+        store.put(task_id, {"status": status, "created_at": 1, "updated_at": 1})
+
+    system._collect_runtime_metrics()
+
+    assert store.queries == 1
+    rendered = "\n".join(metrics.TASKS._samples())
+    assert 'agent_runtime_tasks{status="pending"} 2' in rendered
+    assert 'agent_runtime_tasks{status="failed"} 1' in rendered
+    assert 'agent_runtime_tasks{status="completed"} 0' in rendered
+
+
+async def test_ready_is_unavailable_until_the_pool_is_warm(monkeypatch):
+    pool = make_pool({"id": "fetch"})
+    monkeypatch.setattr(system, "server_pool", pool)
+
+    assert (await system.readiness()).status_code == 503
+    await pool.warm()
+    response = await system.readiness()
+    assert response.status_code == 200
+    assert json.loads(response.body) == {"ready": True, "servers": {"fetch": 1}, "failed": {}}
+    await pool.shutdown()
@@ -0,0 +1,146 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agent_runtime.api.endpoints import tasks
+from agent_runtime.services import orchestrator, task_manager
+from agent_runtime.services.blob_store import blob_store
+from agent_runtime.services.event_service import DONE, LiveEventService
+from agent_runtime.services.orchestrator import PlanOutcome
+from agent_runtime.services.plan import Plan, PlanStep
+from agent_runtime.services.plan_cache import PlanCache
+from agent_runtime.services.task_logger import task_log_writer
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(task_manager, "_store", task_manager.InMemoryTaskStore())
+    return TestClient(tasks_app())
+
+
+def tasks_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(tasks.router, prefix="/v1")
+    return app
+
+
+@pytest.fixture
+def artifact():
+    task_id = task_manager.create_task("Fetch a page.")
+    blob_hash = blob_store.put(b"0123456789")
+    task_manager.record_artifact(task_id, 1, blob_hash, 10)
+    return f"/v1/tasks/{task_id}/artifacts/{blob_hash}"
+
+
+def test_artifacts_are_served_whole_or_by_range(client, artifact):
+    whole = client.get(artifact)
+    assert (whole.status_code, whole.text, whole.headers["accept-ranges"]) == (200, "0123456789", "bytes")
+
+    for header, body, content_range in (
+        ("bytes=2-4", "234", "bytes 2-4/10"),
+        ("bytes=7-", "789", "bytes 7-9/10"),
+        ("bytes=-2", "89", "bytes 8-9/10"),
+        ("bytes=8-100", "89", "bytes 8-9/10"),
+    ):
+        response = client.get(artifact, headers={"Range": header})
+        assert (response.status_code, response.text, response.headers["content-range"]) == (206, body, content_range)
+
+
+def test_unsatisfiable_ranges_and_unknown_artifacts(client, artifact):
+    for header in ("bytes=10-", "bytes=5-2", "lines=1-2"):
+        response = client.get(artifact, headers={"Range": header})
+        assert (response.status_code, response.headers["content-range"]) == (416, "bytes */10")
+
+    task_path = artifact.rsplit("/", 1)[0]
+    assert client.get(f"{task_path}/{'0' * 64}").status_code == 404
+    assert client.get(f"/v1/tasks/unknown/artifacts/{'0' * 64}").status_code == 404
+
+
+def test_task_status_includes_timings_and_token_totals(client):
+    task_id = task_manager.create_task("Fetch a page.")
+    task_manager.record_timing(task_id, "planning", 1.0)
+    task_manager.record_plan_usage(task_id, {"requests": 1, "input_tokens": 10, "output_tokens": 2, "total_tokens": 12})
+    task_manager.record_step_usage(task_id, 1, {"requests": 2, "input_tokens": 5, "output_tokens": 1, "total_tokens": 6},
+                                   {"llm_seconds": 0.5})
+
+    body = client.get(f"/v1/tasks/{task_id}").json()
+    assert body["timings"] == {"planning": 1.0}
+    assert body["step_timings"] == {"1": {"llm_seconds": 0.5}}
+    assert body["token_usage"] == {"requests": 3, "input_tokens": 15, "output_tokens": 3, "total_tokens": 18}
+
+
+@pytest.fixture
+def events(monkeypatch):
+    events = LiveEventService()
+    monkeypatch.setattr(tasks, "event_service", events)
+    monkeypatch.setattr(orchestrator, "event_service", events)
+    return events
+
+
+def stream_data(body: str) -> list[str]:
+    return [line.removeprefix("data: ") for line in body.splitlines() if line.startswith("data: ")]
+
+
+async def test_streams_resume_after_the_last_event_id(client, events):
+    task_id = task_manager.create_task("Fetch a page.")
+    for message in ("one", "two", DONE):
+        events.publish_nowait(task_id, message)
+
+    transport = httpx.ASGITransport(app=tasks_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        replayed = await http.get(f"/v1/tasks/{task_id}/stream")
+        resumed = await http.get(f"/v1/tasks/{task_id}/stream", headers={"Last-Event-ID": "1"})
+
+    assert stream_data(replayed.text) == ["one", "two", DONE]
+    assert stream_data(resumed.text) == ["two", DONE]
+
+
+def test_bad_event_ids_and_freed_streams(client, events):
+    task_id = task_manager.create_task("Fetch a page.")
+    response = client.get(f"/v1/tasks/{task_id}/stream", headers={"Last-Event-ID": "latest"})
+    assert response.status_code == 400
+
+    task_manager.update_task_result(task_id, "completed", "done")
+    assert stream_data(client.get(f"/v1/tasks/{task_id}/stream").text) == [DONE]
+    assert client.get("/v1/tasks/unknown/stream").status_code == 404
+
+
+async def test_a_cached_plan_is_announced_on_the_stream_and_in_the_task_log(client, events, monkeypatch):
+    plan = Plan(steps=[PlanStep(number=1, description="Use fetch to download the page.", depends_on=[])])
+    cache = PlanCache()
+    jobs = []
+
+    async def generate_plan(prompt, fingerprint):
+        cache.put(prompt, fingerprint, plan, ["fetch"])
+        return PlanOutcome(plan, ["fetch"])
+
+    monkeypatch.setattr(orchestrator, "plan_cache", cache)
+    monkeypatch.setattr(orchestrator, "_generate_plan", generate_plan)
+    monkeypatch.setattr(orchestrator.server_pool, "tool_fingerprint", lambda: "tools")
+    monkeypatch.setattr(orchestrator.scheduler, "submit", lambda job, *args, **kwargs: jobs.append(job(*args)))
+
+    transport = httpx.ASGITransport(app=tasks_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        first = (await http.post("/v1/tasks", json={"prompt": "Fetch a page."})).json()["task_id"]
+        await jobs.pop()
+        second = (await http.post("/v1/tasks", json={"prompt": "Fetch a page."})).json()["task_id"]
+    assert jobs == []
+
+    async def until_plan() -> list[str]:
+        messages = []
+        async for event in events.subscribe(second):
+            messages.append(event.data)
+            if event.data.startswith("Generated Plan:"):
+                return messages
+
+    assert "Plan Generation Finished. Tool servers needed: fetch." in await asyncio.wait_for(until_plan(), 1)
+    assert task_manager.get_task_status(second)["status"] == "awaiting_approval"
+
+    task_log_writer.shutdown()
+    for task_id in (first, second):
+        assert "Generated Plan:\n1. Use fetch to download the page." in task_log_writer.path_for(task_id).read_text()
+    for task_id in (first, second):
+        orchestrator.OrchestratorManager.cleanup_orchestrator(task_id)
@@ -0,0 +1,48 @@
+import pytest
+from agents import RunConfig
+
+from agent_runtime.services import agent_service
+from agent_runtime.services.agent_service import AgentService
+from fake_model import STUB_TOOL_NAME, FakeModelProvider
+from fakes import FakeMCPServer
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    provider = FakeModelProvider(latency_seconds=0, jitter_seconds=0, output_tokens=5, steps=3, seed=1)
+    monkeypatch.setattr(agent_service, "run_config", RunConfig(model_provider=provider, tracing_disabled=True))
+    monkeypatch.setattr(AgentService, "_setup_environment", lambda self: None)
+    return provider.model
+
+
+async def test_the_planner_gets_independent_steps_and_a_final_join(fake_model):
+    generation = await AgentService(mcp_servers=[]).create_plan("Collect three parts.")
+
+    assert [step.depends_on for step in generation.plan.steps] == [[], [], [1, 2]]
+    assert generation.usage["output_tokens"] == 60
+
+
+async def test_the_executor_calls_the_stub_tool_once_then_answers(fake_model):
+    server = FakeMCPServer("stub", tool_names=(STUB_TOOL_NAME,))
+    plan = (await AgentService(mcp_servers=[]).create_plan("Collect three parts.")).plan
+
+    execution = await AgentService(mcp_servers=[server]).execute_step("Collect three parts.", plan, plan.step(1))
+
+    assert server.calls == [(STUB_TOOL_NAME, {"query": "benchmark"})]
+    assert execution.output.text().split() == ["word"] * 5
+
+
+async def test_latency_is_repeatable_for_a_seed(monkeypatch):
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    monkeypatch.setattr("fake_model.asyncio.sleep", sleep)
+    for _ in range(2):
+        model = FakeModelProvider(latency_seconds=1, jitter_seconds=0.5, output_tokens=1, steps=1, seed=7).model
+        for _ in range(3):
+            await model._wait()
+
+    assert delays[:3] == delays[3:]
+    assert all(0.5 <= delay <= 1.5 for delay in delays)
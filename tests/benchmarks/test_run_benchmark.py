@@ -0,0 +1,45 @@
+from argparse import Namespace
+from pathlib import Path
+
+import yaml
+
+from run_benchmark import changed_paths, latency_summary, percentile, tree_snapshot, write_config
+
+
+def test_percentiles_use_the_nearest_rank():
+    values = [float(value) for value in range(100, 0, -1)]
+
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.99) == 99
+    assert percentile([3.0], 0.99) == 3
+    assert percentile([], 0.5) is None
+
+
+def test_latency_summaries_handle_no_samples():
+    assert latency_summary([]) == {"count": 0, "p50": None, "p95": None, "p99": None, "max": None}
+    assert latency_summary([1.0, 2.0])["max"] == 2
+
+
+def test_snapshots_show_files_a_run_changed(tmp_path):
+    (tmp_path / "kept.txt").write_text("same")
+    (tmp_path / "edited.txt").write_text("before")
+    (tmp_path / "__pycache__").mkdir()
+    before = tree_snapshot(tmp_path)
+
+    (tmp_path / "edited.txt").write_text("after!")
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "logs" / "task_1.log").write_text("line")
+    (tmp_path / "__pycache__" / "module.pyc").write_bytes(b"")
+
+    assert changed_paths(before, tree_snapshot(tmp_path)) == ["edited.txt", "logs/task_1.log"]
+
+
+def test_the_service_writes_only_to_the_workdir(tmp_path):
+    args = Namespace(warm_tool_servers=1, max_tool_servers=1, concurrency=1, tasks=1, tracing="off",
+                     sample_ratio=1.0, collector_port=0, tool_latency=0.0, payload_bytes=1)
+    config_path, _ = write_config(tmp_path, args)
+    config = yaml.safe_load(config_path.read_text())
+
+    for block in ("artifacts", "task_logs", "tool_manifests"):
+        assert Path(config[block]["path"]).is_relative_to(tmp_path)
@@ -0,0 +1,33 @@
+import pytest
+
+from agent_runtime.services import server_pool, tool_manifests
+from agent_runtime.services.blob_store import blob_store
+from agent_runtime.services.task_logger import task_log_writer
+
+
+@pytest.fixture(autouse=True)
+def no_npm(monkeypatch):
+    """Keeps tests from running `npm ls`."""
+    monkeypatch.setattr(tool_manifests, "get_installed_npm_package_versions", lambda: {})
+    monkeypatch.setattr(server_pool, "get_installed_npm_package_versions", lambda: {})
+
+
+@pytest.fixture(autouse=True)
+def isolated_manifests(tmp_path, monkeypatch):
+    """Gives every test its own tool manifest store."""
+    cache = tool_manifests.ToolManifestCache(tmp_path / "tool_manifests.json", tmp_path / "tool_registry.yaml")
+    monkeypatch.setattr(tool_manifests, "manifest_cache", cache)
+    monkeypatch.setattr(server_pool, "manifest_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_task_logs(tmp_path, monkeypatch):
+    """Writes task log files under the test's temporary directory."""
+    monkeypatch.setattr(task_log_writer, "logs_dir", tmp_path / "logs")
+
+
+@pytest.fixture(autouse=True)
+def isolated_blobs(tmp_path, monkeypatch):
+    """Keeps step outputs written during a test out of the project's blob store."""
+    monkeypatch.setattr(blob_store, "path", tmp_path / "blobs")
@@ -0,0 +1,74 @@
+"""Test doubles shared by the test modules."""
+import asyncio
+from typing import Any
+
+from agents.mcp import MCPServer
+from mcp.types import CallToolResult, ListPromptsResult, TextContent, Tool as MCPTool
+
+from agent_runtime.services.tool_registry import DEFAULT_STARTUP_TIMEOUT_SECONDS
+
+
+class FakeMCPServer(MCPServer):
+    """An in-process MCP server: connects after `startup_delay`, serves one tool and records its lifecycle."""
+
+    def __init__(self, server_id: str, startup_delay: float = 0.0, fail: bool = False, tool_names=("echo",)):
+        super().__init__()
+        self.server_id = server_id
+        self.startup_delay = startup_delay
+        self.fail = fail
+        self.tool_names = tool_names
+        self.connected = False
+        self.connect_task: asyncio.Task | None = None
+        self.cleanup_task: asyncio.Task | None = None
+        self.calls: list[tuple[str, dict]] = []
+
+    @property
+    def name(self) -> str:
+        return self.server_id
+
+    async def connect(self):
+        self.connect_task = asyncio.current_task()
+        await asyncio.sleep(self.startup_delay)
+        if self.fail:
+            raise RuntimeError(f"{self.server_id} failed to start")
+        self.connected = True
+
+    async def cleanup(self):
+        self.cleanup_task = asyncio.current_task()
+        self.connected = False
+
+    async def list_tools(self, run_context: Any = None, agent: Any = None) -> list[MCPTool]:
+        return [MCPTool(name=name, inputSchema={"type": "object", "properties": {}}) for name in self.tool_names]
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any] | None, meta: dict[str, Any] | None = None):
+        self.calls.append((tool_name, arguments or {}))
+        return CallToolResult(content=[TextContent(type="text", text=f"{tool_name}:{arguments}")])
+
+    async def list_prompts(self) -> ListPromptsResult:
+        return ListPromptsResult(prompts=[])
+
+    async def get_prompt(self, name: str, arguments: dict[str, Any] | None = None):
+        raise NotImplementedError
+
+
+class FakeRegistry:
+    """Stands in for ToolRegistry, building FakeMCPServers from plain registry entries."""
+
+    def __init__(self, configs: list[dict]):
+        self.configs = configs
+        self.built: list[FakeMCPServer] = []
+
+    def enabled_configs(self) -> list[dict]:
+        return [entry for entry in self.configs if entry.get("enabled", True)]
+
+    def build_server(self, server_config: dict) -> FakeMCPServer:
+        server = FakeMCPServer(
+            server_config["id"],
+            startup_delay=server_config.get("startup_delay", 0.0),
+            fail=server_config.get("fail", False),
+        )
+        self.built.append(server)
+        return server
+
+    def startup_timeout_for(self, server_config: dict) -> float:
+        return float(server_config.get("startup_timeout_seconds", DEFAULT_STARTUP_TIMEOUT_SECONDS))
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import pytest
+from agents.usage import Usage
+
+from agent_runtime.services import agent_service
+from agent_runtime.services.agent_service import AgentService
+from agent_runtime.services.context import StepOutput, context_manager
+from agent_runtime.services.plan import Plan, PlanStep
+
+PLAN = Plan(steps=[
+    PlanStep(number=1, description="Use fetch to download the page.", depends_on=[]),
+    PlanStep(number=2, description="Use echo to report the title.", depends_on=[1]),
+])
+
+
+@pytest.fixture
+def prompts(monkeypatch):
+    prompts = []
+
+    async def run(agent, prompt, hooks=None, run_config=None):
+        prompts.append(prompt)
+        return SimpleNamespace(final_output="The title is Example.", context_wrapper=SimpleNamespace(usage=Usage()))
+
+    monkeypatch.setattr(agent_service.Runner, "run", run)
+    monkeypatch.setattr(AgentService, "_setup_environment", lambda self: None)
+    return prompts
+
+
+async def test_executor_prompt_separates_lines(prompts):
+    dependency = StepOutput.inline("<title>Example</title>")
+    await AgentService(mcp_servers=[]).execute_step("Report the title.", PLAN, PLAN.step(2), {1: dependency})
+
+    [prompt] = prompts
+    assert "\\n" not in prompt
+    assert "Step 1 ('Use fetch to download the page.') returned: '<title>Example</title>'\n\n" in prompt
+    assert prompt.startswith("You are executing step 2 of a 2-step plan.\nThe original user request was: ")
+
+
+async def test_summaries_point_at_the_full_output_on_a_new_line(prompts, monkeypatch):
+    monkeypatch.setattr(context_manager, "strategy", "summarize")
+    dependency = await StepOutput.from_text("word " * 50000)
+    await AgentService(mcp_servers=[]).execute_step("Report the title.", PLAN, PLAN.step(2), {1: dependency})
+
+    summarize, execute = prompts
+    assert summarize.startswith("Condense this output to at most ")
+    assert "words:\n\nword word" in summarize
+    assert f"The title is Example.\n[Summary. Full output: read_step_output('{dependency.handle}').]" in execute
+    assert "\\n" not in summarize + execute
+
+
+async def test_create_plan_returns_the_normalised_structured_plan(monkeypatch):
+    raw = Plan(steps=[
+        PlanStep(number=3, description="Fetch the page.", depends_on=[]),
+        PlanStep(number=4, description="Report the title.", depends_on=[3, 9]),
+    ])
+    agents = []
+
+    async def run(agent, prompt, hooks=None, run_config=None):
+        agents.append(agent)
+        return SimpleNamespace(final_output_as=lambda cls: raw, context_wrapper=SimpleNamespace(usage=Usage()))
+
+    monkeypatch.setattr(agent_service.Runner, "run", run)
+    monkeypatch.setattr(AgentService, "_setup_environment", lambda self: None)
+
+    generation = await AgentService(mcp_servers=[]).create_plan("Report the title.")
+
+    assert agents[0].output_type is Plan
+    assert generation.plan == Plan(steps=[
+        PlanStep(number=1, description="Fetch the page.", depends_on=[]),
+        PlanStep(number=2, description="Report the title.", depends_on=[1]),
+    ])
+
+
+async def test_run_timings_count_turns_and_tool_calls():
+    timings = agent_service.RunTimings()
+    agent = SimpleNamespace(name="Executor")
+    tool = SimpleNamespace(name="fetch")
+    response = SimpleNamespace(usage=Usage(input_tokens=10, output_tokens=2))
+
+    for _ in range(2):
+        await timings.on_llm_start(None, agent, None, [])
+        await timings.on_llm_end(None, agent, response)
+    await timings.on_tool_start(None, agent, tool)
+    await timings.on_tool_start(None, agent, tool)
+    await timings.on_tool_end(None, agent, tool, "done")
+
+    measured = timings.as_dict()
+    assert (measured["llm_turns"], measured["tool_calls"]) == (2, 1)
+    assert measured["llm_seconds"] >= 0 and measured["tool_seconds"] >= 0
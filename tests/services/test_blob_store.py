@@ -0,0 +1,70 @@
+import hashlib
+import os
+import threading
+import time
+
+import pytest
+
+from agent_runtime.services.blob_store import BlobStore, blob_store
+from agent_runtime.services.context import StepOutput
+
+
+@pytest.fixture
+def blobs(tmp_path):
+    return BlobStore(tmp_path / "blobs")
+
+
+def test_blobs_are_stored_once_by_content_hash(blobs):
+    data = b"x" * 10000
+    first = blobs.put(data)
+
+    assert first == hashlib.sha256(data).hexdigest()
+    assert blobs.put(data) == first
+    assert list(blobs.path.glob("*/*")) == [blobs.path / first[:2] / first]
+    assert blobs.size(first) == 10000
+
+
+def test_ranges_are_read_without_loading_the_whole_blob(blobs):
+    blob_hash = blobs.put(bytes(range(256)) * 1000)
+
+    assert blobs.read(blob_hash, 10, 5) == bytes(range(10, 15))
+    assert blobs.read(blob_hash, 255_998) == bytes([254, 255])
+    assert blobs.read(blob_hash, 300_000) == b""
+    assert [len(chunk) for chunk in blobs.iter_range(blob_hash, 0, 150_000, chunk_size=65536)] == [65536, 65536, 18928]
+
+
+def test_unknown_and_invalid_hashes(blobs):
+    assert not blobs.exists("../../etc/passwd")
+    with pytest.raises(KeyError):
+        blobs.size("0" * 64)
+    with pytest.raises(KeyError):
+        blobs.read("not-a-hash")
+
+
+def test_sweep_keeps_referenced_and_recent_blobs(blobs):
+    live, orphan, recent = blobs.put(b"live"), blobs.put(b"orphan"), blobs.put(b"recent")
+    old = time.time() - 3600
+    for blob_hash in (live, orphan):
+        os.utime(blobs._path_for(blob_hash), (old, old))
+
+    assert blobs.sweep({live}, older_than=time.time() - 60) == 1
+    assert blobs.exists(live) and blobs.exists(recent) and not blobs.exists(orphan)
+
+
+async def test_large_step_outputs_move_to_the_blob_store(monkeypatch):
+    monkeypatch.setattr(blob_store, "inline_bytes", 100)
+    monkeypatch.setattr(blob_store, "preview_chars", 10)
+    put = blob_store.put
+    writers = []
+    monkeypatch.setattr(blob_store, "put", lambda data: writers.append(threading.current_thread()) or put(data))
+    small, large = await StepOutput.from_text("short"), await StepOutput.from_text("é" * 200)
+
+    # Only the large output is stored, and not on the event loop's thread.
+    assert len(writers) == 1 and writers[0] is not threading.current_thread()
+
+    assert small.handle is None and small.text() == "short"
+    assert large.handle is not None and large.size == 400
+    assert large.preview == "é" * 10 + "... [190 more characters]"
+    assert large.text() == "é" * 200
+    assert large.head(5) == "éé"
+    assert large.tail(4) == "éé"
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from agent_runtime.services.event_backends import DONE, Event, InMemoryEventBackend, RedisEventBackend
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_server():
+    return fakeredis.FakeServer(version=(6, 2))
+
+
+def redis_backend(server, buffer_size: int = 100, grace_seconds: float = 60) -> RedisEventBackend:
+    backend = RedisEventBackend("redis://localhost:6379/0", buffer_size=buffer_size, grace_seconds=grace_seconds)
+    backend._redis = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    return backend
+
+
+async def published(backend: RedisEventBackend):
+    """Waits for the writer to hand every queued event to Redis."""
+    await backend._outbox.join()
+
+
+async def reader_blocked():
+    """
+    Gives a watching backend's reader time to block in XREAD again: fakeredis
+    cannot cancel a blocking read that is still being set up.
+    """
+    await asyncio.sleep(0.1)
+
+
+async def test_in_memory_replay_after_an_id():
+    backend = InMemoryEventBackend(buffer_size=2, grace_seconds=60)
+    for message in ("one", "two", "three"):
+        backend.publish("task", message)
+
+    assert [event.data for event in await backend.replay("task", None)] == ["two", "three"]
+    assert [event.data for event in await backend.replay("task", "2")] == ["three"]
+
+
+async def test_redis_publish_and_replay_after_an_id(redis_server):
+    backend = redis_backend(redis_server)
+    try:
+        backend.publish("task", "one", traceparent="00-trace-span-01")
+        backend.publish("task", "two")
+        backend.publish("task", "three")
+        await published(backend)
+
+        events = await backend.replay("task", None)
+        assert [event.data for event in events] == ["one", "two", "three"]
+        assert events[0].traceparent == "00-trace-span-01"
+        # Replay is exclusive of the id the client already has.
+        assert [event.data for event in await backend.replay("task", events[0].id)] == ["two", "three"]
+        assert await backend.replay("task", events[-1].id) == []
+        assert await backend.has_events("task")
+    finally:
+        await backend.close()
+
+
+async def test_a_worker_follows_events_published_by_another(redis_server):
+    publisher, follower = redis_backend(redis_server), redis_backend(redis_server)
+    delivered: list[tuple[str, Event]] = []
+    follower.bind(lambda task_id, event: delivered.append((task_id, event)))
+    try:
+        publisher.publish("task", "before watching")
+        await published(publisher)
+        await follower.watch("task")
+        await reader_blocked()
+        publisher.publish("task", "after watching")
+        await published(publisher)
+        for _ in range(100):
+            if delivered:
+                break
+            await asyncio.sleep(0.01)
+        assert [(task_id, event.data) for task_id, event in delivered] == [("task", "after watching")]
+
+        await reader_blocked()
+        await follower.unwatch("task")
+        publisher.publish("task", "after unwatching")
+        await published(publisher)
+        await asyncio.sleep(0.05)
+        assert len(delivered) == 1
+    finally:
+        await publisher.close()
+        await follower.close()
+
+
+async def test_streams_expire_after_done_and_can_be_discarded(redis_server):
+    backend = redis_backend(redis_server, grace_seconds=30)
+    try:
+        backend.publish("running", "step")
+        backend.publish("finished", DONE)
+        backend.publish("discarded", "step")
+        backend.discard("discarded")
+        await published(backend)
+
+        assert await backend._redis.ttl(backend._key("running")) == -1
+        assert 0 < await backend._redis.ttl(backend._key("finished")) <= 30
+        assert not await backend.has_events("discarded")
+    finally:
+        await backend.close()
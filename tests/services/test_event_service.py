@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from agent_runtime.services.event_backends import DONE, Event
+from agent_runtime.services.event_service import LiveEventService, Subscriber
+
+
+def service(**settings) -> LiveEventService:
+    events = LiveEventService()
+    events.configure(settings)
+    return events
+
+
+async def collect(stream, count: int) -> list[str]:
+    return [event.data async for event in _take(stream, count)]
+
+
+async def _take(stream, count: int):
+    async for event in stream:
+        yield event
+        count -= 1
+        if count == 0:
+            await stream.aclose()
+            return
+
+
+async def test_late_subscribers_get_the_replay_then_live_events():
+    events = service()
+    for message in ("one", "two"):
+        events.publish_nowait("task", message)
+    stream = events.subscribe("task")
+    received = asyncio.create_task(collect(stream, 4))
+    await asyncio.sleep(0)
+    events.publish_nowait("task", "three")
+    events.publish_nowait("task", DONE)
+
+    assert await asyncio.wait_for(received, 1) == ["one", "two", "three", DONE]
+    assert events.stats()["subscribers"] == []
+
+
+async def test_resuming_after_an_event_id_skips_what_was_seen():
+    events = service()
+    for message in ("one", "two", "three", DONE):
+        events.publish_nowait("task", message)
+
+    first = [event async for event in _take(events.subscribe("task"), 2)]
+    resumed = await collect(events.subscribe("task", last_event_id=first[-1].id), 2)
+
+    assert [event.data for event in first] == ["one", "two"]
+    assert resumed == ["three", DONE]
+
+
+async def test_events_are_freed_after_the_grace_period():
+    events = service(grace_seconds=0.05)
+    events.publish_nowait("task", "one")
+    events.publish_nowait("task", DONE)
+    assert await events.has_events("task")
+
+    await asyncio.sleep(0.1)
+    assert not await events.has_events("task")
+
+    events.publish_nowait("other", "one")
+    events.discard("other")
+    assert not await events.has_events("other")
+
+
+def queued(subscriber: Subscriber) -> list[str]:
+    return [event.data for _, event in subscriber._queue]
+
+
+@pytest.mark.parametrize(("policy", "expected", "dropped"), [
+    ("drop_oldest", ["4", "5"], 3),
+    ("coalesce", ["5"], 4),
+])
+def test_full_queues_apply_the_overflow_policy(policy, expected, dropped):
+    subscriber = Subscriber(1, "task", max_queue=2, policy=policy)
+    for number in range(1, 6):
+        subscriber.offer(Event(str(number), str(number)))
+
+    assert queued(subscriber) == expected
+    assert subscriber.dropped == dropped
+
+
+async def test_disconnect_policy_closes_the_subscription_but_done_always_fits():
+    subscriber = Subscriber(1, "task", max_queue=1, policy="drop_oldest")
+    subscriber.offer(Event("1", "1"))
+    subscriber.offer(Event("2", DONE))
+    assert queued(subscriber) == ["1", DONE]
+
+    slow = Subscriber(2, "task", max_queue=1, policy="disconnect")
+    slow.offer(Event("1", "1"))
+    slow.offer(Event("2", "2"))
+    assert slow.closed
+    assert await slow.next() is None
+
+
+async def test_a_slow_subscriber_does_not_hold_up_publishing():
+    events = service(subscriber_queue_size=2, overflow_policy="drop_oldest")
+    stream = events.subscribe("task")
+    first = asyncio.create_task(stream.__anext__())
+    await asyncio.sleep(0)
+    for number in range(10):
+        events.publish_nowait("task", str(number))
+
+    # Only the newest events were kept while the subscriber lagged.
+    assert (await first).data == "8"
+    assert events.stats()["dropped_total"] == 8
+    await stream.aclose()
+
+
+async def test_disconnected_subscribers_are_counted_once_their_stream_ends():
+    events = service(subscriber_queue_size=1, overflow_policy="disconnect")
+    stream = events.subscribe("task")
+    first = asyncio.create_task(collect(stream, 10))
+    await asyncio.sleep(0)
+    for number in range(3):
+        events.publish_nowait("task", str(number))
+
+    assert await asyncio.wait_for(first, 1) == []
+    assert events.stats()["disconnected_total"] == 1
+
+
+def test_unknown_overflow_policies_are_rejected():
+    with pytest.raises(ValueError, match="overflow_policy"):
+        service(overflow_policy="block")
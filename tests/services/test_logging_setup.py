@@ -0,0 +1,85 @@
+import json
+import logging
+import queue
+
+import pytest
+
+from agent_runtime.services.logging_setup import (
+    ROOT_LOGGER, DroppingQueueHandler, JsonFormatter, LoggingSetup, TextFormatter, truncate,
+)
+from agent_runtime.services.tracing import SpanContext, tracer
+
+logger = logging.getLogger(f"{ROOT_LOGGER}.tests")
+
+
+@pytest.fixture
+def setup():
+    """A LoggingSetup whose changes to the service's root logger are undone afterwards."""
+    root = logging.getLogger(ROOT_LOGGER)
+    saved = root.handlers[:], root.level, root.propagate
+    setup = LoggingSetup()
+    yield setup
+    setup.shutdown()
+    root.handlers, root.level, root.propagate = saved[0], saved[1], saved[2]
+
+
+def record(message: str, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("agent_runtime.tests", logging.INFO, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_truncate_notes_what_was_cut():
+    assert truncate("abcdef", 4) == "abcd... [2 more chars]"
+    assert truncate("abc", 4) == "abc"
+    assert truncate("abcdef", 0) == "abcdef"
+
+
+def test_the_handler_resolves_and_cuts_messages_on_the_calling_thread():
+    handler = DroppingQueueHandler(queue.Queue(), max_message_chars=5)
+    root = SpanContext(trace_id="a" * 32, span_id="b" * 16, sampled=True)
+    with tracer.use(root):
+        prepared = handler.prepare(record("step %s said %s", 1, "hello", output="x" * 10, step=2))
+
+    assert (prepared.msg, prepared.args) == ("step ... [12 more chars]", None)
+    assert prepared.output == "xxxxx... [5 more chars]"
+    assert prepared.step == 2
+    assert (prepared.trace_id, prepared.span_id) == (root.trace_id, root.span_id)
+
+
+def test_records_that_find_the_queue_full_are_dropped_and_counted():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1), max_message_chars=100)
+    for message in ("one", "two", "three"):
+        handler.handle(record(message))
+
+    assert handler.queue.get_nowait().msg == "one"
+    assert handler.dropped == 2
+
+
+def test_formatters_put_extra_fields_and_trace_ids_on_the_line():
+    entry = record("Task done.", task_id="t1", trace_id="a" * 32, span_id="b" * 16)
+
+    text = TextFormatter().format(entry)
+    assert text.endswith(f"INFO    agent_runtime.tests [trace={'a' * 32} span={'b' * 16}]: Task done. task_id=t1")
+
+    parsed = json.loads(JsonFormatter().format(entry))
+    assert (parsed["level"], parsed["message"], parsed["task_id"], parsed["trace_id"]) == (
+        "INFO", "Task done.", "t1", "a" * 32,
+    )
+
+
+def test_configure_writes_json_lines_at_the_configured_level(setup, capsys):
+    setup.configure({"level": "info", "format": "json", "loggers": {f"{ROOT_LOGGER}.tests.noisy": "error"}})
+    logger.debug("Planner prompt: %s", "skipped")
+    logger.info("Created task.", extra={"task_id": "t1"})
+    logging.getLogger(f"{ROOT_LOGGER}.tests.noisy").warning("skipped too")
+    setup.shutdown()
+
+    [line] = capsys.readouterr().out.splitlines()
+    assert json.loads(line)["task_id"] == "t1"
+    assert setup.stats()["dropped"] == 0
+
+
+def test_unknown_formats_are_rejected(setup):
+    with pytest.raises(ValueError, match="format"):
+        setup.configure({"format": "xml"})
@@ -0,0 +1,19 @@
+import asyncio
+import time
+
+from agent_runtime.services.loop_monitor import LoopMonitor
+
+
+async def test_blocking_the_loop_shows_up_as_lag():
+    monitor = LoopMonitor()
+    monitor.configure({"interval_seconds": 0.01})
+    await monitor.start()
+    await asyncio.sleep(0.05)
+    time.sleep(0.1)
+    await asyncio.sleep(0.03)
+    await monitor.shutdown()
+
+    stats = monitor.stats()
+    assert stats["samples"] >= 3
+    assert stats["lag_seconds"]["max"] >= 0.05
+    assert stats["lag_seconds"]["avg"] <= stats["lag_seconds"]["max"]
@@ -0,0 +1,53 @@
+import pytest
+
+from agent_runtime.services.metrics import MetricsRegistry, _Metric
+
+
+def test_metrics_render_in_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls made.", ["tool"])
+    depth = registry.gauge("queue_depth", "Jobs waiting.")
+    latency = registry.histogram("latency_seconds", "Call latency.", buckets=(0.1, 1.0))
+    calls.inc("fetch")
+    calls.inc("fetch", amount=2)
+    calls.inc('say "hi"\n')
+    registry.collector(lambda: depth.set(3))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP calls_total Calls made.",
+        "# TYPE calls_total counter",
+        'calls_total{tool="fetch"} 3',
+        'calls_total{tool="say \\"hi\\"\\n"} 1',
+        "# HELP queue_depth Jobs waiting.",
+        "# TYPE queue_depth gauge",
+        "queue_depth 3",
+        "# HELP latency_seconds Call latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 5.55",
+        "latency_seconds_count 3",
+    ]
+
+
+def test_a_failing_collector_does_not_break_the_scrape():
+    registry = MetricsRegistry()
+    depth = registry.gauge("queue_depth", "Jobs waiting.")
+
+    @registry.collector
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.collector(lambda: depth.set(1))
+    assert "queue_depth 1" in registry.render()
+
+
+def test_metric_kinds_must_render_their_samples():
+    class Incomplete(_Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Has no samples.")
@@ -0,0 +1,239 @@
+import asyncio
+
+import pytest
+
+from agent_runtime.services import orchestrator, task_manager
+from agent_runtime.services.agent_service import PlanGeneration, StepExecution
+from agent_runtime.services.context import StepOutput
+from agent_runtime.services.orchestrator import SchedulerFullError, TaskOrchestrator, TaskScheduler
+from agent_runtime.services.plan import Plan, PlanStep
+from agent_runtime.services.plan_cache import PlanCache
+from agent_runtime.services.server_pool import ServerLease
+
+PLAN = Plan(steps=[PlanStep(number=1, description="Use echo to say hello.", depends_on=[])])
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = task_manager.InMemoryTaskStore()
+    monkeypatch.setattr(task_manager, "_store", store)
+    return store
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = PlanCache()
+    monkeypatch.setattr(orchestrator, "plan_cache", cache)
+    return cache
+
+
+async def test_full_queue_rejects_new_work():
+    scheduler = TaskScheduler()
+    scheduler.configure({"workers": 1, "max_queue_size": 2, "retry_after_seconds": 7})
+
+    async def job():
+        pass
+
+    scheduler.submit(job)
+    scheduler.submit(job)
+    assert scheduler.full()
+    with pytest.raises(SchedulerFullError) as raised:
+        scheduler.submit(job)
+    assert raised.value.retry_after == 7
+    assert scheduler.stats()["rejected"] == 1
+
+
+async def test_jobs_run_by_priority_then_submission_order(store):
+    scheduler = TaskScheduler()
+    scheduler.configure({"workers": 1})
+    ran = []
+
+    async def job(name):
+        ran.append(name)
+
+    for name, priority in (("low", "low"), ("normal-1", "normal"), ("high", "high"), ("normal-2", "normal")):
+        scheduler.submit(job, name, priority=priority)
+    await scheduler.start()
+    await scheduler.queue.join()
+    await scheduler.shutdown()
+
+    assert ran == ["high", "normal-1", "normal-2", "low"]
+    assert scheduler.stats()["completed"] == 4
+
+
+async def test_failed_jobs_do_not_stop_the_workers(store):
+    scheduler = TaskScheduler()
+    scheduler.configure({"workers": 1})
+    ran = []
+
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def job():
+        ran.append(True)
+
+    task_id = task_manager.create_task("hello")
+    scheduler.submit(fail, task_id=task_id)
+    scheduler.submit(job)
+    await scheduler.start()
+    await asyncio.wait_for(scheduler.queue.join(), 1)
+    await scheduler.shutdown()
+
+    assert ran == [True]
+    assert scheduler.stats()["failed"] == 1
+    assert "queue_wait" in task_manager.get_task_status(task_id)["timings"]
+
+
+async def test_a_submission_counts_one_plan_cache_lookup(store, cache, monkeypatch):
+    monkeypatch.setattr(orchestrator.server_pool, "tool_fingerprint", lambda: "tools")
+    prompt = "Say hello."
+    # Admission misses, then another task caches the plan while this one is queued.
+    assert orchestrator.cached_plan(prompt) is None
+    cache.put(prompt, "tools", PLAN, ["echo"])
+
+    task_id = task_manager.create_task(prompt)
+    await TaskOrchestrator(task_id, prompt).create_plan()
+
+    task = task_manager.get_task_status(task_id)
+    assert (task["plan_steps"], task["tool_servers"], task["plan_cache_hit"]) == (
+        [step.model_dump() for step in PLAN.steps], ["echo"], True
+    )
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 1
+
+
+class FakePlanningPool:
+    """Server pool whose `fetch` listing is unknown, so planning has to lease it."""
+
+    manifests = {}
+
+    def __init__(self):
+        self.leases = []
+        self.released = []
+
+    def tool_fingerprint(self):
+        return "tools"
+
+    def manifest_servers(self):
+        return [], ["fetch"]
+
+    async def acquire(self, server_ids):
+        lease = ServerLease(instances=[])
+        self.leases.append(lease)
+        return lease
+
+    async def release(self, lease):
+        self.released.append(lease)
+
+
+async def test_shared_planning_holds_its_own_lease(store, cache, monkeypatch):
+    pool = FakePlanningPool()
+    monkeypatch.setattr(orchestrator, "server_pool", pool)
+    monkeypatch.setattr(orchestrator, "servers_named_in", lambda text, manifests: ["fetch"])
+    planning = asyncio.Event()
+    finish = asyncio.Event()
+
+    class Planner:
+        def __init__(self, mcp_servers):
+            pass
+
+        async def create_plan(self, task_prompt):
+            planning.set()
+            await finish.wait()
+            # Still leased while the planner runs, whoever stopped waiting.
+            assert pool.released == []
+            return PlanGeneration(plan=PLAN, usage={"total_tokens": 10}, timings={"llm_seconds": 0.1})
+
+    monkeypatch.setattr(orchestrator, "AgentService", Planner)
+    leader_id, follower_id = task_manager.create_task("Say hello."), task_manager.create_task("Say hello.")
+    leader = asyncio.create_task(TaskOrchestrator(leader_id, "Say hello.").create_plan())
+    await planning.wait()
+    follower = asyncio.create_task(TaskOrchestrator(follower_id, "Say hello.").create_plan())
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    finish.set()
+    await follower
+
+    assert pool.released == pool.leases and len(pool.leases) == 1
+    assert not pool.leases[0].failed
+    task = task_manager.get_task_status(follower_id)
+    assert task["plan_cache_hit"] is True
+    # Only the task that started the run is charged for it.
+    assert not task.get("plan_usage")
+
+
+class FakeExecutor:
+    """Runs each step for its delay and records when it ran and what it was given."""
+
+    def __init__(self, delays: dict[int, float] | None = None, fail_step: int | None = None):
+        self.delays = delays or {}
+        self.fail_step = fail_step
+        self.started: dict[int, float] = {}
+        self.finished: dict[int, float] = {}
+        self.given: dict[int, dict[int, str]] = {}
+        self.cancelled: list[int] = []
+
+    async def execute_step(self, task_prompt, plan, step, dependency_results):
+        loop = asyncio.get_running_loop()
+        self.started[step.number] = loop.time()
+        self.given[step.number] = {number: output.text() for number, output in dependency_results.items()}
+        try:
+            await asyncio.sleep(self.delays.get(step.number, 0.05))
+        except asyncio.CancelledError:
+            self.cancelled.append(step.number)
+            raise
+        if step.number == self.fail_step:
+            raise RuntimeError(f"step {step.number} failed")
+        self.finished[step.number] = loop.time()
+        return StepExecution(
+            output=StepOutput.inline(f"result {step.number}"),
+            usage={"total_tokens": 1, "context_tokens": 1, "uncompacted_context_tokens": 1},
+        )
+
+
+DAG = Plan(steps=[
+    PlanStep(number=1, description="Use fetch to get page A.", depends_on=[]),
+    PlanStep(number=2, description="Use fetch to get page B.", depends_on=[]),
+    PlanStep(number=3, description="Compare both pages.", depends_on=[1, 2]),
+])
+
+
+def orchestrator_for(executor: FakeExecutor, max_parallel_steps: int = 4) -> TaskOrchestrator:
+    task = TaskOrchestrator(task_manager.create_task("Compare two pages."), "Compare two pages.", max_parallel_steps)
+    task.agent_service = executor
+    return task
+
+
+async def test_independent_steps_run_in_parallel_and_dependents_wait(store):
+    executor = FakeExecutor()
+    task = orchestrator_for(executor)
+
+    results = await task._execute_steps(DAG)
+
+    assert {number: output.text() for number, output in results.items()} == {
+        1: "result 1", 2: "result 2", 3: "result 3"
+    }
+    assert abs(executor.started[1] - executor.started[2]) < 0.025
+    assert executor.started[3] >= max(executor.finished[1], executor.finished[2])
+    assert executor.given == {1: {}, 2: {}, 3: {1: "result 1", 2: "result 2"}}
+    assert set(task_manager.get_task_status(task.task_id)["step_usage"]) == {"1", "2", "3"}
+
+
+async def test_max_parallel_steps_bounds_concurrency(store):
+    executor = FakeExecutor()
+
+    await orchestrator_for(executor, max_parallel_steps=1)._execute_steps(DAG)
+
+    first, second = sorted((1, 2), key=executor.started.get)
+    assert executor.started[second] >= executor.finished[first]
+
+
+async def test_a_failed_step_cancels_the_steps_still_running(store):
+    executor = FakeExecutor(delays={1: 0.01, 2: 10}, fail_step=1)
+
+    with pytest.raises(RuntimeError, match="step 1 failed"):
+        await asyncio.wait_for(orchestrator_for(executor)._execute_steps(DAG), 1)
+    assert executor.cancelled == [2]
+    assert 3 not in executor.started
@@ -0,0 +1,57 @@
+from agent_runtime.services.plan import Plan, PlanStep, parse_plan, plan_from_task
+
+
+def steps(plan: Plan) -> list[tuple[int, str, list[int]]]:
+    return [(step.number, step.description, step.depends_on) for step in plan.steps]
+
+
+def test_parse_plan_reads_dependency_annotations():
+    plan = parse_plan(
+        "Here is the plan:\n"
+        "1. Use fetch to get page A. (depends on: none)\n"
+        "2) Use fetch to get page B (Depends on: none)\n"
+        "3 - Compare both pages. (depends on: 1, 2)\n"
+    )
+
+    assert steps(plan) == [
+        (1, "Use fetch to get page A.", []),
+        (2, "Use fetch to get page B", []),
+        (3, "Compare both pages.", [1, 2]),
+    ]
+
+
+def test_steps_without_annotations_depend_on_the_previous_step():
+    plan = parse_plan("1. Fetch the page.\n2. Summarise it.\n3. Save the summary.")
+
+    assert [step.depends_on for step in plan.steps] == [[], [1], [2]]
+
+
+def test_normalized_renumbers_and_drops_unknown_or_forward_dependencies():
+    plan = Plan(steps=[
+        PlanStep(number=5, description="First.", depends_on=[9]),
+        PlanStep(number=7, description="Second.", depends_on=[5, 7, 8]),
+        PlanStep(number=8, description="Third.", depends_on=[7, 5, 7]),
+    ]).normalized()
+
+    assert steps(plan) == [(1, "First.", []), (2, "Second.", [1]), (3, "Third.", [1, 2])]
+
+
+def test_repeated_step_numbers_are_made_increasing():
+    plan = parse_plan("1. First. (depends on: none)\n1. Second. (depends on: 1)")
+
+    assert steps(plan) == [(1, "First.", []), (2, "Second.", [1])]
+
+
+def test_plan_text_round_trips():
+    plan = parse_plan("1. Fetch. (depends on: none)\n2. Compare. (depends on: 1)")
+
+    assert parse_plan(plan.to_text()) == plan
+
+
+def test_plan_from_task_prefers_structured_steps_and_parses_older_records():
+    structured = {"plan": "ignored", "plan_steps": [{"number": 1, "description": "Fetch.", "depends_on": []}]}
+    older = {"plan": "1. Fetch.\n2. Compare.", "plan_steps": None}
+
+    assert steps(plan_from_task(structured)) == [(1, "Fetch.", [])]
+    assert steps(plan_from_task(older)) == [(1, "Fetch.", []), (2, "Compare.", [1])]
+    assert plan_from_task({}) == Plan(steps=[])
@@ -0,0 +1,59 @@
+import time
+
+from agent_runtime.services.plan import Plan, PlanStep
+from agent_runtime.services.plan_cache import PlanCache
+
+PLAN = Plan(steps=[PlanStep(number=1, description="Use echo to say hello.", depends_on=[])])
+
+
+def test_prompts_differing_in_whitespace_share_a_key():
+    assert PlanCache.key_for("  Fetch  https://example.com/a\n", "tools") == PlanCache.key_for(
+        "Fetch https://example.com/a", "tools"
+    )
+
+
+def test_prompts_differing_in_case_get_different_keys():
+    assert PlanCache.key_for("Read /data/Report.csv", "tools") != PlanCache.key_for("Read /data/report.csv", "tools")
+    assert PlanCache.key_for("Fetch https://example.com/A", "tools") != PlanCache.key_for(
+        "fetch https://example.com/a", "tools"
+    )
+
+
+def test_a_changed_tool_set_misses():
+    cache = PlanCache()
+    cache.put("Say hello.", "tools-v1", PLAN, ["echo"])
+
+    assert cache.get("Say hello.", "tools-v1").plan == PLAN
+    assert cache.get("Say hello.", "tools-v2") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_and_are_evicted_least_recently_used_first(monkeypatch):
+    cache = PlanCache()
+    cache.configure({"max_entries": 2, "ttl_seconds": 60})
+    for prompt in ("a", "b"):
+        cache.put(prompt, "tools", PLAN, None)
+    cache.get("a", "tools")
+    cache.put("c", "tools", PLAN, None)
+
+    assert cache.peek("b", "tools") is None
+    assert cache.peek("a", "tools") is not None
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert cache.peek("a", "tools") is None
+
+
+def test_sqlite_entries_are_shared_between_caches(tmp_path):
+    settings = {"backend": "sqlite", "path": str(tmp_path / "plans.db")}
+    first, second = PlanCache(), PlanCache()
+    first.configure(settings)
+    second.configure(settings)
+    try:
+        first.put("Say hello.", "tools", PLAN, ["echo"])
+        cached = second.get("Say hello.", "tools")
+        assert (cached.plan, cached.tool_servers) == (PLAN, ["echo"])
+    finally:
+        first.close()
+        second.close()
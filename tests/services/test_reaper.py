@@ -0,0 +1,102 @@
+import os
+import threading
+import time
+
+import pytest
+
+from agent_runtime.services import reaper as reaper_module, task_manager
+from agent_runtime.services.blob_store import BlobStore
+from agent_runtime.services.orchestrator import OrchestratorManager
+from agent_runtime.services.reaper import TaskReaper
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = task_manager.InMemoryTaskStore()
+    monkeypatch.setattr(task_manager, "_store", store)
+    return store
+
+
+@pytest.fixture
+def blobs(tmp_path, monkeypatch):
+    blobs = BlobStore(tmp_path / "blobs")
+    monkeypatch.setattr(reaper_module, "blob_store", blobs)
+    return blobs
+
+
+def put(store, task_id: str, status: str, age: float, **fields):
+    updated_at = time.time() - age
+    store.put(task_id, {"status": status, "created_at": updated_at, "updated_at": updated_at, **fields})
+
+
+class FakeOrchestrator:
+    def __init__(self, idle: float = 0.0):
+        self.last_active = time.monotonic() - idle
+        self.stopped = False
+
+    async def shutdown(self):
+        self.stopped = True
+
+
+async def test_tasks_expire_by_status_ttl(store, blobs):
+    reaper = TaskReaper()
+    reaper.configure({"task_ttl_seconds": {"completed": 10, "executing": 100}})
+    put(store, "old-done", "completed", age=20)
+    put(store, "new-done", "completed", age=1)
+    put(store, "running", "executing", age=20)
+
+    assert (await reaper.reap_once())["tasks"] == 1
+    assert store.get("old-done") is None
+    assert store.get("new-done") is not None
+    assert store.get("running") is not None
+
+
+async def test_least_recently_updated_tasks_go_beyond_max_tasks(store, blobs):
+    reaper = TaskReaper()
+    reaper.configure({"max_tasks": 2})
+    for age, task_id in ((30, "a"), (20, "b"), (10, "c")):
+        put(store, task_id, "completed", age=age)
+
+    await reaper.reap_once()
+    assert [task_id for task_id, _ in store.iter_tasks()] == ["b", "c"]
+
+
+async def test_orchestrators_of_finished_and_abandoned_tasks_are_shut_down(store, blobs, monkeypatch):
+    reaper = TaskReaper()
+    reaper.configure({"abandoned_approval_seconds": 60})
+    put(store, "done", "completed", age=0)
+    put(store, "waiting", "awaiting_approval", age=0)
+    put(store, "abandoned", "awaiting_approval", age=0)
+    orchestrators = {
+        "done": FakeOrchestrator(),
+        "waiting": FakeOrchestrator(),
+        "abandoned": FakeOrchestrator(idle=120),
+        "evicted": FakeOrchestrator(),
+    }
+    monkeypatch.setattr(OrchestratorManager, "_instances", dict(orchestrators))
+
+    assert (await reaper.reap_once())["orchestrators"] == 3
+    assert list(OrchestratorManager._instances) == ["waiting"]
+    assert [task_id for task_id, o in orchestrators.items() if o.stopped] == ["done", "abandoned", "evicted"]
+
+
+async def test_unreferenced_blobs_are_swept_off_the_event_loop(store, blobs, monkeypatch):
+    reaper = TaskReaper()
+    reaper.configure({"task_ttl_seconds": {"completed": 10}, "artifact_grace_seconds": 60})
+    kept = blobs.put(b"kept")
+    orphaned = blobs.put(b"orphaned")
+    fresh = blobs.put(b"fresh")
+    for blob_hash in (kept, orphaned):
+        old = time.time() - 120
+        os.utime(blobs._path_for(blob_hash), (old, old))
+    put(store, "live", "completed", age=0, artifacts=[{"hash": kept, "step": 1, "size": 4}])
+    put(store, "expired", "completed", age=20, artifacts=[{"hash": orphaned, "step": 1, "size": 8}])
+
+    threads = []
+    sweep = reaper._sweep_blobs
+    monkeypatch.setattr(reaper, "_sweep_blobs", lambda: threads.append(threading.current_thread()) or sweep())
+
+    assert (await reaper.reap_once())["blobs"] == 1
+    assert threads and threads[0] is not threading.main_thread()
+    assert blobs.exists(kept) and blobs.exists(fresh)
+    assert not blobs.exists(orphaned)
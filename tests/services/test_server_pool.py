@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+
+from agent_runtime.services.server_pool import MCPServerPool
+from fakes import FakeRegistry
+
+
+def make_pool(*configs: dict, **settings) -> MCPServerPool:
+    pool = MCPServerPool()
+    pool._registry = FakeRegistry(list(configs))
+    pool.configure(settings)
+    return pool
+
+
+async def test_released_instances_are_reused():
+    pool = make_pool({"id": "fetch"})
+    first = await pool.acquire()
+    server = first.servers[0]
+    await pool.release(first)
+
+    second = await pool.acquire()
+    assert second.servers == [server]
+    assert len(pool._registry.built) == 1
+    await pool.release(second)
+    await pool.shutdown()
+
+
+async def test_acquire_waits_at_the_instance_cap():
+    pool = make_pool({"id": "fetch"}, max_instances_per_server=1)
+    lease = await pool.acquire()
+    waiting = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+
+    await pool.release(lease)
+    second = await asyncio.wait_for(waiting, 1)
+    assert second.servers == [server for server in pool._registry.built]
+    await pool.release(second)
+    await pool.shutdown()
+
+
+async def test_instances_are_recycled_after_max_uses():
+    pool = make_pool({"id": "fetch"}, max_uses_per_instance=2)
+    servers = []
+    for _ in range(3):
+        lease = await pool.acquire()
+        servers.append(lease.servers[0])
+        await pool.release(lease)
+
+    assert servers[0] is servers[1] and servers[2] is not servers[0]
+    assert not servers[0].connected
+    await pool.shutdown()
+
+
+async def test_shutdown_stops_leased_instances():
+    pool = make_pool({"id": "fetch"}, {"id": "files"})
+    idle = await pool.acquire(["files"])
+    await pool.release(idle)
+    leased = await pool.acquire(["fetch"])
+
+    await pool.shutdown()
+
+    assert all(not server.connected for server in pool._registry.built)
+    assert pool.live_counts() == {}
+    # A lease returned after shutdown only gives back its permit.
+    await pool.release(leased)
+    assert pool._limit("fetch")._value == pool.max_instances_per_server
+    assert pool._idle == {}
+
+
+async def test_servers_start_concurrently():
+    pool = make_pool({"id": "a", "startup_delay": 0.2}, {"id": "b", "startup_delay": 0.2}, {"id": "c", "startup_delay": 0.2})
+    started = asyncio.get_running_loop().time()
+    lease = await pool.acquire()
+    assert len(lease.instances) == 3
+    assert asyncio.get_running_loop().time() - started < 0.5
+    await pool.release(lease)
+    await pool.shutdown()
+
+
+async def test_failed_and_timed_out_servers_are_left_out_of_the_lease():
+    pool = make_pool(
+        {"id": "ok"},
+        {"id": "broken", "fail": True},
+        {"id": "slow", "startup_delay": 5, "startup_timeout_seconds": 0.1},
+    )
+    lease = await pool.acquire()
+    assert [instance.server_id for instance in lease.instances] == ["ok"]
+    assert pool._limit("broken")._value == pool._limit("slow")._value == pool.max_instances_per_server
+    await pool.release(lease)
+    await pool.shutdown()
+
+
+async def test_cancelled_acquire_returns_checked_out_instances_and_permits():
+    pool = make_pool({"id": "fast"}, {"id": "slow", "startup_delay": 5}, max_instances_per_server=1)
+    acquiring = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.1)
+    acquiring.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await acquiring
+
+    assert pool._limit("fast")._value == 1
+    assert pool._limit("slow")._value == 1
+    fast, slow = pool._registry.built
+    assert pool._idle["fast"][0].server is fast and fast.connected
+    assert not slow.connected and slow.cleanup_task is not None
+    # The cap is not exhausted.
+    lease = await asyncio.wait_for(pool.acquire(["fast"]), 1)
+    assert lease.servers == [fast]
+    await pool.release(lease)
+    await pool.shutdown()
+
+
+async def test_servers_are_entered_and_exited_in_the_same_task():
+    pool = make_pool({"id": "fetch"})
+    lease = await pool.acquire()
+    await pool.release(lease)
+    await pool.shutdown()
+    server = pool._registry.built[0]
+    assert server.connect_task is server.cleanup_task
+
+
+async def test_warm_fills_the_pool_and_reports_ready_despite_failures():
+    pool = make_pool({"id": "fetch"}, {"id": "broken", "fail": True}, warm_instances_per_server=2)
+    assert not pool.ready.is_set()
+
+    await pool.warm()
+
+    assert pool.ready.is_set()
+    assert pool.live_counts() == {"fetch": 2}
+    assert "broken failed to start" in pool.warm_failures["broken"]
+    # Acquiring uses a warm instance instead of starting another.
+    lease = await pool.acquire(["fetch"])
+    assert len(pool._registry.built) == 4
+    await pool.release(lease)
+    await pool.shutdown()
+    assert not pool.ready.is_set()
+
+
+async def test_cancelling_a_slow_stop_is_not_swallowed():
+    pool = make_pool({"id": "fetch"})
+    await pool.release(await pool.acquire())
+    [server] = pool._registry.built
+    [instance] = pool._instances["fetch"]
+    stopping = asyncio.Event()
+
+    async def slow_cleanup():
+        stopping.set()
+        await asyncio.sleep(10)
+
+    server.cleanup = slow_cleanup
+    # As when a health check replaces an instance and the pool is shut down meanwhile.
+    stop = asyncio.create_task(pool._stop_instance(instance))
+    await asyncio.wait_for(stopping.wait(), 1)
+    stop.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(stop, 1)
+    instance.handle._owner.cancel()
+
+
+async def test_instances_whose_server_task_was_cancelled_still_stop_cleanly():
+    pool = make_pool({"id": "fetch"}, {"id": "files"})
+    await pool.release(await pool.acquire())
+    [fetch] = pool._instances["fetch"]
+    fetch.handle._owner.cancel()
+    await asyncio.sleep(0)
+
+    await asyncio.wait_for(pool.shutdown(), 1)
+    assert pool._instances == {"fetch": set(), "files": set()}
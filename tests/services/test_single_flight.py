@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from agent_runtime.services.single_flight import SingleFlight
+
+
+async def test_concurrent_callers_share_one_run():
+    flights = SingleFlight("test")
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*(flights.do("key", work) for _ in range(3)))
+
+    assert results == ["result"] * 3
+    assert runs == [1]
+    assert flights.stats() == {"in_flight": 0, "started": 1, "shared": 2}
+
+
+async def test_a_cancelled_leader_does_not_cancel_the_work_for_others():
+    flights = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "result"
+
+    leader = asyncio.create_task(flights.do("key", work))
+    await asyncio.sleep(0)
+    assert flights.in_flight("key")
+    follower = asyncio.create_task(flights.do("key", work))
+    await asyncio.sleep(0)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+async def test_the_work_is_cancelled_once_every_caller_has_gone():
+    flights = SingleFlight("test")
+    cancelled = asyncio.Event()
+
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    callers = [asyncio.create_task(flights.do("key", work)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for caller in callers:
+        caller.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    assert not flights.in_flight("key")
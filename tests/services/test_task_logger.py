@@ -0,0 +1,61 @@
+import gzip
+
+import pytest
+
+from agent_runtime.constants import PROJECT_ROOT
+from agent_runtime.services.task_logger import TaskLogWriter
+
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = TaskLogWriter(tmp_path / "logs")
+    writer.configure({"flush_interval_seconds": 0.01})
+    yield writer
+    writer.shutdown()
+
+
+def test_lines_are_written_in_order_by_the_background_thread(writer):
+    for number in range(100):
+        writer.write("task", f"line {number}\n")
+    writer.write("other", "other line\n")
+    writer.shutdown()
+
+    assert writer.path_for("task").read_text().splitlines() == [f"line {number}" for number in range(100)]
+    assert writer.path_for("other").read_text() == "other line\n"
+
+
+def test_logs_past_max_bytes_are_rotated_and_compressed(writer):
+    writer.configure({"max_bytes": 100, "backup_count": 2})
+    for generation in range(4):
+        writer.write("task", f"{generation}" * 120 + "\n")
+        writer.close("task")
+        writer.shutdown()
+    writer.write("task", "current\n")
+    writer.shutdown()
+
+    path = writer.path_for("task")
+    assert path.read_text() == "current\n"
+    assert gzip.decompress(path.with_name(f"{path.name}.1.gz").read_bytes()).startswith(b"333")
+    assert gzip.decompress(path.with_name(f"{path.name}.2.gz").read_bytes()).startswith(b"222")
+    assert not path.with_name(f"{path.name}.3.gz").exists()
+
+
+def test_open_handles_are_capped(writer):
+    writer.configure({"max_open_files": 2})
+    for task_id in ("a", "b", "c"):
+        writer.write(task_id, f"{task_id}\n")
+    writer.write("a", "again\n")
+    writer.shutdown()
+
+    assert writer.path_for("a").read_text() == "a\nagain\n"
+    assert writer.path_for("c").read_text() == "c\n"
+
+
+def test_the_log_directory_is_configurable(writer, tmp_path):
+    writer.configure({"path": str(tmp_path / "elsewhere")})
+    writer.write("task", "line\n")
+    writer.shutdown()
+
+    assert (tmp_path / "elsewhere" / "task_task.log").read_text() == "line\n"
+    writer.configure({"path": "logs"})
+    assert writer.logs_dir == PROJECT_ROOT / "logs"
@@ -0,0 +1,56 @@
+import pytest
+
+from agent_runtime.services import task_manager
+
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    monkeypatch.setattr(task_manager, "_store", task_manager.InMemoryTaskStore())
+
+
+def usage(input_tokens: int, output_tokens: int) -> dict[str, int]:
+    return {"requests": 1, "input_tokens": input_tokens, "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens}
+
+
+def test_timings_and_token_usage_are_recorded_per_task():
+    task_id = task_manager.create_task("Fetch a page.")
+    task_manager.record_timing(task_id, "planning", 1.5)
+    task_manager.record_timing(task_id, "planning", 0.5)
+    task_manager.record_plan_usage(task_id, usage(100, 20))
+    task_manager.record_step_usage(task_id, 1, usage(50, 10), {"llm_seconds": 2.0, "tool_seconds": 1.0})
+    task_manager.record_step_usage(task_id, 2, usage(30, 5))
+
+    record = task_manager.get_task_status(task_id)
+    assert record["timings"] == {"planning": 2.0}
+    assert record["step_timings"] == {"1": {"llm_seconds": 2.0, "tool_seconds": 1.0}}
+    assert task_manager.token_totals(record) == {
+        "requests": 3, "input_tokens": 180, "output_tokens": 35, "total_tokens": 215,
+    }
+
+
+def test_unknown_tasks_are_ignored():
+    task_manager.record_timing("unknown", "planning", 1.0)
+    task_manager.record_step_usage("unknown", 1, usage(1, 1))
+    assert task_manager.get_task_status("unknown") is None
+
+
+def test_timing_summary_aggregates_tasks_in_a_status():
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        task_id = task_manager.create_task("Fetch a page.")
+        task_manager.record_timing(task_id, "execution", seconds)
+        task_manager.record_step_usage(task_id, 1, usage(10, 1), {"llm_seconds": seconds})
+        task_manager.update_task_result(task_id, "completed", "done")
+    failed = task_manager.create_task("Fetch a page.")
+    task_manager.record_timing(failed, "execution", 100.0)
+    task_manager.update_task_result(failed, "failed", "boom")
+
+    summary = task_manager.timing_summary()
+    assert summary["tasks"] == 4
+    assert summary["phases"]["execution"] == {
+        "count": 4, "avg": 2.5, "p50": 3.0, "p95": 4.0, "max": 4.0, "total": 10.0,
+    }
+    assert summary["steps"]["llm_seconds"]["total"] == 10.0
+    assert summary["tokens"]["total_tokens"]["total"] == 44
+    assert task_manager.timing_summary(None)["phases"]["execution"]["max"] == 100.0
+    assert task_manager.timing_summary("pending")["tasks"] == 0
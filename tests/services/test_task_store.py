@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+from agent_runtime.services import task_manager
+from agent_runtime.services.task_store import SQLiteTaskStore, create_task_store
+
+
+def record(status: str, created_at: float, updated_at: float | None = None, **fields) -> dict:
+    return {"status": status, "created_at": created_at, "updated_at": updated_at or created_at, **fields}
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A long interval keeps writes buffered until a test flushes them.
+    store = SQLiteTaskStore(tmp_path / "tasks.db", flush_interval=60)
+    yield store
+    store.close()
+
+
+def test_reads_see_buffered_writes(store):
+    store.put("a", record("pending", 1))
+    store.put("b", record("completed", 2))
+    store.flush()
+    store.put("a", record("executing", 1, 5))
+    store.delete("b")
+    store.put("c", record("pending", 3))
+
+    assert store.get("a")["status"] == "executing"
+    assert store.get("b") is None
+    assert [task_id for task_id, _ in store.iter_tasks()] == ["a", "c"]
+    assert [task_id for task_id, _ in store.iter_tasks("pending")] == ["c"]
+    assert store.count() == 2
+    assert store.count("pending") == 1
+    assert store.count("completed") == 0
+    assert store.stale_tasks("executing", updated_before=10) == ["a"]
+    assert store.least_recently_updated(1) == ["c"]
+
+
+def test_reads_do_not_wait_for_a_commit(store):
+    store.put("a", record("pending", 1))
+    store.flush()
+    store.put("b", record("pending", 2))
+
+    # Hold the writer as a slow commit would.
+    committing = threading.Event()
+    release = threading.Event()
+
+    def slow_commit():
+        with store._write_lock:
+            committing.set()
+            release.wait()
+
+    writer = threading.Thread(target=slow_commit)
+    writer.start()
+    assert committing.wait(5)
+    try:
+        started = time.monotonic()
+        assert store.get("a")["status"] == "pending"
+        assert store.count() == 2
+        assert time.monotonic() - started < 0.5
+    finally:
+        release.set()
+        writer.join()
+
+
+def test_records_survive_a_reopen(tmp_path):
+    store = SQLiteTaskStore(tmp_path / "tasks.db", flush_interval=60)
+    store.put("a", record("completed", 1, result="done"))
+    store.close()
+
+    reopened = SQLiteTaskStore(tmp_path / "tasks.db")
+    try:
+        assert reopened.get("a")["result"] == "done"
+    finally:
+        reopened.close()
+
+
+def test_compare_and_set_holds_across_stores(tmp_path):
+    first = SQLiteTaskStore(tmp_path / "tasks.db", flush_interval=60)
+    second = SQLiteTaskStore(tmp_path / "tasks.db", flush_interval=60)
+    try:
+        first.put("a", record("awaiting_approval", 1))
+        first.flush()
+
+        assert first.compare_and_set("a", "awaiting_approval", record("approved", 1, 2))
+        assert not second.compare_and_set("a", "awaiting_approval", record("approved", 1, 3))
+        assert second.get("a")["updated_at"] == 2
+    finally:
+        first.close()
+        second.close()
+
+
+async def test_shared_writes_are_batched_and_visible_to_other_workers(tmp_path, monkeypatch):
+    settings = {"backend": "sqlite", "path": str(tmp_path / "tasks.db"), "flush_interval_seconds": 60}
+    monkeypatch.setattr(task_manager, "_store", task_manager.InMemoryTaskStore())
+    task_manager.configure_store(settings, shared=True)
+    other_worker = SQLiteTaskStore(tmp_path / "tasks.db", flush_interval=60)
+    flushes = []
+    store = task_manager.get_store()
+    flush = store.flush
+    monkeypatch.setattr(store, "flush", lambda: flushes.append(threading.current_thread()) or flush())
+    try:
+        task_id = task_manager.create_task("hello")
+        task_manager.update_task_result(task_id, "executing", None)
+        # Writes only wake the flusher; nothing is committed on the event loop's thread.
+        assert threading.current_thread() not in flushes
+
+        await task_manager.persist()
+        assert other_worker.get(task_id)["status"] == "executing"
+    finally:
+        other_worker.close()
+        task_manager.configure_store(None)
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_count_by_status_includes_buffered_writes(backend, tmp_path):
+    store = create_task_store({"backend": backend, "path": str(tmp_path / "tasks.db"), "flush_interval_seconds": 60})
+    try:
+        store.put("a", record("pending", 1))
+        store.put("b", record("pending", 2))
+        store.put("c", record("completed", 3))
+        store.flush()
+        store.put("a", record("executing", 1, 4))
+        store.delete("c")
+        store.put("d", record("failed", 5))
+
+        assert store.count_by_status() == {"pending": 1, "executing": 1, "failed": 1}
+    finally:
+        store.close()
+
+
+def test_only_one_worker_approves_a_task(tmp_path, monkeypatch):
+    settings = {"backend": "sqlite", "path": str(tmp_path / "tasks.db"), "flush_interval_seconds": 60}
+    monkeypatch.setattr(task_manager, "_store", task_manager.InMemoryTaskStore())
+    task_manager.configure_store(settings, shared=True)
+    other_worker = SQLiteTaskStore(tmp_path / "tasks.db", flush_interval=60)
+    try:
+        task_id = task_manager.create_task("hello")
+        task_manager.get_store().put(task_id, {**task_manager.get_task_status(task_id), "status": "awaiting_approval"})
+        task_manager.get_store().flush()
+        approved = {**other_worker.get(task_id), "status": "approved"}
+
+        assert other_worker.compare_and_set(task_id, "awaiting_approval", approved)
+        assert not task_manager.approve_task(task_id)
+    finally:
+        other_worker.close()
+        task_manager.configure_store(None)
@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import pytest
+from mcp.types import CallToolResult, TextContent, Tool as MCPTool, ToolAnnotations
+
+from agent_runtime.services import tool_cache
+from agent_runtime.services.tool_cache import CachingToolsMixin, ToolCachePolicies, ToolCachePolicy, ToolResultCache
+
+
+def text_result(text: str, is_error: bool = False) -> CallToolResult:
+    return CallToolResult(content=[TextContent(type="text", text=text)], isError=is_error)
+
+
+class CountingServer:
+    """An MCP server stand-in that takes a while to answer and counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def call_tool(self, tool_name, arguments):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return text_result(f"{tool_name} {arguments}")
+
+
+class CachingServer(CachingToolsMixin, CountingServer):
+    server_id = "fetch"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ToolResultCache()
+    monkeypatch.setattr(tool_cache, "tool_result_cache", cache)
+    return cache
+
+
+async def test_identical_calls_in_flight_reach_the_server_once(cache):
+    server = CachingServer(tool_policies=ToolCachePolicies({"default": {"cacheable": True}}))
+
+    results = await asyncio.gather(*(server.call_tool("get", {"url": "https://example.com"}) for _ in range(3)))
+
+    assert server.calls == 1
+    assert len({result.content[0].text for result in results}) == 1
+    stats = cache.stats()["tools"]["fetch/get"]
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 2, 0)
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_policies_default_to_not_caching_and_override_per_tool():
+    assert not ToolCachePolicies(None).for_tool("get").cacheable
+
+    policies = ToolCachePolicies({
+        "default": {"cacheable": True, "ttl_seconds": 60},
+        "tools": {"search": {"ttl_seconds": 5}, "post": {"cacheable": False}},
+    })
+    assert (policies.for_tool("get").cacheable, policies.for_tool("get").ttl_seconds) == (True, 60)
+    assert (policies.for_tool("search").cacheable, policies.for_tool("search").ttl_seconds) == (True, 5)
+    assert not policies.for_tool("post").cacheable
+
+
+def test_keys_ignore_argument_order():
+    assert ToolResultCache.key_for("fetch", "get", {"a": 1, "b": 2}) == ToolResultCache.key_for(
+        "fetch", "get", {"b": 2, "a": 1}
+    )
+    assert ToolResultCache.key_for("fetch", "get", {"a": 1}) != ToolResultCache.key_for("other", "get", {"a": 1})
+
+
+def test_entries_expire_and_errors_and_oversized_results_are_not_cached(monkeypatch):
+    cache = ToolResultCache()
+    policy = ToolCachePolicy(cacheable=True, ttl_seconds=10, max_entry_bytes=200)
+    cache.put("ok", text_result("fine"), policy)
+    cache.put("error", text_result("failed", is_error=True), policy)
+    cache.put("large", text_result("x" * 500), policy)
+
+    assert cache.get("ok") is not None
+    assert cache.get("error") is None and cache.get("large") is None
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get("ok") is None
+
+
+def test_the_cache_is_bounded_by_entries_and_bytes():
+    cache = ToolResultCache()
+    cache.configure({"max_entries": 2})
+    policy = ToolCachePolicy(cacheable=True)
+    for key in ("a", "b", "c"):
+        cache.put(key, text_result(key), policy)
+    assert [key for key in ("a", "b", "c") if cache.get(key)] == ["b", "c"]
+
+    cache.configure({"max_entries": 100, "max_bytes": cache.stats()["bytes"]})
+    cache.put("d", text_result("d"), policy)
+    assert cache.get("b") is None and cache.get("d") is not None
+
+
+async def test_write_tools_always_bypass_the_cache(cache):
+    class ListingServer(CountingServer):
+        async def list_tools(self):
+            return [
+                MCPTool(name="get", inputSchema={"type": "object"}, annotations=ToolAnnotations(readOnlyHint=True)),
+                MCPTool(name="post", inputSchema={"type": "object"}, annotations=ToolAnnotations(readOnlyHint=False)),
+            ]
+
+    class Server(CachingToolsMixin, ListingServer):
+        server_id = "api"
+
+    server = Server(tool_policies=ToolCachePolicies({"default": {"cacheable": True}}))
+    await server.list_tools()
+    for _ in range(2):
+        await server.call_tool("get", {})
+        await server.call_tool("post", {})
+
+    assert server.calls == 3
+    stats = cache.stats()["tools"]
+    assert (stats["api/get"]["hits"], stats["api/post"]["bypassed"]) == (1, 2)
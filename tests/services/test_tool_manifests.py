@@ -0,0 +1,157 @@
+import json
+
+import pytest
+from mcp.types import Tool as MCPTool
+
+from agent_runtime.services import tool_manifests
+from agent_runtime.services.server_pool import MCPServerPool
+from agent_runtime.services.tool_manifests import ToolManifestCache, servers_named_in
+from fakes import FakeRegistry
+
+
+def tool(name: str) -> MCPTool:
+    return MCPTool(name=name, description=f"The {name} tool.", inputSchema={"type": "object", "properties": {}})
+
+
+@pytest.fixture
+def npm_versions(monkeypatch):
+    versions = {"@acme/fetch": "1.0.0"}
+    calls = []
+
+    def installed():
+        calls.append(1)
+        return versions
+
+    monkeypatch.setattr(tool_manifests, "get_installed_npm_package_versions", installed)
+    return versions, calls
+
+
+@pytest.fixture
+def registry_path(tmp_path):
+    path = tmp_path / "tool_registry.yaml"
+    path.write_text("tool_registry: []\n")
+    return path
+
+
+FETCH = {"id": "fetch", "enabled": True, "type": "local_stdio", "config": {"command": "npx", "args": ["@acme/fetch"]}}
+
+
+def test_listings_survive_a_restart(tmp_path, registry_path, npm_versions):
+    path = tmp_path / "manifests.json"
+    ToolManifestCache(path, registry_path).put(FETCH, [tool("fetch")])
+
+    assert [t.name for t in ToolManifestCache(path, registry_path).get(FETCH)] == ["fetch"]
+
+
+def test_reads_are_served_from_memory(tmp_path, registry_path, npm_versions):
+    _, calls = npm_versions
+    path = tmp_path / "manifests.json"
+    ToolManifestCache(path, registry_path).put(FETCH, [tool("fetch")])
+    cache = ToolManifestCache(path, registry_path)
+    assert cache.get(FETCH) is not None
+
+    path.write_text("not json")
+    registry_path.write_text("changed")
+    calls.clear()
+    for _ in range(10):
+        assert [t.name for t in cache.get(FETCH)] == ["fetch"]
+    assert calls == []
+
+
+def test_re_read_registry_entries_share_one_memo_entry(tmp_path, registry_path, npm_versions):
+    cache = ToolManifestCache(tmp_path / "manifests.json", registry_path)
+    keys = {cache.key_for(json.loads(json.dumps(FETCH))) for _ in range(100)}
+
+    assert keys == {ToolManifestCache.compute_key(FETCH)}
+    assert len(cache._keys) == 1
+
+
+def test_registry_change_discards_the_store(tmp_path, registry_path, npm_versions):
+    path = tmp_path / "manifests.json"
+    ToolManifestCache(path, registry_path).put(FETCH, [tool("fetch")])
+    registry_path.write_text("tool_registry: [changed]\n")
+
+    assert ToolManifestCache(path, registry_path).get(FETCH) is None
+
+
+def test_package_upgrade_changes_the_key_after_refresh(tmp_path, registry_path, npm_versions):
+    versions, _ = npm_versions
+    cache = ToolManifestCache(tmp_path / "manifests.json", registry_path)
+    cache.put(FETCH, [tool("fetch")])
+    versions["@acme/fetch"] = "2.0.0"
+    assert cache.get(FETCH) is not None
+
+    cache.refresh()
+    assert cache.get(FETCH) is None
+
+
+def test_put_keeps_entries_stored_by_other_processes(tmp_path, registry_path, npm_versions):
+    path = tmp_path / "manifests.json"
+    other = {**FETCH, "id": "other", "config": {"command": "other"}}
+    first, second = ToolManifestCache(path, registry_path), ToolManifestCache(path, registry_path)
+    first.get(FETCH)
+    second.put(other, [tool("other")])
+    first.put(FETCH, [tool("fetch")])
+
+    stored = json.loads(path.read_text())["entries"]
+    assert {entry["server_id"] for entry in stored.values()} == {"fetch", "other"}
+
+
+def test_tool_fingerprint_is_recomputed_only_when_listings_change(tmp_path, registry_path, npm_versions, monkeypatch):
+    cache = ToolManifestCache(tmp_path / "manifests.json", registry_path)
+    monkeypatch.setattr("agent_runtime.services.server_pool.manifest_cache", cache)
+    pool = MCPServerPool()
+    pool._registry = FakeRegistry([FETCH])
+    gets = []
+    original_get = cache.get
+    monkeypatch.setattr(cache, "get", lambda entry: gets.append(entry) or original_get(entry))
+
+    unknown = pool.tool_fingerprint()
+    assert pool.tool_fingerprint() == unknown
+    assert len(gets) == 1
+
+    cache.put(FETCH, [tool("fetch")])
+    assert pool.tool_fingerprint() != unknown
+    assert len(gets) == 2
+
+
+def test_servers_named_in_matches_whole_tool_names():
+    manifests = {"files": [tool("read_file")], "fetch": [tool("fetch")], "git": [tool("git-log")]}
+
+    assert servers_named_in("1. Use read_file to open notes.txt (depends on: none)", manifests) == ["files"]
+    assert servers_named_in("1. Use read_file_lines, then git-log-all.", manifests) is None
+    assert servers_named_in("1. fetch the page.\n2. Show git-log output.", manifests) == ["fetch", "git"]
+
+
+async def test_planning_servers_stand_in_for_cached_listings(isolated_manifests):
+    pool = MCPServerPool()
+    pool._registry = FakeRegistry([FETCH, {"id": "files", "enabled": True}, {"id": "off", "enabled": False}])
+    isolated_manifests.put(FETCH, [tool("fetch")])
+
+    known, missing = pool.manifest_servers()
+
+    assert [server.name for server in known] == ["fetch"]
+    assert [t.name for t in await known[0].list_tools()] == ["fetch"]
+    assert missing == ["files"]
+    with pytest.raises(RuntimeError, match="not active during planning"):
+        await known[0].call_tool("fetch", {})
+
+
+def test_saves_go_through_a_per_process_temp_file(tmp_path, registry_path, npm_versions, monkeypatch):
+    path = tmp_path / "manifests.json"
+    replaced = []
+    replace = tool_manifests.os.replace
+    monkeypatch.setattr(tool_manifests.os, "replace", lambda src, dst: replaced.append(src) or replace(src, dst))
+    ToolManifestCache(path, registry_path).put(FETCH, [tool("fetch")])
+
+    assert [src.name for src in replaced] == [f"manifests.json.{tool_manifests.os.getpid()}.tmp"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["manifests.json", "tool_registry.yaml"]
+
+
+def test_configuring_another_path_reads_listings_from_there(tmp_path, registry_path, npm_versions):
+    ToolManifestCache(tmp_path / "other.json", registry_path).put(FETCH, [tool("fetch")])
+    cache = ToolManifestCache(tmp_path / "manifests.json", registry_path)
+    assert cache.get(FETCH) is None
+
+    cache.configure({"path": str(tmp_path / "other.json")})
+    assert [t.name for t in cache.get(FETCH)] == ["fetch"]
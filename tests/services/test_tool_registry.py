@@ -0,0 +1,68 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import yaml
+
+from agent_runtime.services import tool_registry
+from agent_runtime.services.tool_registry import ToolRegistry
+from fakes import FakeMCPServer
+
+
+class FakeServerRegistry(ToolRegistry):
+    def build_server(self, server_config: dict) -> FakeMCPServer:
+        server = FakeMCPServer(
+            server_config["id"], startup_delay=server_config.get("startup_delay", 0.0), fail=server_config.get("fail", False)
+        )
+        self.built = [*getattr(self, "built", []), server]
+        return server
+
+
+def make_registry(tmp_path, monkeypatch, *entries: dict) -> FakeServerRegistry:
+    path = tmp_path / "tool_registry.yaml"
+    path.write_text(yaml.safe_dump({"tool_registry": [{"enabled": True, "type": "local_stdio", **entry} for entry in entries]}))
+    monkeypatch.setattr(tool_registry, "TOOL_REGISTRY_PATH", path)
+    return FakeServerRegistry()
+
+
+async def test_servers_start_concurrently_and_failures_are_skipped(tmp_path, monkeypatch):
+    registry = make_registry(
+        tmp_path, monkeypatch,
+        {"id": "a", "startup_delay": 0.2},
+        {"id": "b", "startup_delay": 0.2},
+        {"id": "broken", "fail": True},
+        {"id": "slow", "startup_delay": 5, "startup_timeout_seconds": 0.1},
+    )
+    started = asyncio.get_running_loop().time()
+    servers = await registry.start_servers()
+
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert [server.server_id for server in servers] == ["a", "b"]
+    assert set(registry.failed_servers) == {"broken", "slow"}
+    assert "timed out" in registry.failed_servers["slow"]
+    await registry.shutdown_servers()
+
+
+async def test_each_server_is_entered_and_exited_in_the_same_task(tmp_path, monkeypatch):
+    registry = make_registry(tmp_path, monkeypatch, {"id": "a"}, {"id": "b"})
+    await registry.start_servers()
+    await registry.shutdown_servers()
+
+    for server in registry.built:
+        assert not server.connected
+        assert server.connect_task is server.cleanup_task
+
+
+def test_every_reader_follows_the_registry_override(tmp_path):
+    path = tmp_path / "bench_registry.yaml"
+    code = (
+        "from agent_runtime.api.endpoints import tools; "
+        "from agent_runtime.services import tool_manager, tool_manifests, tool_registry; "
+        "print(tools.TOOL_REGISTRY_PATH, tool_manager.TOOL_REGISTRY_PATH, "
+        "tool_manifests.TOOL_REGISTRY_PATH, tool_registry.TOOL_REGISTRY_PATH)"
+    )
+    env = {**os.environ, "AGENT_RUNTIME_TOOL_REGISTRY": str(path), "PYTHONPATH": os.pathsep.join(sys.path)}
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+
+    assert output.split() == [str(path)] * 4
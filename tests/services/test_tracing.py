@@ -0,0 +1,132 @@
+import json
+import threading
+
+import pytest
+
+from agent_runtime.services.tracing import OTLPHttpExporter, SpanContext, SpanExporter, Tracer
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self, block: threading.Event | None = None):
+        self.spans = []
+        self.block = block
+        self.started = threading.Event()
+
+    def export(self, spans):
+        self.started.set()
+        if self.block is not None:
+            assert self.block.wait(5)
+        self.spans.extend(spans)
+
+
+def tracer_with(exporter: SpanExporter, **settings) -> Tracer:
+    tracer = Tracer()
+    tracer.configure({"enabled": True, "exporter": "none", **settings})
+    tracer.exporter = exporter
+    return tracer
+
+
+def test_traceparent_round_trips():
+    context = SpanContext(trace_id="a" * 32, span_id="b" * 16, sampled=True)
+    assert context.traceparent == f"00-{'a' * 32}-{'b' * 16}-01"
+    assert SpanContext.from_traceparent(context.traceparent) == context
+    for value in (None, "", "00-abc-def-01", "garbage"):
+        assert SpanContext.from_traceparent(value) is None
+
+
+def test_nothing_is_traced_while_disabled():
+    tracer = Tracer()
+    assert tracer.new_trace() is None
+    with tracer.span("step") as span:
+        assert span is None
+
+
+def test_spans_nest_under_the_current_span_and_record_errors():
+    exporter = RecordingExporter()
+    tracer = tracer_with(exporter)
+    root = tracer.new_trace()
+    with tracer.use(root):
+        with tracer.span("step", number=1) as step:
+            with pytest.raises(RuntimeError):
+                with tracer.span("tool"):
+                    raise RuntimeError("boom")
+    tracer.shutdown()
+
+    tool, step_span = exporter.spans
+    assert (step_span.parent_id, tool.parent_id) == (root.span_id, step.context.span_id)
+    assert {span.context.trace_id for span in exporter.spans} == {root.trace_id}
+    assert step_span.attributes == {"number": 1}
+    assert (tool.to_dict()["status"], tool.error) == ("error", "boom")
+    assert tracer.stats()["exported"] == 2
+
+
+def test_unsampled_traces_keep_ids_but_are_not_exported():
+    exporter = RecordingExporter()
+    tracer = tracer_with(exporter, sample_ratio=0)
+    root = tracer.new_trace()
+    with tracer.use(root), tracer.span("step") as span:
+        span.set_attribute("ignored", True)
+    tracer.record_span("task", root, start_ns=1)
+    tracer.shutdown()
+
+    assert not root.sampled and span.context.trace_id == root.trace_id
+    assert span.attributes == {}
+    assert exporter.spans == []
+
+
+def test_spans_are_dropped_when_the_export_queue_is_full():
+    release = threading.Event()
+    exporter = RecordingExporter(block=release)
+    tracer = tracer_with(exporter, max_queue_size=1)
+    root = tracer.new_trace()
+    with tracer.use(root):
+        with tracer.span("first"):
+            pass
+        assert exporter.started.wait(5)
+        for name in ("second", "third"):
+            with tracer.span(name):
+                pass
+    release.set()
+    tracer.shutdown()
+
+    assert [span.name for span in exporter.spans] == ["first", "second"]
+    assert tracer.stats()["dropped"] == 1
+
+
+def test_json_exporter_writes_one_span_per_line(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer()
+    tracer.configure({"enabled": True, "exporter": "json", "json_path": str(path)})
+    root = tracer.new_trace()
+    tracer.record_span("task", root, start_ns=1, attributes={"task_id": "t"})
+    tracer.shutdown()
+
+    [line] = path.read_text().splitlines()
+    span = json.loads(line)
+    assert (span["name"], span["span_id"], span["attributes"]) == ("task", root.span_id, {"task_id": "t"})
+
+
+def test_otlp_payload_encodes_attributes_and_status():
+    tracer = tracer_with(RecordingExporter())
+    root = tracer.new_trace()
+    span = tracer.start_span("tool", {"tool.name": "fetch", "cached": True, "bytes": 3, "seconds": 0.5}, parent=root)
+    span.end(error="timeout")
+
+    payload = OTLPHttpExporter("http://collector", "agent-runtime").payload([span])
+    [resource] = payload["resourceSpans"]
+    [encoded] = resource["scopeSpans"][0]["spans"]
+    assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "agent-runtime"}
+    assert (encoded["traceId"], encoded["parentSpanId"]) == (root.trace_id, root.span_id)
+    assert encoded["attributes"] == [
+        {"key": "tool.name", "value": {"stringValue": "fetch"}},
+        {"key": "cached", "value": {"boolValue": True}},
+        {"key": "bytes", "value": {"intValue": "3"}},
+        {"key": "seconds", "value": {"doubleValue": 0.5}},
+    ]
+    assert encoded["status"] == {"code": 2, "message": "timeout"}
+    tracer.shutdown()
+
+
+def test_unknown_exporters_are_rejected():
+    with pytest.raises(ValueError, match="exporter"):
+        Tracer().configure({"enabled": True, "exporter": "zipkin"})